@@ -0,0 +1,97 @@
+# Contention benchmark for quantity reservation on a hot listing
+# Worker threads, each with its own connection, keep claiming units of one listing
+# until it is sold out. Checks that nothing is lost or over-allocated and reports
+# throughput and latency as the number of concurrent writers grows.
+# Run from the repository root with: python -m benchmarks.claim_contention [--stock N]
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from components import query_metrics
+from components.claim_reservations import ensure_claim_quantities, reserve_claim
+
+SCHEMA_SQL = """
+CREATE TABLE food_listings (Food_ID INTEGER, Food_Name TEXT, Quantity INTEGER, Location TEXT, Meal_Type TEXT);
+CREATE TABLE claims (Claim_ID INTEGER, Food_ID INTEGER, Receiver_ID INTEGER, Status TEXT, Timestamp TEXT);
+"""
+
+
+def create_database(path, stock):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA_SQL)
+    conn.execute("INSERT INTO food_listings VALUES (1, 'Soup', ?, 'Hotville', 'Dinner')", (stock,))
+    conn.commit()
+    ensure_claim_quantities(conn)
+    conn.close()
+
+
+def run_workers(path, workers, units):
+    latencies, granted = [], []
+    lock = threading.Lock()
+
+    def worker(receiver_id):
+        conn = sqlite3.connect(path, timeout=30)
+        own_latencies, own_granted = [], 0
+        while True:
+            started = time.perf_counter()
+            claim_id = reserve_claim(conn, 1, receiver_id, units)
+            own_latencies.append((time.perf_counter() - started) * 1000)
+            if claim_id is None:
+                break
+            own_granted += 1
+        conn.close()
+        with lock:
+            latencies.extend(own_latencies)
+            granted.append(own_granted)
+
+    threads = [threading.Thread(target=worker, args=(receiver_id,)) for receiver_id in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sum(granted), latencies
+
+
+# Stock, claims and claimed units must all agree after the run
+def check_consistency(path, stock, units, granted):
+    conn = sqlite3.connect(path)
+    remaining = conn.execute("SELECT Remaining_Quantity FROM food_listings WHERE Food_ID = 1").fetchone()[0]
+    claim_count, claimed = conn.execute("SELECT COUNT(*), COALESCE(SUM(Claimed_Quantity), 0) FROM claims").fetchone()
+    distinct_ids = conn.execute("SELECT COUNT(DISTINCT Claim_ID) FROM claims").fetchone()[0]
+    conn.close()
+    return (remaining >= 0 and remaining < units and claimed + remaining == stock
+            and claim_count == granted == distinct_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stock', type=int, default=2000)
+    parser.add_argument('--units', type=int, default=1, help="units per claim")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    # Keep the benchmark's writes out of the app's query metrics
+    query_metrics.METRICS_ENABLED = False
+
+    print(f"{'Workers':>8}{'Claims':>8}{'Seconds':>10}{'Claims/s':>10}{'p50 ms':>9}{'p99 ms':>9}  Consistent")
+    print("-" * 66)
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in args.workers:
+            path = os.path.join(directory, f"contention_{workers}.db")
+            create_database(path, args.stock)
+            elapsed, granted, latencies = run_workers(path, workers, args.units)
+            quantiles = statistics.quantiles(latencies, n=100)
+            consistent = check_consistency(path, args.stock, args.units, granted)
+            print(f"{workers:>8}{granted:>8}{elapsed:>10.2f}{granted / elapsed:>10.0f}"
+                  f"{quantiles[49]:>9.2f}{quantiles[98]:>9.2f}  {'yes' if consistent else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
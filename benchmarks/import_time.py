@@ -0,0 +1,78 @@
+# Import-time benchmark for the app and its components
+# Each module is imported in a fresh interpreter so nothing is served from sys.modules.
+# Run from the repository root with: python -m benchmarks.import_time [--repeat N]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = [
+    'components.data_ingestion',
+    'components.sql_data_analysis',
+    'components.claim_rollups',
+    'components.query_metrics',
+    'views.common',
+    'views.food_listings',
+    'views.claims',
+    'views.dashboard',
+    'views.analytics',
+    'plotly.express',
+]
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def time_import(module, repeat):
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]) * 1000)
+    return statistics.median(samples)
+
+
+# Cold start (first script run) and warm reruns of the app via Streamlit's test harness
+def time_app_runs(page, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    app = AppTest.from_file(os.path.abspath('app.py'), default_timeout=120).run()
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    app.sidebar.selectbox[0].select(page).run()
+    samples = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return cold_ms, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page', default='Food Listings')
+    parser.add_argument('--skip-app', action='store_true')
+    args = parser.parse_args()
+
+    print(f"{'Module':<35}{'Median import (ms)':>20}")
+    print("-" * 55)
+    for module in MODULES:
+        print(f"{module:<35}{time_import(module, args.repeat):>20.1f}")
+
+    if not args.skip_app:
+        cold_ms, rerun_ms = time_app_runs(args.page, args.repeat)
+        print(f"\napp.py cold start: {cold_ms:.1f} ms")
+        print(f"'{args.page}' rerun (median): {rerun_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Structured address parsing for providers
+# Splits the free-text, two-line Address ("street\nlocality, ST 12345") into
+# Street, Locality, State and Postal_Code in one vectorized regex pass, and indexes
+# the structured columns so regional lookups are index seeks instead of LIKE scans.
+
+import pandas as pd
+
+ADDRESS_COLUMNS = ('Street', 'Locality', 'State', 'Postal_Code')
+
+# Second line is "Locality, ST 12345"; military addresses use "APO AE 12345" with no comma
+ADDRESS_PATTERN = (
+    r'^(?P<Street>.+?)\s*\n\s*(?P<Locality>[^,\n]+?),?\s+'
+    r'(?P<State>[A-Z]{2})\s+(?P<Postal_Code>\d{5}(?:-\d{4})?)\s*$'
+)
+
+ADDRESS_INDEXES = {
+    'idx_providers_state_postal': ('State', 'Postal_Code'),
+    'idx_providers_postal': ('Postal_Code',),
+}
+
+
+# Parse a Series of raw addresses; unparseable ones keep the flattened text as Street
+def parse_addresses(addresses):
+    parsed = addresses.astype(str).str.extract(ADDRESS_PATTERN)
+    unparsed = parsed['Street'].isna()
+    parsed.loc[unparsed, 'Street'] = addresses[unparsed].astype(str).str.replace(r'\s*\n\s*', ', ', regex=True)
+    return parsed[list(ADDRESS_COLUMNS)]
+
+
+# Add the parsed columns to a providers frame, keeping the raw Address
+def add_address_columns(providers):
+    parsed = parse_addresses(providers['Address'])
+    for column in ADDRESS_COLUMNS:
+        providers[column] = parsed[column]
+    return providers
+
+
+def create_address_indexes(conn):
+    cursor = conn.cursor()
+    for name, columns in ADDRESS_INDEXES.items():
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON providers ({column_list})")
+    conn.commit()
+
+
+# Migrate an existing providers table: add missing columns, backfill them, index them
+def ensure_address_columns(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(providers)")}
+    for column in ADDRESS_COLUMNS:
+        if column not in existing:
+            conn.execute(f'ALTER TABLE providers ADD COLUMN "{column}" TEXT')
+
+    pending = pd.read_sql_query(
+        "SELECT rowid AS row_id, Address FROM providers WHERE Street IS NULL AND Address IS NOT NULL",
+        conn
+    )
+    if len(pending):
+        parsed = parse_addresses(pending['Address'])
+        parsed['row_id'] = pending['row_id']
+        conn.executemany(
+            "UPDATE providers SET Street = ?, Locality = ?, State = ?, Postal_Code = ? WHERE rowid = ?",
+            parsed.astype(object).where(parsed.notna(), None).itertuples(index=False, name=None)
+        )
+    conn.commit()
+    create_address_indexes(conn)
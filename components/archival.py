@@ -0,0 +1,376 @@
+# Hot/cold archival of expired listings and their closed claims
+# Listings whose expiry is more than ARCHIVE_GRACE_DAYS in the past and which have no
+# open (Pending) claims are moved, with their claims, to zstd-compressed Parquet files in
+# an archive directory next to the database, in small batches. Each batch is written as
+# new part files and then deleted from the hot tables in one transaction. If the delete
+# never commits, the rows stay hot and are archived again by the next run; readers take
+# the hot copy first, then the newest part, so no row is ever counted twice.
+# The hot tables only keep what the interactive pages still show. History connections
+# (open_history) attach an uncompressed SQLite copy of the parts (history_cache.db in the
+# archive directory, rebuilt only when the set of part files changes; safe to delete) and
+# get TEMP views named food_listings and claims over hot UNION ALL archive, which shadow
+# the hot tables so existing analysis SQL sees all rows unchanged.
+# Claim rollups have no delete trigger, so trend charts keep counting archived claims.
+# The main database remembers the highest key archived per table (archived_key_max), so new
+# IDs taken as MAX() + 1 over the hot table never reuse an archived listing's or claim's ID.
+# Run from the repository root with: python -m components.archival [--grace-days N] [--compact]
+
+import argparse
+import contextlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from components.storage import connection_dialect, dbapi_connection, sqlite_path
+
+ARCHIVE_GRACE_DAYS = int(os.environ.get('ARCHIVE_GRACE_DAYS', '30'))
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_COMPRESSION = 'zstd'
+HISTORY_CACHE_NAME = 'history_cache.db'
+BATCH_SLEEP_SECONDS = 0.05  # let app writers in between batches
+CLOSED_STATUSES = ('Completed', 'Cancelled')
+
+# Archived table -> its key column
+ARCHIVED_TABLES = {'food_listings': 'Food_ID', 'claims': 'Claim_ID'}
+
+ARCHIVED_KEYS_SQL = """
+CREATE TABLE IF NOT EXISTS archived_key_max (
+    Table_Name TEXT PRIMARY KEY,
+    Max_Key INTEGER NOT NULL
+)
+"""
+
+ARCHIVE_INDEXES = {
+    'idx_food_listings_expiry': ('food_listings', 'Expiry_Date'),
+    'idx_claims_food': ('claims', 'Food_ID'),
+}
+
+
+# Cold store directory next to the database unless ARCHIVE_DIR says otherwise
+def archive_path(database_name=None):
+    if os.environ.get('ARCHIVE_DIR'):
+        return os.environ['ARCHIVE_DIR']
+    stem, _ = os.path.splitext(database_name or sqlite_path())
+    return f"{stem}_archive"
+
+
+def _database_file(conn):
+    return dbapi_connection(conn).execute("PRAGMA database_list").fetchone()[2]
+
+
+def _columns(conn, table, schema='main'):
+    return [(row[1], row[2]) for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+
+# Part files of an archived table, oldest first
+def _part_files(path, table):
+    directory = os.path.join(path, table)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+
+
+# Write rows as the table's next part file; renamed into place, so readers never see half a file.
+# Columns that are all NULL are typed as strings.
+def _write_part(path, table, columns, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parts = _part_files(path, table)
+    number = int(os.path.splitext(os.path.basename(parts[-1]))[0]) + 1 if parts else 1
+    os.makedirs(os.path.join(path, table), exist_ok=True)
+    part_path = os.path.join(path, table, f"{number:08d}.parquet")
+
+    arrays = {}
+    for index, column in enumerate(columns):
+        values = pa.array([row[index] for row in rows])
+        arrays[column] = values.cast(pa.string()) if pa.types.is_null(values.type) else values
+    pq.write_table(pa.table(arrays), part_path + '.tmp', compression=ARCHIVE_COMPRESSION)
+    os.replace(part_path + '.tmp', part_path)
+
+
+# Archived rows of a table in the given column order, one per key (the newest part wins).
+# Columns a part predates read as NULL.
+def _read_archive(path, table, columns):
+    import pyarrow.parquet as pq
+
+    key = ARCHIVED_TABLES[table]
+    rows = {}
+    for part in _part_files(path, table):
+        for record in pq.read_table(part).to_pylist():
+            rows[record[key]] = tuple(record.get(column) for column in columns)
+    return list(rows.values())
+
+
+def _record_archived_keys(conn, table, max_key):
+    conn.execute("""
+        INSERT INTO archived_key_max (Table_Name, Max_Key) VALUES (?, ?)
+        ON CONFLICT (Table_Name) DO UPDATE SET Max_Key = MAX(Max_Key, excluded.Max_Key)
+    """, (table, max_key))
+
+
+# Create archived_key_max; an archive written before it existed seeds it from its key columns
+def ensure_archived_keys(conn, path=None):
+    conn.execute(ARCHIVED_KEYS_SQL)
+    if conn.execute("SELECT 1 FROM archived_key_max").fetchone() is None:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        path = path or archive_path(_database_file(conn))
+        for table, key in ARCHIVED_TABLES.items():
+            maxima = [pc.max(pq.read_table(part, columns=[key]).column(key)).as_py()
+                      for part in _part_files(path, table)]
+            maxima = [value for value in maxima if value is not None]
+            if maxima:
+                _record_archived_keys(conn, table, max(maxima))
+    conn.commit()
+
+
+# Highest ID a table has ever handed out, hot or archived
+def max_key(conn, table):
+    key = ARCHIVED_TABLES[table]
+    return conn.execute(f"""
+        SELECT MAX(COALESCE((SELECT MAX("{key}") FROM main."{table}"), 0),
+                   COALESCE((SELECT Max_Key FROM archived_key_max WHERE Table_Name = ?), 0))
+    """, (table,)).fetchone()[0]
+
+
+# Next batch of listings past expiry + grace with no open claims
+def _eligible_listings(conn, cutoff, batch_size):
+    placeholders = ", ".join("?" for _ in CLOSED_STATUSES)
+    return [row[0] for row in conn.execute(f"""
+        SELECT f.Food_ID FROM main.food_listings f
+        WHERE f.Expiry_Date < ?
+          AND NOT EXISTS (
+              SELECT 1 FROM main.claims c
+              WHERE c.Food_ID = f.Food_ID AND c.Status NOT IN ({placeholders})
+          )
+        ORDER BY f.Expiry_Date
+        LIMIT ?
+    """, (cutoff, *CLOSED_STATUSES, batch_size))]
+
+
+# Write one batch to the archive, then delete it from the hot tables in one transaction.
+# The write lock is held throughout, so no claim can be added to a listing being moved.
+def archive_batch(conn, food_ids, path):
+    placeholders = ", ".join("?" for _ in food_ids)
+    counts = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table in ('claims', 'food_listings'):
+            cursor = conn.execute(f'SELECT * FROM main."{table}" WHERE Food_ID IN ({placeholders})', food_ids)
+            rows = cursor.fetchall()
+            if rows:
+                columns = [column[0] for column in cursor.description]
+                _write_part(path, table, columns, rows)
+                key = columns.index(ARCHIVED_TABLES[table])
+                _record_archived_keys(conn, table, max(row[key] for row in rows))
+            counts[table] = conn.execute(
+                f'DELETE FROM main."{table}" WHERE Food_ID IN ({placeholders})', food_ids
+            ).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counts
+
+
+# Move everything eligible as of as_of (default today); returns total rows moved per table
+def archive_expired(conn, grace_days=ARCHIVE_GRACE_DAYS, batch_size=ARCHIVE_BATCH_SIZE, as_of=None, path=None):
+    path = path or archive_path(_database_file(conn))
+    ensure_archived_keys(conn, path)
+    for name, (table, column) in ARCHIVE_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS main.{name} ON {table} ({column})")
+    conn.commit()
+
+    cutoff = ((as_of or date.today()) - timedelta(days=grace_days)).isoformat()
+    totals = {'food_listings': 0, 'claims': 0}
+    while True:
+        food_ids = _eligible_listings(conn, cutoff, batch_size)
+        if not food_ids:
+            break
+        for table, count in archive_batch(conn, food_ids, path).items():
+            totals[table] += count
+        time.sleep(BATCH_SLEEP_SECONDS)
+    return totals
+
+
+# Rewrite each archived table as a single part without repeated keys (re-archived rows
+# after a re-ingestion, or batches whose delete never committed)
+def compact_archive(path):
+    import pyarrow.parquet as pq
+
+    for table in ARCHIVED_TABLES:
+        parts = _part_files(path, table)
+        if len(parts) < 2:
+            continue
+        columns = list(dict.fromkeys(name for part in parts for name in pq.read_schema(part).names))
+        _write_part(path, table, columns, _read_archive(path, table, columns))
+        for part in parts:
+            os.remove(part)
+
+
+def _part_manifest(path):
+    return sorted((table, os.path.basename(part), os.path.getsize(part), os.stat(part).st_mtime_ns)
+                  for table in ARCHIVED_TABLES for part in _part_files(path, table))
+
+
+def _cached_manifest(cache_path):
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{cache_path}?mode=ro", uri=True)
+        try:
+            return sorted(conn.execute("SELECT Table_Name, Part_Name, Size, Modified FROM archive_parts"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+# Load the part files into a new SQLite file and swap it in. One row per key (the newest part
+# wins), the key as INTEGER PRIMARY KEY and an index on Food_ID, so history joins use indexes.
+# Archiving only adds parts, so while none went away a copy of the current cache is extended
+# with the new parts; compaction replaces them all and rebuilds from scratch.
+# Concurrent rebuilds each write their own file; whichever is renamed last is equally valid.
+def _build_history_cache(path, manifest, previous=None):
+    import pyarrow.parquet as pq
+
+    cache_path = os.path.join(path, HISTORY_CACHE_NAME)
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    previous = set(previous) if previous is not None and set(previous) <= set(manifest) else set()
+    if previous:
+        shutil.copyfile(cache_path, temp_path)
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS archive_parts "
+                     "(Table_Name TEXT, Part_Name TEXT, Size INTEGER, Modified INTEGER)")
+        conn.execute("DELETE FROM archive_parts")
+        conn.executemany("INSERT INTO archive_parts VALUES (?, ?, ?, ?)", manifest)
+        for table, key in ARCHIVED_TABLES.items():
+            parts = [os.path.join(path, table, entry[1]) for entry in manifest
+                     if entry[0] == table and entry not in previous]
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ("{key}" INTEGER PRIMARY KEY)')
+            existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+            for name in dict.fromkeys(name for part in parts for name in pq.read_schema(part).names):
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{name}"')
+            for part in parts:
+                for batch in pq.ParquetFile(part).iter_batches():
+                    names = ", ".join(f'"{name}"' for name in batch.schema.names)
+                    placeholders = ", ".join("?" for _ in batch.schema.names)
+                    conn.executemany(f'INSERT OR REPLACE INTO "{table}" ({names}) VALUES ({placeholders})',
+                                     zip(*(column.to_pylist() for column in batch.columns)))
+            if key != 'Food_ID' and 'Food_ID' in {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_food" ON "{table}" ("Food_ID")')
+        conn.commit()
+    except Exception:
+        conn.close()
+        os.remove(temp_path)
+        raise
+    conn.close()
+    os.replace(temp_path, cache_path)
+
+
+# Read-only view of hot + cold data: TEMP views shadow the hot tables on this connection.
+# Use a dedicated connection; writes through the shadowed names would hit the views.
+# The archive is attached through its history cache, rebuilt only when the part files change;
+# archived rows whose key is also hot (an interrupted or repeated run) are read from the hot table.
+def open_history(conn, path=None):
+    path = path or archive_path(_database_file(conn))
+    if not os.path.isdir(path):
+        return conn
+    for table in ARCHIVED_TABLES:
+        conn.execute(f'DROP VIEW IF EXISTS temp."{table}"')
+    if 'archive' in {row[1] for row in conn.execute("PRAGMA database_list")}:
+        conn.execute("DETACH DATABASE archive")
+
+    manifest = _part_manifest(path)
+    cache_path = os.path.join(path, HISTORY_CACHE_NAME)
+    cached = _cached_manifest(cache_path)
+    if cached != manifest:
+        _build_history_cache(path, manifest, cached)
+    conn.execute("ATTACH DATABASE ? AS archive", (cache_path,))
+
+    for table, key in ARCHIVED_TABLES.items():
+        names = [name for name, _ in _columns(conn, table)]
+        archived = {name for name, _ in _columns(conn, table, 'archive')}
+        column_list = ", ".join(f'"{name}"' for name in names)
+        archive_list = ", ".join(f'a."{name}"' if name in archived else f'NULL AS "{name}"' for name in names)
+        conn.execute(f"""
+            CREATE TEMP VIEW "{table}" AS
+            SELECT {column_list} FROM main."{table}"
+            UNION ALL
+            SELECT {archive_list} FROM archive."{table}" a
+            WHERE NOT EXISTS (SELECT 1 FROM main."{table}" h WHERE h."{key}" = a."{key}")
+        """)
+    return conn
+
+
+def connect_history(database_name=None):
+    return open_history(sqlite3.connect(database_name or sqlite_path(), timeout=30))
+
+
+# Connection for reads that should include archived rows, for code that also writes
+# through conn: a separate history connection to the same SQLite file, or conn itself
+# when there is no archive (or the database is not SQLite)
+@contextlib.contextmanager
+def history_reader(conn):
+    database_name = _database_file(conn) if connection_dialect(conn) == 'sqlite' else None
+    if not database_name or not os.path.isdir(archive_path(database_name)):
+        yield conn
+        return
+    history = connect_history(database_name)
+    try:
+        yield history
+    finally:
+        history.close()
+
+
+# Hot row counts, plus archived rows and bytes on disk per table
+def table_sizes(conn, path):
+    import pyarrow.parquet as pq
+
+    sizes = {}
+    for table in ARCHIVED_TABLES:
+        rows = conn.execute(f'SELECT COUNT(*) FROM main."{table}"').fetchone()[0]
+        sizes[f"main.{table}"] = f"{rows} rows"
+    for table in ARCHIVED_TABLES:
+        parts = _part_files(path, table)
+        rows = sum(pq.ParquetFile(part).metadata.num_rows for part in parts)
+        nbytes = sum(os.path.getsize(part) for part in parts)
+        sizes[f"archive.{table}"] = f"{rows} rows in {len(parts)} files, {nbytes / 1024:.0f} KB"
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move expired listings and their closed claims to the archive")
+    parser.add_argument('--grace-days', type=int, default=ARCHIVE_GRACE_DAYS)
+    parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None, help="treat this date as today")
+    parser.add_argument('--database', default=None, help="SQLite file (default: from DATABASE_URL)")
+    parser.add_argument('--compact', action='store_true', help="merge the archive into one file per table afterwards")
+    args = parser.parse_args()
+
+    database_name = args.database or sqlite_path()
+    path = archive_path(database_name)
+    conn = sqlite3.connect(database_name, timeout=30, isolation_level=None)
+    try:
+        started = time.perf_counter()
+        totals = archive_expired(conn, args.grace_days, args.batch_size, args.as_of, path)
+        print(f"✓ Archived {totals['food_listings']} listings and {totals['claims']} claims "
+              f"to {path} in {time.perf_counter() - started:.2f}s")
+        if args.compact:
+            compact_archive(path)
+            print("✓ Archive compacted")
+        for name, size in table_sizes(conn, path).items():
+            print(f"  {name}: {size}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
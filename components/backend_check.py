@@ -0,0 +1,248 @@
+# End-to-end check of a storage backend, e.g. a local PostgreSQL
+# Loads the bundled CSVs into the target (every table is replaced, so point it at a scratch
+# database) and into a temporary SQLite file, then checks that the analysis queries return
+# the same results on both, that concurrent reservations never oversell and always get
+# distinct Claim_IDs, that cancelling and reopening a claim moves its stock, and that a
+# failing EXPLAIN leaves the pooled connection usable. On the SQLite reference it also
+# archives claims and checks that new claims never reuse an archived Claim_ID.
+# Run from the repository root with (PostgreSQL needs a driver, e.g. psycopg2-binary):
+#   python -m components.backend_check --database postgresql+psycopg2://postgres@localhost/food_waste_check
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+
+from components.archival import archive_expired, open_history
+from components.claim_reservations import reserve_claim, set_claim_status
+from components.query_metrics import explain_query_plan, timed_execute, timed_fetchall, timed_read_sql
+from components.sql_data_analysis import QUERIES, query14_postgresql_sql
+from components.storage import connect, connection_dialect, is_sqlite
+
+RESERVATION_THREADS = 8
+RESERVATIONS_PER_THREAD = 10
+RESERVATION_STOCK = 50  # fewer units than attempts, so some reservations must be refused
+
+
+def load(database_name):
+    # Imported here: data_ingestion imports half the components package
+    from components.data_ingestion import main as ingest
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest(database_name=database_name)
+
+
+# Order-insensitive, type-insensitive form of a query result (5 vs 5.0, timestamps vs text)
+def normalized(frame):
+    columns = {}
+    for column in frame.columns:
+        values = frame[column]
+        numbers = pd.to_numeric(values, errors='coerce')
+        if pd.api.types.is_datetime64_any_dtype(values):
+            columns[column] = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+        elif numbers.notna().sum() == values.notna().sum():
+            columns[column] = numbers.astype(float).round(4).astype(str)
+        else:
+            stamps = pd.to_datetime(values, errors='coerce', format='mixed')
+            if stamps.notna().sum() == values.notna().sum():
+                columns[column] = stamps.dt.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                columns[column] = values.astype(str)
+    result = pd.DataFrame(columns, index=frame.index)
+    return result.sort_values(list(result.columns), ignore_index=True)
+
+
+# Top-N queries are compared without their LIMIT: ties at the cut-off may legitimately
+# keep different rows on different engines
+def without_limit(sql):
+    return re.sub(r'\s+LIMIT\s+\d+\s*;?\s*$', '', sql, flags=re.IGNORECASE)
+
+
+def check_queries(conn, reference):
+    failures = []
+    for name, sql in QUERIES.items():
+        if name == 'query14' and connection_dialect(conn) == 'postgresql':
+            sql = query14_postgresql_sql
+        expected = normalized(timed_read_sql(reference, without_limit(QUERIES[name]), label=f"check:{name}"))
+        actual = normalized(timed_read_sql(conn, without_limit(sql), label=f"check:{name}"))
+        actual.columns = expected.columns  # PostgreSQL folds unquoted aliases to lower case
+        if not expected.equals(actual):
+            failures.append(f"{name}: {len(actual)} rows, expected {len(expected)}")
+    return failures
+
+
+# Many connections reserving one unit at a time from the same listing
+def check_reservations(database_name):
+    conn = connect(database_name)
+    try:
+        cursor = conn.cursor()
+        food_id = timed_fetchall(cursor, "SELECT MIN(Food_ID) FROM food_listings")[0][0]
+        timed_execute(cursor, "UPDATE food_listings SET Remaining_Quantity = ? WHERE Food_ID = ?",
+                      (RESERVATION_STOCK, food_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+    claim_ids, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        worker_conn = connect(database_name)
+        try:
+            for _ in range(RESERVATIONS_PER_THREAD):
+                try:
+                    claim_id = reserve_claim(worker_conn, food_id, 1, 1)
+                except Exception as error:
+                    with lock:
+                        errors.append(f"{type(error).__name__}: {error}")
+                    continue
+                with lock:
+                    claim_ids.append(claim_id)
+        finally:
+            worker_conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(RESERVATION_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    granted = [claim_id for claim_id in claim_ids if claim_id is not None]
+    conn = connect(database_name)
+    try:
+        cursor = conn.cursor()
+        remaining = timed_fetchall(cursor, "SELECT Remaining_Quantity FROM food_listings WHERE Food_ID = ?", (food_id,))[0][0]
+        rows, distinct = timed_fetchall(cursor, "SELECT COUNT(*), COUNT(DISTINCT Claim_ID) FROM claims")[0]
+    finally:
+        conn.close()
+
+    failures = [f"reservation error: {error}" for error in errors[:5]]
+    if len(granted) != RESERVATION_STOCK or remaining != 0:
+        failures.append(f"{len(granted)} reservations granted for {RESERVATION_STOCK} units, {remaining} left")
+    if len(set(granted)) != len(granted) or rows != distinct:
+        failures.append(f"duplicate Claim_IDs: {rows} claims, {distinct} distinct IDs")
+    return failures, food_id, granted
+
+
+# Cancel gives the unit back, reopen takes it again, reopening with no stock left is refused
+def check_status_changes(database_name, food_id, claim_ids):
+    conn = connect(database_name)
+    cursor = conn.cursor()
+
+    def remaining():
+        value = timed_fetchall(cursor, "SELECT Remaining_Quantity FROM food_listings WHERE Food_ID = ?", (food_id,))[0][0]
+        conn.commit()
+        return value
+
+    failures = []
+    try:
+        first, second = claim_ids[:2]
+        set_claim_status(conn, first, 'Cancelled')
+        if remaining() != 1:
+            failures.append("cancelling a claim did not release its quantity")
+        set_claim_status(conn, first, 'Pending')
+        if remaining() != 0:
+            failures.append("reopening a claim did not take its quantity again")
+        set_claim_status(conn, second, 'Cancelled')
+        reserve_claim(conn, food_id, 2, 1)
+        try:
+            set_claim_status(conn, second, 'Pending')
+            failures.append("reopening a claim with no stock left was allowed")
+        except Exception:
+            conn.rollback()
+        if remaining() != 0:
+            failures.append(f"stock is {remaining()} after the refused reopen, expected 0")
+    finally:
+        conn.close()
+    return failures
+
+
+# Archive every listing without open claims, then reserve more claims: all IDs stay distinct
+# across hot and archived claims, and new ones are above the archived ones
+def check_archived_claim_ids(database_name, path):
+    conn = sqlite3.connect(database_name, isolation_level=None)
+    history = None
+    try:
+        archived = archive_expired(conn, grace_days=0, as_of=date.max, path=path)['claims']
+        highest_archived = conn.execute(
+            "SELECT Max_Key FROM archived_key_max WHERE Table_Name = 'claims'").fetchone()[0]
+        food_id = conn.execute(
+            "SELECT Food_ID FROM food_listings WHERE Remaining_Quantity >= 3 ORDER BY Food_ID").fetchone()[0]
+        claim_ids = [reserve_claim(conn, food_id, 1, 1) for _ in range(3)]
+
+        history = open_history(sqlite3.connect(database_name), path)
+        rows, distinct = history.execute("SELECT COUNT(*), COUNT(DISTINCT Claim_ID) FROM claims").fetchone()
+    finally:
+        conn.close()
+        if history is not None:
+            history.close()
+
+    failures = []
+    if not archived:
+        failures.append("no claims were archived")
+    if min(claim_ids) <= highest_archived:
+        failures.append(f"new Claim_IDs {claim_ids} reuse archived IDs (up to {highest_archived})")
+    if rows != distinct:
+        failures.append(f"duplicate Claim_IDs across hot and archive: {rows} claims, {distinct} distinct IDs")
+    return failures
+
+
+def check_failed_explain(database_name):
+    conn = connect(database_name)
+    try:
+        explain_query_plan(conn, "SELECT * FROM no_such_table")
+        cursor = conn.cursor()
+        return [] if timed_fetchall(cursor, "SELECT COUNT(*) FROM claims")[0][0] > 0 else ["no claims after EXPLAIN"]
+    except Exception as error:
+        return [f"connection unusable after a failed EXPLAIN: {error}"]
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the CSVs into a scratch database and check the backend")
+    parser.add_argument('--database', required=True, help="database URL or SQLite path; all its tables are replaced")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        started = time.perf_counter()
+        load(args.database)
+        reference_name = os.path.join(scratch, 'reference.db')
+        load(reference_name)
+        print(f"✓ CSVs loaded into the target and a SQLite reference in {time.perf_counter() - started:.1f}s")
+
+        conn, reference = connect(args.database), connect(reference_name)
+        try:
+            results.append(("analysis queries match SQLite", check_queries(conn, reference)))
+        finally:
+            conn.close()
+            reference.close()
+        results.append(("new claims never reuse archived Claim_IDs", check_archived_claim_ids(
+            reference_name, os.path.join(scratch, 'reference_archive'))))
+
+    failures, food_id, claim_ids = check_reservations(args.database)
+    results.append((f"{RESERVATION_THREADS}x{RESERVATIONS_PER_THREAD} concurrent reservations "
+                    f"of {RESERVATION_STOCK} units", failures))
+    if len(claim_ids) >= 2:
+        results.append(("cancel/reopen moves stock", check_status_changes(args.database, food_id, claim_ids)))
+    if not is_sqlite(args.database):
+        results.append(("failed EXPLAIN leaves the connection usable", check_failed_explain(args.database)))
+
+    for label, failures in results:
+        print(f"{'✓' if not failures else '✗'} {label}")
+        for failure in failures:
+            print(f"    {failure}")
+    raise SystemExit(0 if all(not failures for _, failures in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
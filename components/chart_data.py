@@ -0,0 +1,37 @@
+# Chart data rules: aggregate in SQL and keep every chart's payload bounded
+# Category charts get the TOP_N largest groups plus one "Other" bucket for the long
+# tail, so a bar or pie never has more than TOP_N + 1 marks however many cities we
+# serve. Time series are bucketed by claim_rollups.choose_grain; line charts with more
+# than WEBGL_POINTS points are drawn with WebGL traces.
+
+import os
+
+TOP_N = int(os.environ.get('CHART_TOP_N', 20))
+OTHER_LABEL = 'Other'
+WEBGL_POINTS = 1000
+
+
+# Counts per value of column over source_sql, largest first, with the tail folded into Other
+def category_counts_sql(source_sql, column, top_n=TOP_N):
+    return f"""
+        WITH counts AS (
+            SELECT "{column}" AS Category, COUNT(*) AS Total
+            FROM ({source_sql}) src
+            WHERE "{column}" IS NOT NULL
+            GROUP BY "{column}"
+        ),
+        ranked AS (
+            SELECT Category, Total, ROW_NUMBER() OVER (ORDER BY Total DESC, Category) AS Position
+            FROM counts
+        )
+        SELECT CASE WHEN Position <= {int(top_n)} THEN Category ELSE '{OTHER_LABEL}' END AS Category,
+               SUM(Total) AS Total
+        FROM ranked
+        GROUP BY CASE WHEN Position <= {int(top_n)} THEN Category ELSE '{OTHER_LABEL}' END
+        ORDER BY MIN(Position)
+    """
+
+
+# Plotly Express render_mode for a line or scatter chart of the given number of points
+def render_mode(points):
+    return 'webgl' if points > WEBGL_POINTS else 'svg'
@@ -0,0 +1,161 @@
+# Append-only claim status history
+# Triggers on the claims table log every new claim and every status transition to
+# claim_events, which cannot be updated or deleted. Time-to-completion percentiles per
+# provider, city or food type are computed from the log with window functions; the
+# (Claim_ID, Event_At) index keeps per-claim scans of the log in order.
+
+from components.archival import history_reader
+from components.query_metrics import timed_read_sql
+
+# Same format as the loaded claim timestamps, with millisecond precision
+EVENT_TIME = "strftime('%Y-%m-%d %H:%M:%f', {value})"
+
+CREATE_EVENTS_SQL = """
+CREATE TABLE IF NOT EXISTS claim_events (
+    Event_ID INTEGER PRIMARY KEY,
+    Claim_ID INTEGER NOT NULL,
+    From_Status TEXT,
+    To_Status TEXT NOT NULL,
+    Event_At TEXT NOT NULL
+)
+"""
+
+EVENT_INDEXES = {
+    'idx_claim_events_claim': ('Claim_ID', 'Event_At'),
+    'idx_claim_events_status': ('To_Status', 'Event_At'),
+}
+
+# Grouping name -> (key expression, label expression) over claims c, food_listings f, providers p
+GROUPINGS = {
+    'provider': ('f.Provider_ID', 'p.Name'),
+    'city': ('f.Location', 'f.Location'),
+    'food_type': ('f.Food_Type', 'f.Food_Type'),
+}
+
+PERCENTILES = (0.5, 0.9, 0.95)
+
+
+def _trigger_sql():
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS claims_event_insert AFTER INSERT ON claims
+        BEGIN
+            INSERT INTO claim_events (Claim_ID, From_Status, To_Status, Event_At)
+            VALUES (NEW.Claim_ID, NULL, NEW.Status, {EVENT_TIME.format(value='NEW.Timestamp')});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS claims_event_status AFTER UPDATE OF Status ON claims
+        WHEN OLD.Status IS NOT NEW.Status
+        BEGIN
+            INSERT INTO claim_events (Claim_ID, From_Status, To_Status, Event_At)
+            VALUES (NEW.Claim_ID, OLD.Status, NEW.Status, {EVENT_TIME.format(value="'now', 'localtime'")});
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS claim_events_no_update BEFORE UPDATE ON claim_events
+        BEGIN
+            SELECT RAISE(ABORT, 'claim_events is append-only');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS claim_events_no_delete BEFORE DELETE ON claim_events
+        BEGIN
+            SELECT RAISE(ABORT, 'claim_events is append-only');
+        END
+        """,
+    ]
+
+
+# Seed the log with one event per existing claim: its current status at its timestamp.
+# Earlier transitions of loaded claims were never recorded, so they have no durations.
+def _seed_claim_events(conn):
+    conn.execute(f"""
+        INSERT INTO claim_events (Claim_ID, From_Status, To_Status, Event_At)
+        SELECT Claim_ID, NULL, Status, {EVENT_TIME.format(value='Timestamp')}
+        FROM claims ORDER BY Timestamp
+    """)
+    conn.commit()
+
+
+# Create the log, its indexes and triggers; seed it when new.
+# Pass rebuild=True after the claims table has been reloaded, which drops the old history.
+def ensure_claim_events(conn, rebuild=False):
+    if rebuild:
+        conn.execute("DROP TABLE IF EXISTS claim_events")
+    conn.execute(CREATE_EVENTS_SQL)
+    for name, columns in EVENT_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON claim_events ({', '.join(columns)})")
+    for statement in _trigger_sql():
+        conn.execute(statement)
+    conn.commit()
+
+    if conn.execute("SELECT 1 FROM claim_events LIMIT 1").fetchone() is None:
+        _seed_claim_events(conn)
+
+
+# Nearest-rank position of percentile p among n rows, i.e. ceil(p * n)
+def _rank_sql(p, n):
+    return f"(CAST({p} * {n} AS INTEGER) + ({p} * {n} > CAST({p} * {n} AS INTEGER)))"
+
+
+# Hours from creation to first completion per claim, with percentiles per group ranked by
+# window functions. Claims created already completed (seeded history) have no duration.
+# The event log keeps archived claims, so they are joined through a history connection.
+def load_completion_times(conn, grouping='provider', min_claims=1):
+    key, label = GROUPINGS[grouping]
+    percentile_columns = ",\n".join(
+        f"MAX(CASE WHEN Position = {_rank_sql(p, 'Total')} THEN Hours END) AS P{int(p * 100)}_Hours"
+        for p in PERCENTILES
+    )
+    sql = f"""
+        WITH durations AS (
+            SELECT Claim_ID,
+                   (julianday(MIN(CASE WHEN To_Status = 'Completed' THEN Event_At END))
+                    - julianday(MIN(Event_At))) * 24 AS Hours
+            FROM claim_events
+            GROUP BY Claim_ID
+        ),
+        grouped AS (
+            SELECT {key} AS Group_Key, {label} AS Label, d.Hours,
+                   ROW_NUMBER() OVER by_hours AS Position,
+                   COUNT(*) OVER (by_hours ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS Total
+            FROM durations d
+            JOIN claims c ON c.Claim_ID = d.Claim_ID
+            JOIN food_listings f ON f.Food_ID = c.Food_ID
+            LEFT JOIN providers p ON p.Provider_ID = f.Provider_ID
+            WHERE d.Hours > 0
+            -- One window definition, so the rows are sorted once for both
+            WINDOW by_hours AS (PARTITION BY {key} ORDER BY d.Hours)
+        )
+        SELECT MAX(Label) AS {grouping.title()}, MAX(Total) AS Completed_Claims,
+               ROUND(AVG(Hours), 2) AS Mean_Hours,
+               {percentile_columns}
+        FROM grouped
+        GROUP BY Group_Key
+        HAVING MAX(Total) >= ?
+        ORDER BY Completed_Claims DESC, P50_Hours
+    """
+    with history_reader(conn) as history:
+        times = timed_read_sql(history, sql, [min_claims], label=f"claim_events:completion_{grouping}")
+    return times.round(2)
+
+
+# How long claims stay in each status before moving on, and how many are still in it
+def load_status_durations(conn):
+    sql = """
+        WITH spans AS (
+            SELECT To_Status AS Status, Event_At,
+                   LEAD(Event_At) OVER (PARTITION BY Claim_ID ORDER BY Event_At, Event_ID) AS Next_At
+            FROM claim_events
+        )
+        SELECT Status,
+               COUNT(Next_At) AS Transitions,
+               SUM(Next_At IS NULL) AS Current_Claims,
+               ROUND(AVG((julianday(Next_At) - julianday(Event_At)) * 24), 2) AS Mean_Hours_Before_Change,
+               ROUND(MAX((julianday(Next_At) - julianday(Event_At)) * 24), 2) AS Max_Hours_Before_Change
+        FROM spans
+        GROUP BY Status
+        ORDER BY Status
+    """
+    return timed_read_sql(conn, sql, label="claim_events:status_durations")
@@ -0,0 +1,185 @@
+# Partial-quantity claims reserved against remaining stock
+# Each listing tracks Remaining_Quantity and each claim its Claimed_Quantity. A claim
+# reserves stock with one conditional UPDATE (... WHERE Remaining_Quantity >= ?) inside a
+# write transaction, so concurrent claims on the same listing can never over-allocate.
+# Triggers give the stock back when a claim is cancelled and take it again if reopened.
+# PostgreSQL has none of the SQLite triggers: set_claim_status moves the stock itself, and
+# new Claim_IDs come from an identity column rather than MAX() + 1.
+
+from datetime import datetime
+
+import pandas as pd
+
+from components.archival import ensure_archived_keys
+from components.query_metrics import timed_execute
+from components.storage import connection_dialect
+
+RESERVATION_INDEXES = {
+    'idx_food_listings_food': ('food_listings', 'Food_ID'),
+    'idx_claims_claim': ('claims', 'Claim_ID'),
+}
+
+RESERVATION_TRIGGER_NAMES = ('claims_quantity_release', 'claims_quantity_reopen')
+
+RESERVATION_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS claims_quantity_release
+    AFTER UPDATE OF Status ON claims
+    WHEN OLD.Status != 'Cancelled' AND NEW.Status = 'Cancelled' AND NEW.Claimed_Quantity IS NOT NULL
+    BEGIN
+        UPDATE food_listings SET Remaining_Quantity = Remaining_Quantity + NEW.Claimed_Quantity
+        WHERE Food_ID = NEW.Food_ID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS claims_quantity_reopen
+    BEFORE UPDATE OF Status ON claims
+    WHEN OLD.Status = 'Cancelled' AND NEW.Status != 'Cancelled' AND NEW.Claimed_Quantity IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, 'Not enough quantity left to reopen this claim')
+        WHERE (SELECT Remaining_Quantity FROM food_listings WHERE Food_ID = NEW.Food_ID) < NEW.Claimed_Quantity;
+        UPDATE food_listings SET Remaining_Quantity = Remaining_Quantity - NEW.Claimed_Quantity
+        WHERE Food_ID = NEW.Food_ID;
+    END
+    """,
+]
+
+
+# Add the quantity columns to freshly loaded frames. Loaded claims predate partial
+# claims, so their claimed quantity is unknown (NULL) and reserves nothing.
+def add_quantity_columns(food_listings, claims):
+    claims['Claimed_Quantity'] = pd.Series(pd.NA, index=claims.index, dtype='Int64')
+    food_listings['Remaining_Quantity'] = food_listings['Quantity']
+    return food_listings, claims
+
+
+# Migrate an existing database: add and backfill the columns, index the hot lookups, add triggers
+def ensure_claim_quantities(conn):
+    for table, column in (('food_listings', 'Remaining_Quantity'), ('claims', 'Claimed_Quantity')):
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN "{column}" INTEGER')
+
+    conn.execute("""
+        UPDATE food_listings
+        SET Remaining_Quantity = Quantity - COALESCE((
+            SELECT SUM(c.Claimed_Quantity) FROM claims c
+            WHERE c.Food_ID = food_listings.Food_ID AND c.Status != 'Cancelled'
+        ), 0)
+        WHERE Remaining_Quantity IS NULL
+    """)
+    for name, (table, column) in RESERVATION_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+    for statement in RESERVATION_TRIGGERS_SQL:
+        conn.execute(statement)
+    conn.commit()
+    ensure_archived_keys(conn)
+
+
+# PostgreSQL: primary key plus identity on claims.Claim_ID, continuing after the loaded IDs.
+# Tables loaded with to_sql have neither, so concurrent reservations could share an ID.
+def ensure_claim_ids(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT is_identity FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'claims' AND column_name = 'Claim_ID'
+        """)
+        row = cursor.fetchone()
+        if row is None or row[0] == 'YES':
+            return
+        cursor.execute('ALTER TABLE claims ADD PRIMARY KEY ("Claim_ID")')
+        cursor.execute('ALTER TABLE claims ALTER COLUMN "Claim_ID" ADD GENERATED BY DEFAULT AS IDENTITY')
+        cursor.execute("""
+            SELECT setval(pg_get_serial_sequence('claims', 'Claim_ID'), COALESCE(MAX("Claim_ID"), 0) + 1, false)
+            FROM claims
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# Reserve quantity units of a listing and record the claim atomically.
+# Returns the new Claim_ID, or None when not enough stock is left.
+def reserve_claim(conn, food_id, receiver_id, quantity, timestamp=None):
+    if quantity <= 0:
+        raise ValueError("Claimed quantity must be positive")
+    timestamp = timestamp or datetime.now().isoformat()
+
+    cursor = conn.cursor()
+    try:
+        if connection_dialect(conn) == 'sqlite':
+            # Take the write lock up front; waiting writers queue on the busy timeout
+            cursor.execute("BEGIN IMMEDIATE")
+        timed_execute(cursor, """
+            UPDATE food_listings SET Remaining_Quantity = Remaining_Quantity - ?
+            WHERE Food_ID = ? AND Remaining_Quantity >= ?
+        """, (quantity, food_id, quantity), label="claims:reserve")
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return None
+
+        if connection_dialect(conn) == 'sqlite':
+            # MAX() + 1 is safe under the write lock taken above; archived IDs are never reused
+            timed_execute(cursor, """
+                SELECT MAX(COALESCE((SELECT MAX(Claim_ID) FROM claims), 0),
+                           COALESCE((SELECT Max_Key FROM archived_key_max WHERE Table_Name = 'claims'), 0)) + 1
+            """, label="claims:next_id")
+            claim_id = cursor.fetchone()[0]
+            timed_execute(cursor, """
+                INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (claim_id, food_id, receiver_id, 'Pending', timestamp, quantity), label="claims:insert")
+        else:
+            # Concurrent transactions would all read the same MAX(); the identity column doesn't
+            timed_execute(cursor, """
+                INSERT INTO claims (Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity)
+                VALUES (?, ?, ?, ?, ?)
+                RETURNING Claim_ID
+            """, (food_id, receiver_id, 'Pending', timestamp, quantity), label="claims:insert")
+            claim_id = cursor.fetchone()[0]
+        conn.commit()
+        return claim_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# Change a claim's status. On SQLite the triggers above move the claimed quantity; elsewhere
+# the claim row is locked and the stock adjusted in the same transaction. Reopening without
+# enough stock left raises ValueError.
+def set_claim_status(conn, claim_id, status):
+    cursor = conn.cursor()
+    try:
+        if connection_dialect(conn) != 'sqlite':
+            timed_execute(cursor, "SELECT Status, Food_ID, Claimed_Quantity FROM claims WHERE Claim_ID = ? FOR UPDATE",
+                          (claim_id,), label="claims:lock")
+            row = cursor.fetchone()
+            if row is not None and row[2] is not None:
+                old_status, food_id, quantity = row
+                if old_status != 'Cancelled' and status == 'Cancelled':
+                    timed_execute(cursor, """
+                        UPDATE food_listings SET Remaining_Quantity = Remaining_Quantity + ? WHERE Food_ID = ?
+                    """, (quantity, food_id), label="claims:release")
+                elif old_status == 'Cancelled' and status != 'Cancelled':
+                    timed_execute(cursor, """
+                        UPDATE food_listings SET Remaining_Quantity = Remaining_Quantity - ?
+                        WHERE Food_ID = ? AND Remaining_Quantity >= ?
+                    """, (quantity, food_id, quantity), label="claims:reopen")
+                    if cursor.rowcount == 0:
+                        raise ValueError("Not enough quantity left to reopen this claim")
+        timed_execute(cursor, "UPDATE claims SET Status = ? WHERE Claim_ID = ?",
+                      (status, claim_id), label="claims:update_status")
+        updated = cursor.rowcount
+        conn.commit()
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
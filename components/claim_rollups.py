@@ -0,0 +1,149 @@
+# Time-bucketed claim rollups for trend charts
+# Claims are pre-aggregated by hour/day/week x status x city x meal type and kept
+# current by triggers on the claims table, so trend charts never scan raw claims.
+
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from components.query_metrics import timed_read_sql
+
+GRAINS = ('hour', 'day', 'week')
+
+# Bucket start for each grain; weeks start on Monday
+BUCKET_SQL = {
+    'hour': "strftime('%Y-%m-%d %H:00:00', {ts})",
+    'day': "date({ts})",
+    'week': "date({ts}, 'weekday 0', '-6 days')",
+}
+
+CREATE_ROLLUPS_SQL = """
+CREATE TABLE IF NOT EXISTS claim_rollups (
+    Grain TEXT NOT NULL,
+    Bucket_Start TEXT NOT NULL,
+    Status TEXT NOT NULL,
+    City TEXT NOT NULL,
+    Meal_Type TEXT NOT NULL,
+    Claim_Count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (Grain, Bucket_Start, Status, City, Meal_Type)
+) WITHOUT ROWID
+"""
+
+
+def _bucket_case(ts):
+    whens = " ".join(f"WHEN '{grain}' THEN {BUCKET_SQL[grain].format(ts=ts)}" for grain in GRAINS)
+    return f"CASE g.Grain {whens} END"
+
+
+def _grains_table():
+    return " UNION ALL ".join(f"SELECT '{grain}' AS Grain" for grain in GRAINS)
+
+
+# Upsert statement adding `delta` claims for the NEW or OLD row of a trigger
+def _upsert_for(row, delta):
+    return f"""
+        INSERT INTO claim_rollups (Grain, Bucket_Start, Status, City, Meal_Type, Claim_Count)
+        SELECT g.Grain, {_bucket_case(f'{row}.Timestamp')}, {row}.Status,
+               COALESCE(f.Location, 'Unknown'), COALESCE(f.Meal_Type, 'Unknown'), {delta}
+        FROM ({_grains_table()}) g
+        LEFT JOIN food_listings f ON f.Food_ID = {row}.Food_ID
+        WHERE 1
+        ON CONFLICT (Grain, Bucket_Start, Status, City, Meal_Type)
+        DO UPDATE SET Claim_Count = Claim_Count + excluded.Claim_Count;
+    """
+
+
+def _trigger_sql():
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS claims_rollup_insert AFTER INSERT ON claims
+        BEGIN
+            {_upsert_for('NEW', 1)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS claims_rollup_update
+        AFTER UPDATE OF Status, Food_ID, Timestamp ON claims
+        BEGIN
+            {_upsert_for('OLD', -1)}
+            {_upsert_for('NEW', 1)}
+        END
+        """,
+    ]
+
+
+# Recompute every rollup bucket from the claims table
+def rebuild_claim_rollups(conn):
+    conn.execute("DELETE FROM claim_rollups")
+    conn.execute(f"""
+        INSERT INTO claim_rollups (Grain, Bucket_Start, Status, City, Meal_Type, Claim_Count)
+        SELECT g.Grain, {_bucket_case('c.Timestamp')} AS Bucket_Start, c.Status,
+               COALESCE(f.Location, 'Unknown'), COALESCE(f.Meal_Type, 'Unknown'), COUNT(*)
+        FROM claims c
+        CROSS JOIN ({_grains_table()}) g
+        LEFT JOIN food_listings f ON f.Food_ID = c.Food_ID
+        GROUP BY g.Grain, Bucket_Start, c.Status, f.Location, f.Meal_Type
+    """)
+    conn.commit()
+
+
+# Create the rollup table and its triggers; backfill when the table is new.
+# Pass rebuild=True after the claims table has been reloaded.
+def ensure_claim_rollups(conn, rebuild=False):
+    conn.execute(CREATE_ROLLUPS_SQL)
+    for statement in _trigger_sql():
+        conn.execute(statement)
+    conn.commit()
+
+    empty = conn.execute("SELECT 1 FROM claim_rollups LIMIT 1").fetchone() is None
+    if rebuild or empty:
+        rebuild_claim_rollups(conn)
+
+
+# Pick the finest grain that keeps the chart under max_points buckets
+def choose_grain(start, end, max_points=400):
+    days = (end - start).days + 1
+    if days * 24 <= max_points:
+        return 'hour'
+    if days <= max_points:
+        return 'day'
+    return 'week'
+
+
+def _bucket_floor(day, grain):
+    if grain == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+# Claims per bucket and status between two dates (inclusive), read from the rollups
+def load_claim_trend(conn, start, end, grain=None, city=None, meal_type=None):
+    grain = grain or choose_grain(start, end)
+    sql = """
+        SELECT Bucket_Start, Status, SUM(Claim_Count) AS Claims
+        FROM claim_rollups
+        WHERE Grain = ? AND Bucket_Start >= ? AND Bucket_Start < ?
+    """
+    params = [grain, _bucket_floor(start, grain).isoformat(), (end + timedelta(days=1)).isoformat()]
+    if city:
+        sql += " AND City = ?"
+        params.append(city)
+    if meal_type:
+        sql += " AND Meal_Type = ?"
+        params.append(meal_type)
+    sql += " GROUP BY Bucket_Start, Status HAVING SUM(Claim_Count) > 0 ORDER BY Bucket_Start"
+
+    trend = timed_read_sql(conn, sql, params, label=f"claim_trend:{grain}")
+    trend['Bucket_Start'] = pd.to_datetime(trend['Bucket_Start'])
+    return trend, grain
+
+
+# First and last day covered by the rollups, for the date range picker
+def claim_date_range(conn):
+    first, last = conn.execute(
+        "SELECT MIN(Bucket_Start), MAX(Bucket_Start) FROM claim_rollups WHERE Grain = 'day'"
+    ).fetchone()
+    if first is None:
+        today = date.today()
+        return today, today
+    return datetime.fromisoformat(first).date(), datetime.fromisoformat(last).date()
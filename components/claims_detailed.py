@@ -0,0 +1,178 @@
+# Denormalized claims read model for the View Claims tab
+# claims_detailed holds one row per claim with the listing's food name and quantity and
+# the receiver's name already joined in. Triggers on claims, food_listings and receivers
+# keep it current, so the tab reads one page at a time without joining the base tables.
+# Pages are picked from the (Status, Timestamp) / (Timestamp) indexes, which cover the
+# page query's filter and sort since every index carries the Claim_ID rowid.
+
+from components.query_metrics import timed_read_sql
+
+PAGE_SIZE = 50
+
+CREATE_DETAILED_SQL = """
+CREATE TABLE IF NOT EXISTS claims_detailed (
+    Claim_ID INTEGER PRIMARY KEY,
+    Food_ID INTEGER,
+    Receiver_ID INTEGER,
+    Food_Name TEXT,
+    Quantity INTEGER,
+    Claimed_Quantity INTEGER,
+    Receiver_Name TEXT,
+    Status TEXT,
+    Timestamp TEXT
+)
+"""
+
+DETAILED_INDEXES = {
+    'idx_claims_detailed_status': ('Status', 'Timestamp'),
+    'idx_claims_detailed_time': ('Timestamp',),
+    'idx_claims_detailed_food': ('Food_ID',),
+    'idx_claims_detailed_receiver': ('Receiver_ID',),
+}
+
+# One detailed row per claim; claims whose listing or receiver is missing keep NULL names
+DETAILED_SELECT = """
+    SELECT c.Claim_ID, c.Food_ID, c.Receiver_ID, f.Food_Name, f.Quantity, c.Claimed_Quantity,
+           r.Name AS Receiver_Name, c.Status, c.Timestamp
+    FROM claims c
+    LEFT JOIN food_listings f ON f.Food_ID = c.Food_ID
+    LEFT JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+"""
+
+# Sort option -> ORDER BY over claims_detailed
+ORDERINGS = {
+    'Newest first': 'Timestamp DESC, Claim_ID DESC',
+    'Oldest first': 'Timestamp, Claim_ID',
+    'Claim ID': 'Claim_ID',
+}
+
+
+def _claim_row_sql(row):
+    return f"""
+        INSERT OR REPLACE INTO claims_detailed
+        SELECT {row}.Claim_ID, {row}.Food_ID, {row}.Receiver_ID,
+               (SELECT Food_Name FROM food_listings WHERE Food_ID = {row}.Food_ID),
+               (SELECT Quantity FROM food_listings WHERE Food_ID = {row}.Food_ID),
+               {row}.Claimed_Quantity,
+               (SELECT Name FROM receivers WHERE Receiver_ID = {row}.Receiver_ID),
+               {row}.Status, {row}.Timestamp;
+    """
+
+
+# Refresh the denormalized columns of every claim pointing at the OLD or NEW key
+def _refresh_listing_sql(keys):
+    return f"""
+        UPDATE claims_detailed
+        SET Food_Name = (SELECT Food_Name FROM food_listings WHERE Food_ID = claims_detailed.Food_ID),
+            Quantity = (SELECT Quantity FROM food_listings WHERE Food_ID = claims_detailed.Food_ID)
+        WHERE Food_ID IN ({keys});
+    """
+
+
+def _refresh_receiver_sql(keys):
+    return f"""
+        UPDATE claims_detailed
+        SET Receiver_Name = (SELECT Name FROM receivers WHERE Receiver_ID = claims_detailed.Receiver_ID)
+        WHERE Receiver_ID IN ({keys});
+    """
+
+
+def _trigger_sql():
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS claims_detailed_insert AFTER INSERT ON claims
+        BEGIN
+            {_claim_row_sql('NEW')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS claims_detailed_update AFTER UPDATE ON claims
+        BEGIN
+            DELETE FROM claims_detailed WHERE Claim_ID = OLD.Claim_ID;
+            {_claim_row_sql('NEW')}
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS claims_detailed_delete AFTER DELETE ON claims
+        BEGIN
+            DELETE FROM claims_detailed WHERE Claim_ID = OLD.Claim_ID;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS food_listings_detailed_insert AFTER INSERT ON food_listings
+        BEGIN
+            {_refresh_listing_sql('NEW.Food_ID')}
+        END
+        """,
+        # Stock changes (Remaining_Quantity) on every claim don't touch the read model
+        f"""
+        CREATE TRIGGER IF NOT EXISTS food_listings_detailed_update
+        AFTER UPDATE OF Food_ID, Food_Name, Quantity ON food_listings
+        BEGIN
+            {_refresh_listing_sql('OLD.Food_ID, NEW.Food_ID')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS food_listings_detailed_delete AFTER DELETE ON food_listings
+        BEGIN
+            {_refresh_listing_sql('OLD.Food_ID')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS receivers_detailed_insert AFTER INSERT ON receivers
+        BEGIN
+            {_refresh_receiver_sql('NEW.Receiver_ID')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS receivers_detailed_update AFTER UPDATE OF Receiver_ID, Name ON receivers
+        BEGIN
+            {_refresh_receiver_sql('OLD.Receiver_ID, NEW.Receiver_ID')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS receivers_detailed_delete AFTER DELETE ON receivers
+        BEGIN
+            {_refresh_receiver_sql('OLD.Receiver_ID')}
+        END
+        """,
+    ]
+
+
+# Create the read model, its indexes and triggers; fill it when new.
+# Pass rebuild=True after the base tables have been reloaded.
+def ensure_claims_detailed(conn, rebuild=False):
+    if rebuild:
+        conn.execute("DROP TABLE IF EXISTS claims_detailed")
+    conn.execute(CREATE_DETAILED_SQL)
+    for name, columns in DETAILED_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON claims_detailed ({', '.join(columns)})")
+    for statement in _trigger_sql():
+        conn.execute(statement)
+
+    if conn.execute("SELECT 1 FROM claims_detailed LIMIT 1").fetchone() is None:
+        conn.execute(f"INSERT OR REPLACE INTO claims_detailed {DETAILED_SELECT}")
+    conn.commit()
+
+
+# One page of detailed claims plus the total matching count.
+# Without the SQLite read model (e.g. PostgreSQL) the same query runs over the join.
+def load_claims_page(conn, status=None, order='Newest first', page=1, page_size=PAGE_SIZE, read_model=True):
+    source = 'claims_detailed' if read_model else f"({DETAILED_SELECT}) claims_detailed"
+    where, params = ("WHERE Status = ?", [status]) if status else ("", [])
+
+    total = timed_read_sql(conn, f"SELECT COUNT(*) AS Total FROM {source} {where}", params,
+                           label="claims_detailed:count")['Total'].iloc[0]
+    # Page through the index first, then fetch only that page's rows
+    sql = f"""
+        SELECT Claim_ID, Food_Name, Quantity, Claimed_Quantity, Receiver_Name, Status, Timestamp
+        FROM {source}
+        WHERE Claim_ID IN (
+            SELECT Claim_ID FROM {source} {where}
+            ORDER BY {ORDERINGS[order]}
+            LIMIT ? OFFSET ?
+        )
+        ORDER BY {ORDERINGS[order]}
+    """
+    rows = timed_read_sql(conn, sql, params + [page_size, (page - 1) * page_size], label="claims_detailed:page")
+    return rows, int(total)
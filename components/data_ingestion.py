@@ -1,156 +1,42 @@
 # Let's start working on the Local Food Wastage Management System project
 # Phase 1: Data Cleaning and Preprocessing
+# Run from the repository root with: python -m components.data_ingestion
 
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Let's create sample data structure based on what we saw in the screenshots
-# This will help us demonstrate the cleaning process
-
-# Create sample datasets matching the project structure
-claims_data=pd.read_csv(r"C:\Users\Venks\Desktop\Project\MLOPS_Bootcamp\Local_Food_Waste_Management\data\claims_data.csv")
-food_listings=pd.read_csv(r"C:\Users\Venks\Desktop\Project\MLOPS_Bootcamp\Local_Food_Waste_Management\data\food_listings_data.csv")
-providers_data=pd.read_csv(r"C:\Users\Venks\Desktop\Project\MLOPS_Bootcamp\Local_Food_Waste_Management\data\providers_data.csv")
-
-recievers_data=pd.read_csv(r"C:\Users\Venks\Desktop\Project\MLOPS_Bootcamp\Local_Food_Waste_Management\data\receivers_data.csv")
-
-
-print("STEP 1: DATA STRUCTURE OVERVIEW")
-print("="*50)
-print("\n1. Providers Data:")
-print(f"Shape: {providers_data.shape}")
-print(providers_data.head())
-print(f"\nData types:\n{providers_data.dtypes}")
-
-print("\n2. Receivers Data:")
-print(f"Shape: {recievers_data.shape}")
-print(recievers_data.head())
-print(f"\nData types:\n{recievers_data.dtypes}")
-
-print("\n3. Food Listings Data:")
-print(f"Shape: {food_listings.shape}")
-print(food_listings.head())
-print(f"\nData types:\n{food_listings.dtypes}")
-
-print("\n4. Claims Data:")
-print(f"Shape: {claims_data.shape}")
-print(claims_data.head())
-print(f"\nData types:\n{claims_data.dtypes}")
-
-# STEP 2: DATA CLEANING AND PREPROCESSING
-print("STEP 2: DATA CLEANING AND PREPROCESSING")
-print("="*50)
-
-# Check for missing values in all datasets
-print("\n1. MISSING VALUES CHECK:")
-print("-" * 30)
-datasets = {
-    'providers_data': providers_data,
-    'receivers_data': recievers_data,
-    'food_listings_data': food_listings,
-    'claims_data': claims_data
-}
-
-for name, df in datasets.items():
-    missing_values = df.isnull().sum()
-    if missing_values.sum() > 0:
-        print(f"\n{name} - Missing values:")
-        print(missing_values[missing_values > 0])
-    else:
-        print(f"{name}: No missing values ✓")
-
-# Check for duplicates
-print("\n2. DUPLICATE VALUES CHECK:")
-print("-" * 30)
-for name, df in datasets.items():
-    duplicates = df.duplicated().sum()
-    print(f"{name}: {duplicates} duplicate rows")
-
-# Data type validation and conversion
-print("\n3. DATA TYPE VALIDATION:")
-print("-" * 30)
-
-# Fix contact numbers formatting
-providers_data['Contact'] = providers_data['Contact'].astype(str).str.replace('.', '').str.split('e').str[0]
-recievers_data['Contact'] = recievers_data['Contact'].astype(str).str.replace('.', '').str.split('e').str[0]
-
-# Ensure proper data types
-food_listings['Expiry_Date'] = pd.to_datetime(food_listings['Expiry_Date'])
-claims_data['Timestamp'] = pd.to_datetime(claims_data['Timestamp'])
-
-print("✓ Contact numbers formatted properly")
-print("✓ Date columns converted to datetime")
-
-# Validate foreign key relationships
-print("\n4. FOREIGN KEY VALIDATION:")
-print("-" * 30)
-
-# Check if all Provider_IDs in food_listings exist in providers_data
-provider_ids_in_listings = set(food_listings['Provider_ID'].unique())
-provider_ids_in_providers = set(providers_data['Provider_ID'].unique())
-missing_providers = provider_ids_in_listings - provider_ids_in_providers
-
-if len(missing_providers) == 0:
-    print("✓ All Provider_IDs in food_listings exist in providers_data")
-else:
-    print(f"⚠ Missing Provider_IDs: {missing_providers}")
-
-# Check if all Food_IDs in claims exist in food_listings
-food_ids_in_claims = set(claims_data['Food_ID'].unique())
-food_ids_in_listings = set(food_listings['Food_ID'].unique())
-missing_food_ids = food_ids_in_claims - food_ids_in_listings
-
-if len(missing_food_ids) == 0:
-    print("✓ All Food_IDs in claims exist in food_listings")
-else:
-    print(f"⚠ Missing Food_IDs: {missing_food_ids}")
-
-# Check if all Receiver_IDs in claims exist in receivers_data
-receiver_ids_in_claims = set(claims_data['Receiver_ID'].unique())
-receiver_ids_in_receivers = set(recievers_data['Receiver_ID'].unique())
-missing_receivers = receiver_ids_in_claims - receiver_ids_in_receivers
-
-if len(missing_receivers) == 0:
-    print("✓ All Receiver_IDs in claims exist in receivers_data")
-else:
-    print(f"⚠ Missing Receiver_IDs: {missing_receivers}")
-
-print("\n5. DATA QUALITY SUMMARY:")
-print("-" * 30)
-print(f"• Providers: {len(providers_data)} records")
-print(f"• Receivers: {len(recievers_data)} records") 
-print(f"• Food Listings: {len(food_listings)} records")
-print(f"• Claims: {len(claims_data)} records")
-print(f"• Data integrity: All foreign key relationships validated ✓")
-print(f"• No missing values found ✓")
-print(f"• Data types properly formatted ✓")
-
-# STEP 3: DATABASE DESIGN AND IMPLEMENTATION
-print("STEP 3: DATABASE DESIGN AND IMPLEMENTATION")
-print("="*50)
-
-import sqlite3
-from sqlalchemy import create_engine, text
+import os
 import warnings
-warnings.filterwarnings('ignore')
 
-# Create SQLite database
-database_name = 'food_waste_management.db'
-engine = create_engine(f'sqlite:///{database_name}')
-
-print(f"\n1. DATABASE CREATION:")
-print("-" * 30)
-print(f"✓ Database '{database_name}' created successfully")
-
-# Create database tables with proper schema
-print(f"\n2. TABLE SCHEMA CREATION:")
-print("-" * 30)
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from components.address_parsing import add_address_columns, create_address_indexes
+from components.archival import archive_expired, archive_path, compact_archive, connect_history
+from components.claim_events import ensure_claim_events
+from components.claim_reservations import add_quantity_columns, ensure_claim_ids, ensure_claim_quantities
+from components.claim_rollups import ensure_claim_rollups
+from components.claims_detailed import ensure_claims_detailed
+from components.data_quality import validate_csv, print_summary
+from components.data_versions import ensure_data_versions, bump_data_versions
+from components.demand_forecasting import refresh_forecasts
+from components.entity_resolution import (
+    resolve_entities, repoint, print_resolution_summary, create_entity_indexes
+)
+from components.partitioning import PARTITION_COUNT, PARTITION_DIR, build_partitions
+from components.recommendations import build_recommendations
+from components.reconciliation import print_reconciliation, reconcile
+from components.storage import bulk_load, get_engine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Dataset name -> (CSV file, database table)
+DATASET_FILES = {
+    'providers_data': ('providers_data.csv', 'providers'),
+    'receivers_data': ('receivers_data.csv', 'receivers'),
+    'food_listings_data': ('food_listings_data.csv', 'food_listings'),
+    'claims_data': ('claims_data.csv', 'claims'),
+}
 
 # SQL commands to create tables
-create_tables_sql = """
+CREATE_TABLES_SQL = """
 -- Create Providers Table
 CREATE TABLE IF NOT EXISTS providers (
     Provider_ID INTEGER PRIMARY KEY,
@@ -161,7 +47,7 @@ CREATE TABLE IF NOT EXISTS providers (
     Contact TEXT NOT NULL
 );
 
--- Create Receivers Table  
+-- Create Receivers Table
 CREATE TABLE IF NOT EXISTS receivers (
     Receiver_ID INTEGER PRIMARY KEY,
     Name TEXT NOT NULL,
@@ -196,64 +82,283 @@ CREATE TABLE IF NOT EXISTS claims (
 );
 """
 
-# Execute table creation
-with engine.connect() as conn:
-    # Split and execute each CREATE TABLE statement
-    statements = create_tables_sql.strip().split(';')
-    for statement in statements:
-        if statement.strip() and 'CREATE TABLE' in statement:
-            conn.execute(text(statement))
-    conn.commit()
 
-print("✓ All database tables created successfully")
+# Read each CSV in chunks, validating it against the data-quality rules in the same pass.
+# Returns the clean datasets, the quarantined rows and a per-dataset rule summary.
+def load_datasets(data_dir=DATA_DIR):
+    datasets, quarantined, summaries = {}, [], []
+    for name, (filename, _) in DATASET_FILES.items():
+        clean, quarantine, summary = validate_csv(os.path.join(data_dir, filename), name)
+        datasets[name] = clean
+        quarantined.append(quarantine)
+        summaries.append(summary)
+    return datasets, pd.concat(quarantined, ignore_index=True), summaries
 
-# Import data into database
-print(f"\n3. DATA IMPORT:")
-print("-" * 30)
 
-# Import each dataset
-providers_data.to_sql('providers', engine, if_exists='replace', index=False)
-print("✓ Providers data imported")
+# STEP 1: DATA STRUCTURE OVERVIEW
+def print_overview(datasets):
+    print("STEP 1: DATA STRUCTURE OVERVIEW")
+    print("="*50)
+    titles = ['Providers Data', 'Receivers Data', 'Food Listings Data', 'Claims Data']
+    for number, (title, df) in enumerate(zip(titles, datasets.values()), start=1):
+        print(f"\n{number}. {title}:")
+        print(f"Shape: {df.shape}")
+        print(df.head())
+        print(f"\nData types:\n{df.dtypes}")
+
+
+# STEP 2: DATA CLEANING AND PREPROCESSING
+def clean_datasets(datasets, summaries):
+    print("STEP 2: DATA CLEANING AND PREPROCESSING")
+    print("="*50)
+
+    # Rule results were collected while the CSVs were read
+    print("\n1-2. DATA QUALITY RULES (not-null, uniqueness, allowed values, ranges):")
+    print("-" * 30)
+    print_summary(summaries)
+
+    # Data type validation and conversion
+    print("\n3. DATA TYPE VALIDATION:")
+    print("-" * 30)
+
+    providers_data = datasets['providers_data']
+    receivers_data = datasets['receivers_data']
+
+    # Fix contact numbers formatting
+    providers_data['Contact'] = providers_data['Contact'].astype(str).str.replace('.', '').str.split('e').str[0]
+    receivers_data['Contact'] = receivers_data['Contact'].astype(str).str.replace('.', '').str.split('e').str[0]
+
+    # Split free-text addresses into structured, indexable columns
+    add_address_columns(providers_data)
+
+    # Stock left per listing and quantity per claim, for partial claims
+    add_quantity_columns(datasets['food_listings_data'], datasets['claims_data'])
+
+    # Ensure proper data types
+    datasets['food_listings_data']['Expiry_Date'] = pd.to_datetime(datasets['food_listings_data']['Expiry_Date'])
+    datasets['claims_data']['Timestamp'] = pd.to_datetime(datasets['claims_data']['Timestamp'])
+
+    print("✓ Contact numbers formatted properly")
+    print("✓ Provider addresses parsed into street, locality, state and postal code")
+    print("✓ Remaining and claimed quantity columns added")
+    print("✓ Date columns converted to datetime")
+    return datasets
+
+
+# Merge near-duplicate providers/receivers and re-point listings and claims to the survivors
+def resolve_duplicates(datasets):
+    print("\n3b. ENTITY RESOLUTION:")
+    print("-" * 30)
+
+    provider_clusters, provider_merges = resolve_entities(
+        datasets['providers_data'], 'Provider_ID', 'provider')
+    receiver_clusters, receiver_merges = resolve_entities(
+        datasets['receivers_data'], 'Receiver_ID', 'receiver')
+    print_resolution_summary('provider', provider_clusters, provider_merges)
+    print_resolution_summary('receiver', receiver_clusters, receiver_merges)
+
+    food_listings = datasets['food_listings_data']
+    claims = datasets['claims_data']
+    food_listings['Provider_ID'] = repoint(food_listings['Provider_ID'], provider_merges)
+    claims['Receiver_ID'] = repoint(claims['Receiver_ID'], receiver_merges)
+    print("✓ Food listings and claims re-pointed to canonical providers/receivers")
+
+    return {
+        'entity_clusters': pd.concat([provider_clusters, receiver_clusters], ignore_index=True),
+        'entity_merge_map': pd.concat([provider_merges, receiver_merges], ignore_index=True),
+    }
+
+
+def _check_references(child, child_name, parent, parent_name, column):
+    missing = set(child[column].unique()) - set(parent[column].unique())
+    if len(missing) == 0:
+        print(f"✓ All {column}s in {child_name} exist in {parent_name}")
+    else:
+        print(f"⚠ Missing {column}s: {missing}")
+    return missing
+
+
+# Validate foreign key relationships
+def validate_foreign_keys(datasets):
+    print("\n4. FOREIGN KEY VALIDATION:")
+    print("-" * 30)
+
+    missing = _check_references(datasets['food_listings_data'], 'food_listings',
+                                datasets['providers_data'], 'providers_data', 'Provider_ID')
+    missing |= _check_references(datasets['claims_data'], 'claims',
+                                 datasets['food_listings_data'], 'food_listings', 'Food_ID')
+    missing |= _check_references(datasets['claims_data'], 'claims',
+                                 datasets['receivers_data'], 'receivers_data', 'Receiver_ID')
+    return len(missing) == 0
+
+
+def print_quality_summary(datasets, foreign_keys_valid, quarantine):
+    print("\n5. DATA QUALITY SUMMARY:")
+    print("-" * 30)
+    print(f"• Providers: {len(datasets['providers_data'])} records")
+    print(f"• Receivers: {len(datasets['receivers_data'])} records")
+    print(f"• Food Listings: {len(datasets['food_listings_data'])} records")
+    print(f"• Claims: {len(datasets['claims_data'])} records")
+    if foreign_keys_valid:
+        print(f"• Data integrity: All foreign key relationships validated ✓")
+    else:
+        print(f"• Data integrity: Some foreign key references are missing ⚠")
+    if len(quarantine) == 0:
+        print(f"• All rows passed the data-quality rules ✓")
+    else:
+        print(f"• {len(quarantine)} rows failed data-quality rules and were quarantined ⚠")
+    print(f"• Data types properly formatted ✓")
+
+
+# STEP 3: DATABASE DESIGN AND IMPLEMENTATION
+# database_name is a SQLite path or a database URL; defaults to DATABASE_URL
+def create_database(database_name=None):
+    print("STEP 3: DATABASE DESIGN AND IMPLEMENTATION")
+    print("="*50)
+    warnings.filterwarnings('ignore')
+
+    # Create the database (a SQLite file unless DATABASE_URL points elsewhere)
+    engine = get_engine(database_name)
+
+    print(f"\n1. DATABASE CREATION:")
+    print("-" * 30)
+    print(f"✓ Database '{engine.url.database}' created successfully")
+
+    # Create database tables with proper schema
+    print(f"\n2. TABLE SCHEMA CREATION:")
+    print("-" * 30)
+
+    # Execute table creation
+    with engine.connect() as conn:
+        # Split and execute each CREATE TABLE statement
+        statements = CREATE_TABLES_SQL.strip().split(';')
+        for statement in statements:
+            if statement.strip() and 'CREATE TABLE' in statement:
+                if engine.dialect.name != 'sqlite':
+                    statement = statement.replace('DATETIME', 'TIMESTAMP')
+                conn.execute(text(statement))
+        conn.commit()
+
+    print("✓ All database tables created successfully")
+    return engine
 
-recievers_data.to_sql('receivers', engine, if_exists='replace', index=False)
-print("✓ Receivers data imported")
 
-food_listings.to_sql('food_listings', engine, if_exists='replace', index=False)
-print("✓ Food listings data imported")
+# Import data into database
+# derived_tables holds the quarantine and entity-resolution outputs, keyed by table name
+def import_data(engine, datasets, derived_tables):
+    print(f"\n3. DATA IMPORT:")
+    print("-" * 30)
+
+    labels = ['Providers data', 'Receivers data', 'Food listings data', 'Claims data']
+    for label, (name, (_, table)) in zip(labels, DATASET_FILES.items()):
+        bulk_load(engine, datasets[name], table)
+        print(f"✓ {label} imported")
+
+    for table, df in derived_tables.items():
+        bulk_load(engine, df, table)
+        print(f"✓ {len(df)} rows stored in '{table}'")
+
+    # Recreate derived tables, triggers and indexes; replacing a table drops them.
+    # Rollups and data versions are maintained by SQLite triggers.
+    sqlite = engine.dialect.name == 'sqlite'
+    conn = engine.raw_connection()
+    if sqlite:
+        ensure_claim_rollups(conn, rebuild=True)
+        print("✓ Claim rollups rebuilt")
+        ensure_claim_events(conn, rebuild=True)
+        print("✓ Claim event log reset to the loaded claims")
+        ensure_claim_quantities(conn)
+        print("✓ Quantity reservation indexes and triggers created")
+        ensure_claims_detailed(conn, rebuild=True)
+        print("✓ Claims read model rebuilt")
+        # The reload brought archived rows back into the hot tables; move them out again
+        # and merge the re-written parts, before anything reads hot + archive
+        if os.path.exists(archive_path(engine.url.database)):
+            totals = archive_expired(conn)
+            compact_archive(archive_path(engine.url.database))
+            print(f"✓ {totals['food_listings']} expired listings re-archived")
+        refresh_forecasts(conn)
+        print("✓ Demand forecasts refreshed")
+        build_recommendations(conn)
+        print("✓ Receiver recommendations rebuilt")
+    else:
+        ensure_claim_ids(conn)
+        print("✓ Claim_ID primary key and identity created")
+    create_address_indexes(conn)
+    print("✓ Provider state/postal code indexes created")
+    create_entity_indexes(conn)
+    if sqlite:
+        # Invalidate anything cached against the previous load (e.g. generated reports)
+        ensure_data_versions(conn)
+        bump_data_versions(conn)
+    conn.close()
 
-claims_data.to_sql('claims', engine, if_exists='replace', index=False)
-print("✓ Claims data imported")
 
 # Verify data import
-print(f"\n4. DATA VERIFICATION:")
-print("-" * 30)
-
-with engine.connect() as conn:
-    # Check record counts
-    providers_count = conn.execute(text("SELECT COUNT(*) FROM providers")).fetchone()[0]
-    receivers_count = conn.execute(text("SELECT COUNT(*) FROM receivers")).fetchone()[0]
-    food_listings_count = conn.execute(text("SELECT COUNT(*) FROM food_listings")).fetchone()[0]
-    claims_count = conn.execute(text("SELECT COUNT(*) FROM claims")).fetchone()[0]
-    
-    print(f"Providers table: {providers_count} records")
-    print(f"Receivers table: {receivers_count} records") 
-    print(f"Food_listings table: {food_listings_count} records")
-    print(f"Claims table: {claims_count} records")
-
-print(f"\n5. DATABASE STRUCTURE:")
-print("-" * 30)
-
-# Display table structures
-with engine.connect() as conn:
-    # Get table info
+def verify_database(engine):
+    print(f"\n4. DATA VERIFICATION:")
+    print("-" * 30)
+
     tables = ['providers', 'receivers', 'food_listings', 'claims']
-    for table in tables:
-        result = conn.execute(text(f"PRAGMA table_info({table})")).fetchall()
-        print(f"\n{table.upper()} TABLE STRUCTURE:")
-        for row in result:
-            print(f"  {row[1]} ({row[2]}) - {'PRIMARY KEY' if row[5] else 'NOT NULL' if row[3] else 'NULLABLE'}")
+    with engine.connect() as conn:
+        # Check record counts
+        for table in tables:
+            count = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).fetchone()[0]
+            print(f"{table.capitalize()} table: {count} records")
 
-print(f"\n✓ Database setup completed successfully!")
-print(f"✓ All tables created with proper relationships.")
-print(f"✓ Data imported and verified..")
+    print(f"\n5. DATABASE STRUCTURE:")
+    print("-" * 30)
 
+    # Display table structures
+    inspector = inspect(engine)
+    for table in tables:
+        primary_key = inspector.get_pk_constraint(table)['constrained_columns']
+        print(f"\n{table.upper()} TABLE STRUCTURE:")
+        for column in inspector.get_columns(table):
+            constraint = ('PRIMARY KEY' if column['name'] in primary_key
+                          else 'NULLABLE' if column['nullable'] else 'NOT NULL')
+            print(f"  {column['name']} ({column['type']}) - {constraint}")
+
+
+# Row counts alone miss changed values; compare per-key-range checksums of what was loaded
+def reconcile_database(engine, datasets):
+    print(f"\n6. RECONCILIATION (CSV vs DATABASE):")
+    print("-" * 30)
+    # On SQLite include archived rows, which were loaded from the same CSVs
+    conn = connect_history(engine.url.database) if engine.dialect.name == 'sqlite' else engine.raw_connection()
+    try:
+        print_reconciliation(reconcile(conn, {table: datasets[name] for name, (_, table) in DATASET_FILES.items()}))
+    finally:
+        conn.close()
+
+
+# The datasets exactly as they are loaded: read, validated, cleaned and de-duplicated
+def prepare_datasets(data_dir=DATA_DIR):
+    datasets, quarantine, summaries = load_datasets(data_dir)
+    print_overview(datasets)
+    clean_datasets(datasets, summaries)
+    entity_tables = resolve_duplicates(datasets)
+    return datasets, quarantine, entity_tables
+
+
+def main(data_dir=DATA_DIR, database_name=None):
+    datasets, quarantine, entity_tables = prepare_datasets(data_dir)
+    foreign_keys_valid = validate_foreign_keys(datasets)
+    print_quality_summary(datasets, foreign_keys_valid, quarantine)
+
+    engine = create_database(database_name)
+    import_data(engine, datasets, {'quarantine': quarantine, **entity_tables})
+    verify_database(engine)
+    reconcile_database(engine, datasets)
+
+    # Optional region-partitioned copy of listings and claims (PARTITION_COUNT > 0, SQLite only)
+    if PARTITION_COUNT > 0 and engine.dialect.name == 'sqlite':
+        build_partitions(engine.url.database, PARTITION_DIR, PARTITION_COUNT)
+
+    print(f"\n✓ Database setup completed successfully!")
+    print(f"✓ All tables created with proper relationships.")
+    print(f"✓ Data imported and verified..")
+
+
+if __name__ == "__main__":
+    main()
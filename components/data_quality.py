@@ -0,0 +1,145 @@
+# Declarative data-quality rules for the ingestion feeds
+# All rules for a dataset are evaluated together on each CSV chunk as vectorized
+# column operations, so validation is one scan of the data however many rules exist.
+# Rows failing any rule are routed to a quarantine frame tagged with the failed rule IDs.
+
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+CHUNKSIZE = 100_000
+
+# check is one of: not_null, unique, allowed_values, positive, valid_date, after
+Rule = namedtuple('Rule', ['rule_id', 'dataset', 'check', 'columns', 'params'])
+Rule.__new__.__defaults__ = (None,)
+
+FOOD_TYPES = ('Vegetarian', 'Non-Vegetarian', 'Vegan')
+MEAL_TYPES = ('Breakfast', 'Lunch', 'Dinner', 'Snacks')
+CLAIM_STATUSES = ('Pending', 'Completed', 'Cancelled')
+
+RULES = [
+    Rule('providers.not_null', 'providers_data', 'not_null',
+         ('Provider_ID', 'Name', 'Type', 'Address', 'City', 'Contact')),
+    Rule('providers.unique_id', 'providers_data', 'unique', ('Provider_ID',)),
+
+    Rule('receivers.not_null', 'receivers_data', 'not_null',
+         ('Receiver_ID', 'Name', 'Type', 'City', 'Contact')),
+    Rule('receivers.unique_id', 'receivers_data', 'unique', ('Receiver_ID',)),
+
+    Rule('food_listings.not_null', 'food_listings_data', 'not_null',
+         ('Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Provider_ID',
+          'Provider_Type', 'Location', 'Food_Type', 'Meal_Type')),
+    Rule('food_listings.unique_id', 'food_listings_data', 'unique', ('Food_ID',)),
+    Rule('food_listings.positive_quantity', 'food_listings_data', 'positive', ('Quantity',)),
+    Rule('food_listings.food_type', 'food_listings_data', 'allowed_values', ('Food_Type',), FOOD_TYPES),
+    Rule('food_listings.meal_type', 'food_listings_data', 'allowed_values', ('Meal_Type',), MEAL_TYPES),
+    Rule('food_listings.expiry_date', 'food_listings_data', 'valid_date', ('Expiry_Date',)),
+    # Only evaluated for feeds that carry a listing date
+    Rule('food_listings.expiry_after_listing', 'food_listings_data', 'after', ('Expiry_Date', 'Listing_Date')),
+
+    Rule('claims.not_null', 'claims_data', 'not_null',
+         ('Claim_ID', 'Food_ID', 'Receiver_ID', 'Status', 'Timestamp')),
+    Rule('claims.unique_id', 'claims_data', 'unique', ('Claim_ID',)),
+    Rule('claims.status', 'claims_data', 'allowed_values', ('Status',), CLAIM_STATUSES),
+    Rule('claims.timestamp', 'claims_data', 'valid_date', ('Timestamp',)),
+]
+
+
+def _dates(chunk, column, parsed):
+    # Parse each date column once per chunk, however many rules use it
+    if column not in parsed:
+        parsed[column] = pd.to_datetime(chunk[column], errors='coerce')
+    return parsed[column]
+
+
+# Boolean Series that is True where a row fails the rule
+def _failures(rule, chunk, state, parsed):
+    columns = list(rule.columns)
+    if rule.check == 'not_null':
+        return chunk[columns].isna().any(axis=1)
+    if rule.check == 'unique':
+        if len(columns) == 1:
+            keys = chunk[columns[0]]
+        else:
+            keys = pd.Series(list(zip(*(chunk[column] for column in columns))), index=chunk.index)
+        seen = state.setdefault(rule.rule_id, set())
+        failed = chunk.duplicated(subset=columns, keep='first') | keys.isin(seen)
+        seen.update(keys[~failed].tolist())
+        return failed
+    if rule.check == 'allowed_values':
+        values = chunk[columns[0]]
+        return values.notna() & ~values.isin(rule.params)
+    if rule.check == 'positive':
+        values = pd.to_numeric(chunk[columns[0]], errors='coerce')
+        return chunk[columns[0]].notna() & ~(values > 0)
+    if rule.check == 'valid_date':
+        return chunk[columns[0]].notna() & _dates(chunk, columns[0], parsed).isna()
+    if rule.check == 'after':
+        later, earlier = (_dates(chunk, column, parsed) for column in columns)
+        return later.notna() & earlier.notna() & ~(later > earlier)
+    raise ValueError(f"Unknown check: {rule.check}")
+
+
+# Evaluate every applicable rule on one chunk; returns a rows x rule_id boolean frame
+def evaluate_chunk(chunk, rules, state):
+    parsed = {}
+    return pd.DataFrame(
+        {rule.rule_id: _failures(rule, chunk, state, parsed) for rule in rules},
+        index=chunk.index,
+        dtype=bool
+    )
+
+
+def validate_chunks(chunks, dataset, rules=None):
+    rules = [rule for rule in (rules or RULES) if rule.dataset == dataset]
+    state = {}
+    clean_parts, quarantine_parts = [], []
+    summary = {'dataset': dataset, 'rows': 0, 'quarantined': 0,
+               'failures': {rule.rule_id: 0 for rule in rules}, 'skipped': []}
+
+    for chunk in chunks:
+        applicable = [rule for rule in rules if set(rule.columns) <= set(chunk.columns)]
+        summary['skipped'] = [rule.rule_id for rule in rules if rule not in applicable]
+
+        failures = evaluate_chunk(chunk, applicable, state)
+        failed_rows = failures.any(axis=1)
+
+        summary['rows'] += len(chunk)
+        summary['quarantined'] += int(failed_rows.sum())
+        for rule_id, count in failures.sum().items():
+            summary['failures'][rule_id] += int(count)
+
+        clean_parts.append(chunk[~failed_rows])
+        if failed_rows.any():
+            bad = failures[failed_rows]
+            quarantine_parts.append(pd.DataFrame({
+                'Dataset': dataset,
+                'Row_Number': bad.index,
+                'Rule_IDs': bad.dot(bad.columns + ',').str.rstrip(','),
+                'Row_Data': chunk[failed_rows].to_json(
+                    orient='records', lines=True, date_format='iso').splitlines(),
+            }))
+
+    clean = pd.concat(clean_parts, ignore_index=True) if clean_parts else pd.DataFrame()
+    quarantine = (pd.concat(quarantine_parts, ignore_index=True) if quarantine_parts
+                  else pd.DataFrame(columns=['Dataset', 'Row_Number', 'Rule_IDs', 'Row_Data']))
+    quarantine['Quarantined_At'] = datetime.now().isoformat(timespec='seconds')
+    return clean, quarantine, summary
+
+
+# Read a CSV in chunks and validate it in the same pass
+def validate_csv(path, dataset, rules=None, chunksize=CHUNKSIZE):
+    return validate_chunks(pd.read_csv(path, chunksize=chunksize), dataset, rules)
+
+
+def print_summary(summaries):
+    for summary in summaries:
+        passed = summary['rows'] - summary['quarantined']
+        print(f"\n{summary['dataset']}: {passed}/{summary['rows']} rows passed, "
+              f"{summary['quarantined']} quarantined")
+        for rule_id, count in summary['failures'].items():
+            if rule_id in summary['skipped']:
+                print(f"  - {rule_id}: skipped (columns not in feed)")
+            else:
+                print(f"  {'✓' if count == 0 else '⚠'} {rule_id}: {count} failing rows")
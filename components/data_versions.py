@@ -0,0 +1,49 @@
+# Per-table data versions
+# Triggers bump a counter on every insert, update or delete, so cached results
+# (reports, charts) can be reused until the tables they read actually change.
+
+BASE_TABLES = ('providers', 'receivers', 'food_listings', 'claims')
+
+CREATE_VERSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS data_versions (
+    Table_Name TEXT PRIMARY KEY,
+    Version INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def _trigger_sql(table, event):
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table}
+        BEGIN
+            UPDATE data_versions SET Version = Version + 1 WHERE Table_Name = '{table}';
+        END
+    """
+
+
+def ensure_data_versions(conn, tables=BASE_TABLES):
+    conn.execute(CREATE_VERSIONS_SQL)
+    for table in tables:
+        conn.execute("INSERT OR IGNORE INTO data_versions (Table_Name) VALUES (?)", (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(_trigger_sql(table, event))
+    conn.commit()
+
+
+# Mark tables as changed, e.g. after a bulk reload that bypassed the triggers
+def bump_data_versions(conn, tables=BASE_TABLES):
+    conn.executemany(
+        "UPDATE data_versions SET Version = Version + 1 WHERE Table_Name = ?",
+        [(table,) for table in tables]
+    )
+    conn.commit()
+
+
+# Version string covering the given tables, e.g. "claims:12|food_listings:3"
+def data_version(conn, tables=BASE_TABLES):
+    placeholders = ", ".join("?" for _ in tables)
+    rows = conn.execute(
+        f"SELECT Table_Name, Version FROM data_versions WHERE Table_Name IN ({placeholders}) ORDER BY Table_Name",
+        tuple(tables)
+    ).fetchall()
+    return "|".join(f"{table}:{version}" for table, version in rows)
@@ -0,0 +1,198 @@
+# Batch demand forecasting per city, meal type and food type
+# Daily claim counts for every (city, meal type, food type) series are laid out as one
+# series x day matrix. Weekday profiles and simple exponential smoothing are fitted for
+# all series at once with array operations; the only Python loop is over days. The
+# smoothing constant is picked per series from a small grid by in-sample one-step error.
+# Next-14-day forecasts are stored in demand_forecasts for the Analytics page.
+# Run from the repository root with: python -m components.demand_forecasting
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from components.archival import history_reader
+from components.query_metrics import timed_read_sql
+from components.storage import sqlite_path
+
+SERIES_KEYS = ['City', 'Meal_Type', 'Food_Type']
+HORIZON_DAYS = 14
+ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+WEEKDAY_SHRINKAGE_DAYS = 28  # history needed before a series' weekday profile gets half weight
+INTERVAL_Z = 1.96
+
+CREATE_FORECASTS_SQL = """
+CREATE TABLE IF NOT EXISTS demand_forecasts (
+    City TEXT NOT NULL,
+    Meal_Type TEXT NOT NULL,
+    Food_Type TEXT NOT NULL,
+    Forecast_Date TEXT NOT NULL,
+    Forecast REAL NOT NULL,
+    Forecast_Low REAL NOT NULL,
+    Forecast_High REAL NOT NULL,
+    Alpha REAL NOT NULL,
+    Generated_At TEXT NOT NULL,
+    PRIMARY KEY (City, Meal_Type, Food_Type, Forecast_Date)
+) WITHOUT ROWID
+"""
+
+
+# Archived claims are demand history too
+def load_daily_demand(conn):
+    with history_reader(conn) as history:
+        return timed_read_sql(history, """
+            SELECT f.Location AS City, f.Meal_Type, f.Food_Type, date(c.Timestamp) AS Day, COUNT(*) AS Claims
+            FROM claims c
+            JOIN food_listings f ON f.Food_ID = c.Food_ID
+            GROUP BY f.Location, f.Meal_Type, f.Food_Type, date(c.Timestamp)
+        """, label="forecast:daily_demand")
+
+
+# Long (series, day, claims) rows -> series keys, calendar and a dense series x day matrix.
+# The calendar runs up to end_day (if later than the last claim); days without claims are zeros.
+def build_series_matrix(daily, end_day=None):
+    series_codes = daily.groupby(SERIES_KEYS, sort=True).ngroup().to_numpy()
+    keys = daily[SERIES_KEYS].drop_duplicates().sort_values(SERIES_KEYS, ignore_index=True)
+
+    days = pd.to_datetime(daily['Day'])
+    last_day = days.max() if end_day is None else max(days.max(), end_day)
+    dates = pd.date_range(days.min(), last_day, freq='D')
+    day_offsets = (days - dates[0]).dt.days.to_numpy()
+
+    flat_index = series_codes * len(dates) + day_offsets
+    matrix = np.bincount(flat_index, weights=daily['Claims'].to_numpy(dtype=float),
+                         minlength=len(keys) * len(dates)).reshape(len(keys), len(dates))
+    return keys, dates, matrix
+
+
+# Multiplicative weekday factors per series, shrunk towards flat for short histories
+def weekday_factors(matrix, dates):
+    weekday = dates.dayofweek.to_numpy()
+    days_per_weekday = np.maximum(np.bincount(weekday, minlength=7), 1)
+    weekday_means = np.stack([matrix[:, weekday == day].sum(axis=1) for day in range(7)], axis=1) / days_per_weekday
+
+    overall = matrix.mean(axis=1, keepdims=True)
+    raw = np.divide(weekday_means, overall, out=np.ones_like(weekday_means), where=overall > 0)
+    weight = len(dates) / (len(dates) + WEEKDAY_SHRINKAGE_DAYS)
+    factors = 1 + weight * (raw - 1)
+    return factors / factors.mean(axis=1, keepdims=True)
+
+
+# Simple exponential smoothing of the weekday-adjusted series for every alpha at once.
+# Returns per-series alpha, final level and one-step RMSE (on the adjusted scale).
+def fit_smoothing(adjusted):
+    series_count, day_count = adjusted.shape
+    warmup = min(7, day_count)
+    level = np.broadcast_to(adjusted[:, :warmup].mean(axis=1), (len(ALPHAS), series_count)).copy()
+    squared_error = np.zeros((len(ALPHAS), series_count))
+    step = ALPHAS[:, None]
+
+    for day in range(day_count):
+        error = adjusted[:, day] - level
+        squared_error += error ** 2
+        level += step * error
+
+    best = squared_error.argmin(axis=0)
+    series = np.arange(series_count)
+    rmse = np.sqrt(squared_error[best, series] / day_count)
+    return ALPHAS[best], level[best, series], rmse
+
+
+# Forecast every series for the horizon days starting today. History is padded with
+# zero-demand days up to yesterday, so a quiet spell lowers the level instead of being skipped;
+# today's claims are still coming in and are left out unless history already runs past today.
+def forecast_demand(daily, horizon=HORIZON_DAYS, today=None):
+    today = pd.Timestamp(today or datetime.now()).normalize()
+    keys, dates, matrix = build_series_matrix(daily, end_day=today - pd.Timedelta(days=1))
+    factors = weekday_factors(matrix, dates)
+    alphas, level, rmse = fit_smoothing(matrix / factors[:, dates.dayofweek.to_numpy()])
+
+    future = pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=horizon, freq='D')
+    future_factors = factors[:, future.dayofweek.to_numpy()]
+    forecast = level[:, None] * future_factors
+    spread = INTERVAL_Z * rmse[:, None] * future_factors
+
+    forecasts = keys.loc[keys.index.repeat(horizon)].reset_index(drop=True)
+    forecasts['Forecast_Date'] = np.tile(future.strftime('%Y-%m-%d').to_numpy(), len(keys))
+    forecasts['Forecast'] = np.clip(forecast, 0, None).ravel().round(3)
+    forecasts['Forecast_Low'] = np.clip(forecast - spread, 0, None).ravel().round(3)
+    forecasts['Forecast_High'] = (forecast + spread).ravel().round(3)
+    forecasts['Alpha'] = np.repeat(alphas, horizon)
+    return forecasts
+
+
+# Replace the stored forecasts in one transaction so readers never see a partial refresh
+def store_forecasts(conn, forecasts):
+    generated_at = datetime.now().isoformat(timespec='seconds')
+    conn.execute(CREATE_FORECASTS_SQL)
+    conn.execute("DELETE FROM demand_forecasts")
+    conn.executemany(
+        "INSERT INTO demand_forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((*row, generated_at) for row in forecasts.itertuples(index=False, name=None))
+    )
+    conn.commit()
+
+
+def refresh_forecasts(conn, horizon=HORIZON_DAYS):
+    daily = load_daily_demand(conn)
+    if daily.empty:
+        return daily
+    forecasts = forecast_demand(daily, horizon)
+    store_forecasts(conn, forecasts)
+    return forecasts
+
+
+# Expected claims over the stored horizon, summed to (City, plus any extra group columns)
+def load_forecast_totals(conn, group_by=('City',), city=None, limit=None):
+    columns = ", ".join(group_by)
+    sql = f"SELECT {columns}, SUM(Forecast) AS Expected_Claims FROM demand_forecasts"
+    params = []
+    if city:
+        sql += " WHERE City = ?"
+        params.append(city)
+    sql += f" GROUP BY {columns} ORDER BY Expected_Claims DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return timed_read_sql(conn, sql, params, label="forecast:totals")
+
+
+def load_city_forecast(conn, city):
+    return timed_read_sql(conn, """
+        SELECT Forecast_Date, Meal_Type, SUM(Forecast) AS Forecast,
+               SUM(Forecast_Low) AS Forecast_Low, SUM(Forecast_High) AS Forecast_High
+        FROM demand_forecasts
+        WHERE City = ?
+        GROUP BY Forecast_Date, Meal_Type
+        ORDER BY Forecast_Date
+    """, [city], label="forecast:city")
+
+
+def forecasts_available(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'demand_forecasts'"
+    ).fetchone() is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the demand forecasts")
+    parser.add_argument('--horizon', type=int, default=HORIZON_DAYS)
+    parser.add_argument('--database', default=None, help="SQLite file (default: from DATABASE_URL)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database or sqlite_path())
+    try:
+        started = time.perf_counter()
+        forecasts = refresh_forecasts(conn, args.horizon)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    series_count = len(forecasts) // args.horizon if len(forecasts) else 0
+    print(f"✓ {series_count} series forecast {args.horizon} days ahead in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# Blocked fuzzy de-duplication of providers and receivers
+# Entities are only compared inside blocks that share a city plus either the same
+# normalized contact number or a normalized name token, so the cost grows with block
+# sizes rather than with all n^2 pairs. Matches are clustered with union-find and
+# written as cluster IDs plus a duplicate -> canonical merge map.
+# Run against the database from the repository root with:
+#   python -m components.entity_resolution
+
+import sqlite3
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import pandas as pd
+
+from components.storage import sqlite_path
+
+
+# Entity type -> (table, ID column, tables/columns that reference it)
+ENTITIES = {
+    'provider': ('providers', 'Provider_ID', [('food_listings', 'Provider_ID')]),
+    'receiver': ('receivers', 'Receiver_ID', [('claims', 'Receiver_ID')]),
+}
+
+# Words that do not distinguish one organisation from another
+NAME_STOPWORDS = {'and', 'the', 'inc', 'llc', 'ltd', 'plc', 'co', 'corp', 'group', 'sons', 'of'}
+
+MAX_BLOCK_SIZE = 200        # larger blocks are too generic to be useful and are skipped
+NAME_MATCH_THRESHOLD = 0.90  # name similarity that is a match on its own
+CONTACT_NAME_THRESHOLD = 0.60  # name similarity needed when the contact number also matches
+
+
+def normalize_names(names):
+    tokens = (names.fillna('').str.lower()
+              .str.replace('&', ' and ', regex=False)
+              .str.replace(r'[^a-z0-9 ]+', ' ', regex=True)
+              .str.split())
+    return tokens.map(lambda words: ' '.join(word for word in words if word not in NAME_STOPWORDS))
+
+
+# Last 10 digits of the number, ignoring formatting, country prefixes and extensions
+def normalize_contacts(contacts):
+    digits = (contacts.fillna('').astype(str).str.lower()
+              .str.split('x').str[0]
+              .str.replace(r'\D', '', regex=True))
+    return digits.str[-10:].where(digits.str.len() >= 7, '')
+
+
+# Candidate pairs from all blocks, deduplicated, as a DataFrame of row positions
+def candidate_pairs(normalized):
+    city = normalized['City'].fillna('').str.lower().str.strip()
+
+    contact_keys = pd.DataFrame({
+        'position': range(len(normalized)),
+        'key': 'c|' + city + '|' + normalized['contact_key'],
+    })[normalized['contact_key'].ne('').to_numpy()]
+
+    name_keys = pd.DataFrame({
+        'position': range(len(normalized)),
+        'key': normalized['name_key'].str.split(),
+        'city': city.to_numpy(),
+    }).explode('key').dropna(subset=['key'])
+    name_keys['key'] = 'n|' + name_keys['city'] + '|' + name_keys['key']
+
+    keys = pd.concat([contact_keys, name_keys[['position', 'key']]], ignore_index=True)
+    sizes = keys.groupby('key')['position'].transform('size')
+    keys = keys[(sizes > 1) & (sizes <= MAX_BLOCK_SIZE)]
+
+    pairs = set()
+    for positions in keys.groupby('key')['position'].agg(list):
+        pairs.update(combinations(sorted(positions), 2))
+    return pd.DataFrame(sorted(pairs), columns=['left', 'right'])
+
+
+def _name_similarity(left, right):
+    matcher = SequenceMatcher(None, left, right)
+    # quick_ratio is a cheap upper bound; skip the full ratio when it cannot match
+    if matcher.quick_ratio() < CONTACT_NAME_THRESHOLD:
+        return 0.0
+    return matcher.ratio()
+
+
+def score_pairs(normalized, pairs):
+    names = normalized['name_key'].to_numpy()
+    contacts = normalized['contact_key'].to_numpy()
+    left, right = pairs['left'].to_numpy(), pairs['right'].to_numpy()
+
+    pairs = pairs.copy()
+    pairs['name_score'] = [_name_similarity(names[a], names[b]) for a, b in zip(left, right)]
+    pairs['same_contact'] = (contacts[left] == contacts[right]) & (contacts[left] != '')
+    pairs['is_match'] = ((pairs['name_score'] >= NAME_MATCH_THRESHOLD)
+                         | (pairs['same_contact'] & (pairs['name_score'] >= CONTACT_NAME_THRESHOLD)))
+    return pairs
+
+
+# Union-find over matched pairs; each cluster is labelled with its smallest entity ID
+def cluster_entities(entity_ids, matches):
+    parent = list(range(len(entity_ids)))
+
+    def find(position):
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    for left, right in zip(matches['left'], matches['right']):
+        root_left, root_right = find(left), find(right)
+        if root_left != root_right:
+            parent[max(root_left, root_right)] = min(root_left, root_right)
+
+    roots = pd.Series([find(position) for position in range(len(entity_ids))])
+    ids = pd.Series(entity_ids).reset_index(drop=True)
+    return ids.groupby(roots).transform('min')
+
+
+# Resolve one entity frame; returns (clusters, merge_map) frames
+def resolve_entities(entities, id_column, entity_type):
+    entities = entities.reset_index(drop=True)
+    normalized = pd.DataFrame({
+        'City': entities['City'],
+        'name_key': normalize_names(entities['Name']),
+        'contact_key': normalize_contacts(entities['Contact']),
+    })
+
+    pairs = score_pairs(normalized, candidate_pairs(normalized))
+    matches = pairs[pairs['is_match']]
+    cluster_ids = cluster_entities(entities[id_column].tolist(), matches)
+
+    clusters = pd.DataFrame({
+        'Entity_Type': entity_type,
+        'Entity_ID': entities[id_column],
+        'Cluster_ID': cluster_ids,
+    })
+
+    best_score = pd.concat([
+        matches[['left', 'name_score']].rename(columns={'left': 'position'}),
+        matches[['right', 'name_score']].rename(columns={'right': 'position'}),
+    ]).groupby('position')['name_score'].max()
+    duplicates = clusters[clusters['Entity_ID'] != clusters['Cluster_ID']]
+    merge_map = pd.DataFrame({
+        'Entity_Type': entity_type,
+        'Duplicate_ID': duplicates['Entity_ID'],
+        'Canonical_ID': duplicates['Cluster_ID'],
+        'Score': best_score.reindex(duplicates.index).round(3),
+    })
+    return clusters, merge_map.reset_index(drop=True)
+
+
+# Re-point a reference column through a merge map (IDs not in the map are unchanged)
+def repoint(references, merge_map):
+    mapping = pd.Series(merge_map['Canonical_ID'].to_numpy(), index=merge_map['Duplicate_ID'].to_numpy())
+    return references.map(mapping).fillna(references).astype(references.dtype)
+
+
+def print_resolution_summary(entity_type, clusters, merge_map):
+    print(f"{entity_type}s: {len(clusters)} records -> {clusters['Cluster_ID'].nunique()} entities "
+          f"({len(merge_map)} duplicates merged)")
+
+
+def create_entity_indexes(conn):
+    cursor = conn.cursor()
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_entity_clusters ON entity_clusters ("Entity_Type", "Cluster_ID")')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_entity_merge_map ON entity_merge_map ("Entity_Type", "Duplicate_ID")')
+    conn.commit()
+
+
+# Resolve the entity tables already in the database and re-point their references
+def resolve_database(conn):
+    all_clusters, all_merges = [], []
+    for entity_type, (table, id_column, _) in ENTITIES.items():
+        entities = pd.read_sql_query(f"SELECT {id_column}, Name, City, Contact FROM {table}", conn)
+        clusters, merge_map = resolve_entities(entities, id_column, entity_type)
+        all_clusters.append(clusters)
+        all_merges.append(merge_map)
+        print_resolution_summary(entity_type, clusters, merge_map)
+
+    pd.concat(all_clusters).to_sql('entity_clusters', conn, if_exists='replace', index=False)
+    pd.concat(all_merges).to_sql('entity_merge_map', conn, if_exists='replace', index=False)
+    create_entity_indexes(conn)
+
+    for entity_type, (_, _, references) in ENTITIES.items():
+        for ref_table, ref_column in references:
+            conn.execute(f"""
+                UPDATE {ref_table}
+                SET {ref_column} = (
+                    SELECT m.Canonical_ID FROM entity_merge_map m
+                    WHERE m.Entity_Type = ? AND m.Duplicate_ID = {ref_table}.{ref_column}
+                )
+                WHERE {ref_column} IN (
+                    SELECT Duplicate_ID FROM entity_merge_map WHERE Entity_Type = ?
+                )
+            """, (entity_type, entity_type))
+    conn.commit()
+
+
+if __name__ == "__main__":
+    connection = sqlite3.connect(sqlite_path())
+    resolve_database(connection)
+    connection.close()
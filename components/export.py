@@ -0,0 +1,253 @@
+# Streaming export of tables and named queries
+# Rows are pulled from a cursor with fetchmany and written batch by batch as CSV,
+# JSON Lines or Parquet row groups, so memory use stays constant whatever the size.
+# Run from the repository root with:
+#   python -m components.export claims_detailed --format parquet --output claims.parquet
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from components.query_metrics import record
+from components.report_jobs import REPORTS
+from components.sql_data_analysis import QUERIES
+from components.storage import sqlite_path
+
+BATCH_SIZE = 10_000
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Export-only queries, joined for downstream analysis
+EXPORT_QUERIES = {
+    'claims_detailed': """
+        SELECT c.Claim_ID, c.Status, c.Timestamp,
+               f.Food_ID, f.Food_Name, f.Quantity, f.Food_Type, f.Meal_Type, f.Location, f.Expiry_Date,
+               r.Receiver_ID, r.Name AS Receiver_Name, r.Type AS Receiver_Type, r.City AS Receiver_City
+        FROM claims c
+        JOIN food_listings f ON f.Food_ID = c.Food_ID
+        JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+    """,
+}
+
+
+def named_queries():
+    queries = dict(QUERIES)
+    queries.update({f"report_{name}": sql for name, (_, sql, _) in REPORTS.items()})
+    queries.update(EXPORT_QUERIES)
+    return queries
+
+
+def list_tables(conn):
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+
+
+# SQL for a source name: a named query, or a table/view in the database
+def source_sql(conn, source):
+    queries = named_queries()
+    if source in queries:
+        return queries[source]
+    if source in list_tables(conn):
+        return f'SELECT * FROM "{source}"'
+    raise ValueError(f"Unknown export source: {source}")
+
+
+# Yield (column names, rows) batch by batch from an open cursor. An empty result still
+# yields one empty batch, so writers can emit the header or schema.
+def iter_batches(conn, sql, params=(), batch_size=BATCH_SIZE):
+    cursor = conn.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    try:
+        rows = cursor.fetchmany(batch_size)
+        while True:
+            yield columns, rows
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+    finally:
+        cursor.close()
+
+
+def write_csv(batches, output):
+    writer = csv.writer(output)
+    header_written = False
+    row_count = 0
+    for columns, rows in batches:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        row_count += len(rows)
+    return row_count
+
+
+def write_jsonl(batches, output):
+    row_count = 0
+    for columns, rows in batches:
+        output.writelines(
+            json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows
+        )
+        row_count += len(rows)
+    return row_count
+
+
+# Arrow array for one column of a batch; SQLite columns can mix types, which fall back to strings
+def _column_array(values):
+    import pyarrow as pa
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+
+# Smallest type that holds both: NULL takes the other type, mixed numbers become float64,
+# anything else becomes string
+def _widen(current, new):
+    import pyarrow as pa
+
+    if current == new or pa.types.is_null(new):
+        return current
+    if pa.types.is_null(current):
+        return new
+    if pa.types.is_integer(current) and pa.types.is_integer(new):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (current, new)):
+        return pa.float64()
+    return pa.string()
+
+
+# Schema as written to the file: columns still all NULL are stored as strings
+def _file_schema(schema):
+    import pyarrow as pa
+
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in schema
+    ])
+
+
+# One Parquet row group per batch. Column types come from the data; when a later batch
+# does not fit (NULL then numbers, int then float or text) the schema is widened and the
+# row groups written so far are rewritten with it. An empty result gives a schema-only
+# file with every column typed as string.
+def write_parquet(batches, output_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = None
+    writer = None
+    path = output_path
+    row_count = 0
+    try:
+        for columns, rows in batches:
+            values = list(zip(*rows)) if rows else [() for _ in columns]
+            table = pa.table([_column_array(list(column)) for column in values], names=columns)
+            widened = table.schema if schema is None else pa.schema([
+                field.with_type(_widen(field.type, new.type)) for field, new in zip(schema, table.schema)
+            ])
+            if writer is None:
+                writer = pq.ParquetWriter(path, _file_schema(widened), compression='snappy')
+            elif _file_schema(widened) != writer.schema:
+                writer, path = _rewrite_parquet(writer, path, _file_schema(widened), output_path)
+            schema = widened
+            writer.write_table(table.cast(_file_schema(schema)))
+            row_count += len(rows)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            writer = None
+        if path != output_path and os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+    if path != output_path:
+        os.replace(path, output_path)
+    return row_count
+
+
+# Close writer and copy its row groups into a sibling file with the wider schema;
+# returns a writer appending to the new file and that file's path
+def _rewrite_parquet(writer, path, schema, output_path):
+    import pyarrow.parquet as pq
+
+    writer.close()
+    new_path = output_path + '.widen' if path == output_path else output_path
+    rewriter = pq.ParquetWriter(new_path, schema, compression='snappy')
+    try:
+        source = pq.ParquetFile(path)
+        for index in range(source.num_row_groups):
+            rewriter.write_table(source.read_row_group(index).cast(schema))
+        source.close()
+    except BaseException:
+        rewriter.close()
+        os.remove(new_path)
+        raise
+    os.remove(path)
+    return rewriter, new_path
+
+
+# Export a source to output_path ('-' for stdout); returns the number of rows written.
+# Files are written under a temporary name and renamed once complete, so a failed
+# export never leaves a partial output_path behind.
+def export(conn, source, fmt, output_path, batch_size=BATCH_SIZE):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    sql = source_sql(conn, source)
+    batches = iter_batches(conn, sql, batch_size=batch_size)
+    started = time.perf_counter()
+
+    if output_path == '-':
+        row_count = (write_csv if fmt == 'csv' else write_jsonl)(batches, sys.stdout)
+        nbytes = None
+    else:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)),
+                                         prefix=os.path.basename(output_path) + '.', suffix='.tmp')
+        os.close(fd)
+        try:
+            if fmt == 'parquet':
+                row_count = write_parquet(batches, temp_path)
+            else:
+                with open(temp_path, 'w', newline='', encoding='utf-8') as output:
+                    row_count = (write_csv if fmt == 'csv' else write_jsonl)(batches, output)
+            nbytes = os.path.getsize(temp_path)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    record(f"export:{source}", sql, (time.perf_counter() - started) * 1000, row_count, nbytes)
+    return row_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a table or named query to a file")
+    parser.add_argument('source', nargs='?', help="table name or named query")
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--output', default='-', help="output path, '-' for stdout (csv/jsonl only)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--database', default=None, help="SQLite file (default: from DATABASE_URL)")
+    parser.add_argument('--list', action='store_true', help="list available sources")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database or sqlite_path())
+    try:
+        if args.list or not args.source:
+            print("Named queries:", ", ".join(named_queries()))
+            print("Tables:", ", ".join(list_tables(conn)))
+            return
+        if args.format == 'parquet' and args.output == '-':
+            parser.error("Parquet output needs a file path")
+        export(conn, args.source, args.format, args.output, args.batch_size)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
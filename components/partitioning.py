@@ -0,0 +1,514 @@
+# Region-partitioned storage for food listings and claims
+# Optional layout: food_listings are split into per-region SQLite files by a hash of
+# their Location, and each claim is stored with the listing it claims, so writers in
+# different regions lock different files and listing/claim joins stay partition-local.
+# Cross-region analysis runs a partial aggregate on every partition in parallel and
+# merges the partial results. Providers and receivers stay in the main database.
+# While the layout is in use (PARTITION_COUNT > 0 and a built catalog) the partitions own
+# listing and claim writes: reservations, IDs and status changes are decided under the
+# region's lock only. Each write queues the changed keys in the region's sync_queue, and
+# sync_main copies those rows into the main database, which the app pages read. The app
+# runs sync_main in a background thread (request_sync), so a region write never waits on
+# main's write lock; pages catch up once the sync has run.
+# Run from the repository root with:
+#   python -m components.partitioning build --count 8
+#   python -m components.partitioning query claims_by_status
+#   python -m components.partitioning sync
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from components.archival import max_key
+from components.claim_reservations import (
+    RESERVATION_TRIGGER_NAMES, RESERVATION_TRIGGERS_SQL, ensure_claim_quantities
+)
+from components.query_metrics import timed_read_sql, timed_execute
+from components.storage import sqlite_path
+
+PARTITION_DIR = os.environ.get('PARTITION_DIR', 'partitions')
+PARTITION_COUNT = int(os.environ.get('PARTITION_COUNT', '0'))  # 0 keeps the single-file layout
+CATALOG_NAME = 'catalog.db'
+CHUNK_SIZE = 50_000
+SYNC_INTERVAL_SECONDS = float(os.environ.get('PARTITION_SYNC_SECONDS', '5'))  # also picks up other processes' writes
+
+REGION_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS food_listings (
+    Food_ID INTEGER PRIMARY KEY,
+    Food_Name TEXT NOT NULL,
+    Quantity INTEGER NOT NULL,
+    Expiry_Date DATE NOT NULL,
+    Provider_ID INTEGER NOT NULL,
+    Provider_Type TEXT NOT NULL,
+    Location TEXT NOT NULL,
+    Food_Type TEXT NOT NULL,
+    Meal_Type TEXT NOT NULL,
+    Remaining_Quantity INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS claims (
+    Claim_ID INTEGER PRIMARY KEY,
+    Food_ID INTEGER NOT NULL,
+    Receiver_ID INTEGER NOT NULL,
+    Status TEXT NOT NULL,
+    Timestamp DATETIME NOT NULL,
+    Claimed_Quantity INTEGER,
+    FOREIGN KEY (Food_ID) REFERENCES food_listings (Food_ID)
+);
+
+CREATE INDEX IF NOT EXISTS idx_food_listings_location ON food_listings (Location);
+CREATE INDEX IF NOT EXISTS idx_claims_food ON claims (Food_ID);
+CREATE INDEX IF NOT EXISTS idx_claims_status ON claims (Status);
+"""
+
+# Partitioned table -> key column; changed keys are queued for sync_main
+SYNCED_TABLES = {'claims': 'Claim_ID', 'food_listings': 'Food_ID'}
+
+SYNC_QUEUE_SQL = """
+CREATE TABLE IF NOT EXISTS sync_queue (
+    Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    Table_Name TEXT NOT NULL,
+    Row_ID INTEGER NOT NULL
+);
+"""
+
+SYNC_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_sync_{event.lower()} AFTER {event} ON {table}
+    BEGIN
+        INSERT INTO sync_queue (Table_Name, Row_ID) VALUES ('{table}', NEW.{key});
+    END
+    """
+    for table, key in SYNCED_TABLES.items() for event in ('INSERT', 'UPDATE')
+]
+
+# The catalog is written once by build_partitions and only read afterwards:
+# rows created before the build are looked up here, newer IDs encode their region
+CATALOG_SQL = """
+CREATE TABLE IF NOT EXISTS partition_config (
+    Partition_Count INTEGER NOT NULL,
+    Food_ID_Base INTEGER NOT NULL,
+    Claim_ID_Base INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS listing_regions (
+    Food_ID INTEGER PRIMARY KEY,
+    Region INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS claim_regions (
+    Claim_ID INTEGER PRIMARY KEY,
+    Region INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Query name -> (partial SQL run on every partition, group keys, merge aggregations, derived ratios)
+FEDERATED_QUERIES = {
+    'listings_by_city': (
+        "SELECT Location AS City, COUNT(*) AS Listings, SUM(Quantity) AS Total_Quantity "
+        "FROM food_listings GROUP BY Location",
+        ['City'], {'Listings': 'sum', 'Total_Quantity': 'sum'}, {},
+    ),
+    'claims_by_status': (
+        "SELECT Status, COUNT(*) AS Claims FROM claims GROUP BY Status",
+        ['Status'], {'Claims': 'sum'}, {},
+    ),
+    'claims_by_meal_type': (
+        "SELECT f.Meal_Type, COUNT(c.Claim_ID) AS Claims, COALESCE(SUM(c.Claimed_Quantity), 0) AS Claimed_Quantity "
+        "FROM claims c JOIN food_listings f ON f.Food_ID = c.Food_ID GROUP BY f.Meal_Type",
+        ['Meal_Type'], {'Claims': 'sum', 'Claimed_Quantity': 'sum'}, {},
+    ),
+    'quantity_by_food_type': (
+        "SELECT Food_Type, COUNT(*) AS Listings, SUM(Quantity) AS Total_Quantity, "
+        "MIN(Expiry_Date) AS First_Expiry, MAX(Expiry_Date) AS Last_Expiry "
+        "FROM food_listings GROUP BY Food_Type",
+        ['Food_Type'],
+        {'Listings': 'sum', 'Total_Quantity': 'sum', 'First_Expiry': 'min', 'Last_Expiry': 'max'},
+        {'Average_Quantity': ('Total_Quantity', 'Listings')},
+    ),
+}
+
+
+def partitioning_enabled(partition_dir=PARTITION_DIR):
+    return os.path.exists(os.path.join(partition_dir, CATALOG_NAME))
+
+
+# Whether app writes go to the partitions; a left-over build alone doesn't switch them over
+def partitioned_writes(partition_dir=PARTITION_DIR):
+    return PARTITION_COUNT > 0 and partitioning_enabled(partition_dir)
+
+
+# Stable region for a city: crc32 rather than hash(), which is salted per process
+def region_for(city, partition_count):
+    return zlib.crc32(str(city).strip().lower().encode('utf-8')) % partition_count
+
+
+def regions_for(cities, partition_count):
+    return cities.map(lambda city: region_for(city, partition_count)).astype('int64')
+
+
+def partition_path(region, partition_dir=PARTITION_DIR):
+    return os.path.join(partition_dir, f"region_{region}.db")
+
+
+def connect_partition(region, partition_dir=PARTITION_DIR, read_only=False):
+    path = partition_path(region, partition_dir)
+    if read_only:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    return sqlite3.connect(path, timeout=30)
+
+
+def connect_catalog(partition_dir=PARTITION_DIR):
+    return sqlite3.connect(f"file:{os.path.join(partition_dir, CATALOG_NAME)}?mode=ro", uri=True)
+
+
+# Sync queue and stock triggers of a region (added after the bulk load, so built rows aren't queued)
+def ensure_region_triggers(conn):
+    conn.executescript(SYNC_QUEUE_SQL)
+    for statement in SYNC_TRIGGERS_SQL + RESERVATION_TRIGGERS_SQL:
+        conn.execute(statement)
+    conn.commit()
+
+
+def load_config(partition_dir=PARTITION_DIR):
+    conn = connect_catalog(partition_dir)
+    try:
+        return conn.execute(
+            "SELECT Partition_Count, Food_ID_Base, Claim_ID_Base FROM partition_config"
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+# Split food_listings and claims from the main database into per-region files
+def build_partitions(database_name=None, partition_dir=PARTITION_DIR, partition_count=8):
+    database_name = database_name or sqlite_path()
+    os.makedirs(partition_dir, exist_ok=True)
+    for name in os.listdir(partition_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(partition_dir, name))
+
+    partitions = {}
+    for region in range(partition_count):
+        conn = connect_partition(region, partition_dir)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(REGION_TABLES_SQL)
+        partitions[region] = conn
+
+    source = sqlite3.connect(database_name)
+    # Partitions own the stock once built, so the source needs its quantity columns first
+    ensure_claim_quantities(source)
+    catalog = sqlite3.connect(os.path.join(partition_dir, CATALOG_NAME))
+    catalog.executescript(CATALOG_SQL)
+    try:
+        listing_regions = []
+        for chunk in pd.read_sql_query("SELECT * FROM food_listings", source, chunksize=CHUNK_SIZE):
+            chunk['Region'] = regions_for(chunk['Location'], partition_count).to_numpy()
+            for region, rows in chunk.groupby('Region'):
+                rows.drop(columns='Region').to_sql('food_listings', partitions[region], if_exists='append', index=False)
+            listing_regions.append(chunk[['Food_ID', 'Region']])
+        listing_regions = pd.concat(listing_regions, ignore_index=True)
+        listing_regions.to_sql('listing_regions', catalog, if_exists='append', index=False)
+
+        region_of_food = pd.Series(listing_regions['Region'].to_numpy(), index=listing_regions['Food_ID'].to_numpy())
+        # Claims whose listing is missing still need a home; use the region of an empty city
+        orphan_region = region_for('', partition_count)
+        for chunk in pd.read_sql_query("SELECT * FROM claims", source, chunksize=CHUNK_SIZE):
+            chunk['Region'] = chunk['Food_ID'].map(region_of_food).fillna(orphan_region).astype('int64')
+            for region, rows in chunk.groupby('Region'):
+                rows.drop(columns='Region').to_sql('claims', partitions[region], if_exists='append', index=False)
+            chunk[['Claim_ID', 'Region']].to_sql('claim_regions', catalog, if_exists='append', index=False)
+
+        # New IDs start above archived rows too
+        food_id_base = max_key(source, 'food_listings')
+        claim_id_base = max_key(source, 'claims')
+        catalog.execute(
+            "INSERT INTO partition_config (Partition_Count, Food_ID_Base, Claim_ID_Base) VALUES (?, ?, ?)",
+            (partition_count, food_id_base, claim_id_base)
+        )
+        catalog.commit()
+        for conn in partitions.values():
+            conn.commit()
+            ensure_region_triggers(conn)
+    finally:
+        source.close()
+        catalog.close()
+        for conn in partitions.values():
+            conn.close()
+
+    print(f"✓ {len(listing_regions)} listings split into {partition_count} regions in '{partition_dir}'")
+
+
+# Region owning a row: IDs above the build-time base are congruent to their region,
+# older ones are looked up in the catalog
+def _region_for_id(partition_dir, table, id_column, row_id):
+    partition_count, food_id_base, claim_id_base = load_config(partition_dir)
+    base = food_id_base if id_column == 'Food_ID' else claim_id_base
+    if row_id > base:
+        return row_id % partition_count
+    conn = connect_catalog(partition_dir)
+    try:
+        row = conn.execute(f"SELECT Region FROM {table} WHERE {id_column} = ?", (row_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise KeyError(f"{id_column} {row_id} is not in any partition")
+    return row[0]
+
+
+# Next ID for a partition: above both the build-time base and the partition's own rows,
+# and congruent to the region, so partitions never hand out the same ID
+def _next_id(cursor, table, id_column, base, partition_count, region):
+    local_max = cursor.execute(f"SELECT COALESCE(MAX({id_column}), 0) FROM {table}").fetchone()[0]
+    floor = max(base, local_max)
+    return floor + 1 + (region - floor - 1) % partition_count
+
+
+_triggers_checked = set()
+
+
+def _write(region, partition_dir, statement):
+    conn = connect_partition(region, partition_dir)
+    try:
+        # Partitions built before the sync queue existed get it on their first write
+        if (partition_dir, region) not in _triggers_checked:
+            ensure_region_triggers(conn)
+            _triggers_checked.add((partition_dir, region))
+        cursor = conn.cursor()
+        # Take the partition's write lock up front so the ID and the insert are atomic
+        cursor.execute("BEGIN IMMEDIATE")
+        result = statement(cursor)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def insert_listing(listing, partition_dir=PARTITION_DIR):
+    partition_count, food_id_base, _ = load_config(partition_dir)
+    region = region_for(listing['Location'], partition_count)
+
+    def statement(cursor):
+        food_id = _next_id(cursor, 'food_listings', 'Food_ID', food_id_base, partition_count, region)
+        row = {'Remaining_Quantity': listing['Quantity'], **listing, 'Food_ID': food_id}
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        timed_execute(cursor, f"INSERT INTO food_listings ({columns}) VALUES ({placeholders})",
+                      tuple(row.values()), label=f"partition:{region}:insert_listing")
+        return food_id
+
+    return _write(region, partition_dir, statement)
+
+
+# With a quantity the claim reserves it from the listing's Remaining_Quantity in the same
+# transaction (see claim_reservations.reserve_claim); returns None when not enough is left
+def insert_claim(food_id, receiver_id, status, timestamp, quantity=None, partition_dir=PARTITION_DIR):
+    partition_count, _, claim_id_base = load_config(partition_dir)
+    region = _region_for_id(partition_dir, 'listing_regions', 'Food_ID', food_id)
+
+    def statement(cursor):
+        if quantity is not None:
+            timed_execute(cursor, """
+                UPDATE food_listings SET Remaining_Quantity = Remaining_Quantity - ?
+                WHERE Food_ID = ? AND Remaining_Quantity >= ?
+            """, (quantity, food_id, quantity), label=f"partition:{region}:reserve")
+            if cursor.rowcount == 0:
+                return None
+        claim_id = _next_id(cursor, 'claims', 'Claim_ID', claim_id_base, partition_count, region)
+        timed_execute(cursor, """
+            INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (claim_id, food_id, receiver_id, status, timestamp, quantity), label=f"partition:{region}:insert_claim")
+        return claim_id
+
+    return _write(region, partition_dir, statement)
+
+
+def reserve_claim(food_id, receiver_id, quantity, timestamp=None, partition_dir=PARTITION_DIR):
+    if quantity <= 0:
+        raise ValueError("Claimed quantity must be positive")
+    return insert_claim(food_id, receiver_id, 'Pending', timestamp or datetime.now().isoformat(),
+                        quantity, partition_dir)
+
+
+def update_claim_status(claim_id, status, partition_dir=PARTITION_DIR):
+    region = _region_for_id(partition_dir, 'claim_regions', 'Claim_ID', claim_id)
+
+    def statement(cursor):
+        timed_execute(cursor, "UPDATE claims SET Status = ? WHERE Claim_ID = ?",
+                      (status, claim_id), label=f"partition:{region}:update_claim_status")
+        return cursor.rowcount
+
+    return _write(region, partition_dir, statement)
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+# Upsert rows into the main database, updating only rows that actually changed so its
+# rollup/event/read-model triggers see real transitions only
+def _apply_rows(main, table, key, columns, rows):
+    assignments = ", ".join(f'"{column}" = ?' for column in columns)
+    changed = " OR ".join(f'"{column}" IS NOT ?' for column in columns)
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    for row in rows:
+        row_id = row[columns.index(key)]
+        exists = main.execute(f'SELECT 1 FROM "{table}" WHERE "{key}" = ?', (row_id,)).fetchone()
+        if exists:
+            main.execute(f'UPDATE "{table}" SET {assignments} WHERE "{key}" = ? AND ({changed})',
+                         (*row, row_id, *row))
+        else:
+            main.execute(f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})', row)
+
+
+# Copy queued partition changes into the main database; returns the number of rows applied.
+# The partition already enforced every reservation and the listing rows carry its
+# Remaining_Quantity, so main's stock triggers must not run again: they would check a reopen
+# against main's stale stock and fail the sync forever. They are dropped and recreated inside
+# the sync transaction, so no other connection ever sees them missing. The queue and rows are
+# read under main's write lock, so concurrent syncs queue up and never apply stale rows.
+# Re-applying a row is harmless, so a crash between the main commit and the queue cleanup
+# only repeats work.
+def sync_main(database_name=None, partition_dir=PARTITION_DIR):
+    partition_count = load_config(partition_dir)[0]
+    main = sqlite3.connect(database_name or sqlite_path(), timeout=30, isolation_level=None)
+    applied = 0
+    try:
+        for region in range(partition_count):
+            part = connect_partition(region, partition_dir)
+            try:
+                if not part.execute(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_queue'").fetchone():
+                    continue
+                if not part.execute("SELECT 1 FROM sync_queue LIMIT 1").fetchone():
+                    continue
+                main.execute("BEGIN IMMEDIATE")
+                try:
+                    queued = part.execute("SELECT Seq, Table_Name, Row_ID FROM sync_queue ORDER BY Seq").fetchall()
+                    for name in RESERVATION_TRIGGER_NAMES:
+                        main.execute(f"DROP TRIGGER IF EXISTS {name}")
+                    for table, key in SYNCED_TABLES.items():
+                        row_ids = sorted({row_id for _, name, row_id in queued if name == table})
+                        if not row_ids:
+                            continue
+                        columns = [column for column in _columns(part, table) if column in _columns(main, table)]
+                        select_list = ", ".join(f'"{column}"' for column in columns)
+                        placeholders = ", ".join("?" for _ in row_ids)
+                        rows = part.execute(
+                            f'SELECT {select_list} FROM "{table}" WHERE "{key}" IN ({placeholders})', row_ids
+                        ).fetchall()
+                        _apply_rows(main, table, key, columns, rows)
+                        applied += len(rows)
+                    for statement in RESERVATION_TRIGGERS_SQL:
+                        main.execute(statement)
+                    main.execute("COMMIT")
+                except Exception:
+                    main.execute("ROLLBACK")
+                    raise
+                if queued:
+                    part.execute("DELETE FROM sync_queue WHERE Seq <= ?", (queued[-1][0],))
+                    part.commit()
+            finally:
+                part.close()
+    finally:
+        main.close()
+    return applied
+
+
+# (database, partition directory) -> (wake-up event, callbacks run after rows were applied)
+_sync_workers = {}
+_sync_workers_lock = threading.Lock()
+
+
+def _sync_loop(database_name, partition_dir, wake, on_applied):
+    while True:
+        wake.wait(SYNC_INTERVAL_SECONDS)
+        wake.clear()
+        try:
+            if sync_main(database_name, partition_dir):
+                for callback in list(on_applied):
+                    callback()
+        except Exception as error:
+            # Rows stay queued in the partitions; the next pass retries them
+            print(f"Partition sync to {database_name} failed: {error}", file=sys.stderr)
+
+
+# Have the background sync for this database run soon, starting it on first use; returns
+# right away. on_applied (e.g. a cache clear) runs in the sync thread whenever rows were copied.
+def request_sync(database_name=None, partition_dir=PARTITION_DIR, on_applied=None):
+    database_name = database_name or sqlite_path()
+    with _sync_workers_lock:
+        worker = _sync_workers.get((database_name, partition_dir))
+        if worker is None:
+            worker = _sync_workers[(database_name, partition_dir)] = (threading.Event(), [])
+            threading.Thread(target=_sync_loop, args=(database_name, partition_dir, *worker), daemon=True).start()
+        wake, callbacks = worker
+        if on_applied is not None and on_applied not in callbacks:
+            callbacks.append(on_applied)
+    wake.set()
+
+
+def _run_partial(region, partition_dir, sql, label):
+    conn = connect_partition(region, partition_dir, read_only=True)
+    try:
+        return timed_read_sql(conn, sql, label=f"{label}:region_{region}")
+    finally:
+        conn.close()
+
+
+# Run a federated query: partial aggregates on every partition in parallel, then merged
+def federated_query(name, partition_dir=PARTITION_DIR):
+    sql, keys, aggregations, ratios = FEDERATED_QUERIES[name]
+    partition_count = load_config(partition_dir)[0]
+
+    # sqlite3 releases the GIL while a statement runs, so threads scan partitions concurrently
+    with ThreadPoolExecutor(max_workers=partition_count) as executor:
+        partials = list(executor.map(
+            lambda region: _run_partial(region, partition_dir, sql, f"federated:{name}"),
+            range(partition_count)
+        ))
+
+    merged = pd.concat(partials, ignore_index=True).groupby(keys, as_index=False).agg(aggregations)
+    for column, (numerator, denominator) in ratios.items():
+        merged[column] = (merged[numerator] / merged[denominator]).round(2)
+    return merged.sort_values(keys, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build, query or sync the region-partitioned layout")
+    parser.add_argument('command', choices=('build', 'query', 'sync'))
+    parser.add_argument('name', nargs='?', help="federated query to run (default: all)")
+    parser.add_argument('--count', type=int, default=PARTITION_COUNT or 8, help="number of regions")
+    parser.add_argument('--database', default=None, help="SQLite file (default: from DATABASE_URL)")
+    parser.add_argument('--partition-dir', default=PARTITION_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_partitions(args.database, args.partition_dir, args.count)
+        return
+
+    if not partitioning_enabled(args.partition_dir):
+        parser.error(f"No partitions in '{args.partition_dir}'; run the build command first")
+    if args.command == 'sync':
+        database_name = args.database or sqlite_path()
+        print(f"✓ {sync_main(database_name, args.partition_dir)} partition rows copied to {database_name}")
+        return
+    for name in [args.name] if args.name else FEDERATED_QUERIES:
+        print(f"\n{name}:")
+        print(federated_query(name, args.partition_dir).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# Governed ad-hoc SQL for the SQL Queries page
+# Each statement runs in its own thread on its own read-only SQLite connection, so a
+# runaway query never holds the app's shared connection. A progress handler stops the
+# statement at the wall-clock deadline or when the caller sets its cancel event; results
+# are fetched in batches and cut off at the row and memory caps. Before running, the
+# plan from EXPLAIN QUERY PLAN gives a rough cost preview (rows visited, full scans).
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from components.query_metrics import estimate_row_bytes, record
+
+TIMEOUT_SECONDS = float(os.environ.get('ADHOC_TIMEOUT_SECONDS', '10'))
+MAX_ROWS = int(os.environ.get('ADHOC_MAX_ROWS', '10000'))
+MAX_RESULT_BYTES = int(os.environ.get('ADHOC_MAX_RESULT_MB', '50')) * 1024 * 1024
+MAX_CONCURRENT = int(os.environ.get('ADHOC_MAX_CONCURRENT', '2'))
+CACHE_KIB = 16 * 1024  # page cache per ad-hoc connection
+PROGRESS_STEPS = 10_000  # VM instructions between deadline/cancel checks
+FETCH_SIZE = 500
+EXPENSIVE_ROWS = 10_000_000  # cost previews above this are flagged
+SEARCH_ROWS = 10  # assumed rows per indexed lookup when no statistics say otherwise
+
+# Only reads are allowed; everything else (writes, ATTACH, PRAGMA, ...) is denied at prepare
+ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+SQL_KEYWORDS = {'FROM', 'WHERE', 'JOIN', 'ON', 'USING', 'LEFT', 'INNER', 'CROSS', 'NATURAL', 'GROUP', 'ORDER',
+                'LIMIT', 'UNION', 'HAVING', 'WINDOW'}
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT)
+
+
+def _authorize(action, *_):
+    return sqlite3.SQLITE_OK if action in ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def open_readonly(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only = 1")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+    # Large sorts and temp b-trees spill to disk instead of growing the heap
+    conn.execute("PRAGMA temp_store = FILE")
+    conn.set_authorizer(_authorize)
+    return conn
+
+
+# Rough row counts per table: ANALYZE statistics when present, else the largest rowid
+def _table_rows(conn, tables):
+    counts = {}
+    try:
+        counts.update((table, int(stat.split()[0])) for table, stat in conn.execute(
+            "SELECT tbl, stat FROM sqlite_stat1 WHERE idx IS NULL OR idx = tbl"
+        ))
+    except sqlite3.Error:
+        pass
+    for table in tables - counts.keys():
+        try:
+            counts[table] = conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+        except sqlite3.Error:
+            counts[table] = 0
+    return counts
+
+
+# Alias -> table for the plan's SCAN/SEARCH lines, from FROM/JOIN and comma-joined table lists
+def _aliases(sql, tables):
+    aliases = {table: table for table in tables}
+    for table, alias in re.findall(r'(?:FROM|JOIN|,)\s+"?(\w+)"?(?:\s+(?:AS\s+)?(\w+))?', sql, flags=re.IGNORECASE):
+        if table in tables and alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+# Plan tree plus an estimate of rows visited: loops under one parent nest, so their row
+# counts multiply; separate subqueries add up. Raises sqlite3.Error for invalid or denied SQL.
+def preview_cost(conn, sql):
+    tables = set()
+
+    def collect(action, table, *_):
+        if action == sqlite3.SQLITE_READ and table:
+            tables.add(table)
+        return _authorize(action)
+
+    conn.set_authorizer(collect)
+    try:
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    finally:
+        conn.set_authorizer(_authorize)
+
+    rows_by_table = _table_rows(conn, {table for table in tables if not table.startswith('sqlite_')})
+    aliases = _aliases(sql, rows_by_table.keys())
+    depth, lines, loops, full_scans = {0: 0}, [], {}, []
+    for node_id, parent_id, _, detail in plan:
+        depth[node_id] = depth.get(parent_id, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+        match = re.match(r'(SCAN|SEARCH) (\w+)', detail)
+        if not match or match.group(2) not in aliases:
+            continue
+        table_rows = rows_by_table[aliases[match.group(2)]]
+        if match.group(1) == 'SCAN':
+            full_scans.append(aliases[match.group(2)])
+            visited = table_rows
+        else:
+            visited = min(table_rows, SEARCH_ROWS)
+        loops[parent_id] = loops.get(parent_id, 1) * max(visited, 1)
+
+    estimated_rows = sum(loops.values())
+    return {
+        'plan': "\n".join(lines),
+        'estimated_rows': estimated_rows,
+        'full_scans': full_scans,
+        'temp_sorts': sum('USE TEMP B-TREE' in line for line in lines),
+        'expensive': estimated_rows > EXPENSIVE_ROWS,
+    }
+
+
+# Run one statement under the governor; returns a result dict with the frame and why it stopped
+def run_governed(path, sql, cancel_event=None, timeout=TIMEOUT_SECONDS, max_rows=MAX_ROWS,
+                 max_bytes=MAX_RESULT_BYTES):
+    cancel_event = cancel_event or threading.Event()
+    result = {'status': 'ok', 'message': '', 'frame': pd.DataFrame(), 'elapsed': 0.0}
+    if not _slots.acquire(blocking=False):
+        result.update(status='busy', message=f"{MAX_CONCURRENT} ad-hoc queries are already running; try again shortly")
+        return result
+
+    started = time.monotonic()
+    deadline = started + timeout
+    conn = None
+    try:
+        conn = open_readonly(path)
+        # A non-zero return makes SQLite abort the statement with "interrupted"
+        conn.set_progress_handler(lambda: cancel_event.is_set() or time.monotonic() > deadline, PROGRESS_STEPS)
+        cursor = conn.execute(sql)
+        columns = [column[0] for column in cursor.description or ()]
+        rows, nbytes = [], 0
+        while True:
+            batch = cursor.fetchmany(FETCH_SIZE)
+            if not batch:
+                break
+            rows.extend(batch)
+            nbytes += estimate_row_bytes(batch)
+            if len(rows) > max_rows:
+                rows = rows[:max_rows]
+                result.update(status='truncated', message=f"Stopped at the {max_rows:,} row limit")
+                break
+            if nbytes > max_bytes:
+                result.update(status='truncated',
+                              message=f"Stopped at the {max_bytes // (1024 * 1024)} MB result limit after {len(rows):,} rows")
+                break
+        result['frame'] = pd.DataFrame.from_records(rows, columns=columns)
+    except sqlite3.OperationalError as error:
+        if cancel_event.is_set():
+            result.update(status='cancelled', message="Cancelled")
+        elif time.monotonic() > deadline:
+            result.update(status='timeout', message=f"Stopped after the {timeout:g}s time limit")
+        else:
+            result.update(status='error', message=str(error))
+    except sqlite3.DatabaseError as error:
+        message = str(error)
+        if message == 'not authorized':
+            message = "Not allowed: only read-only SELECT statements can run here"
+        result.update(status='error', message=message)
+    except sqlite3.Error as error:
+        result.update(status='error', message=str(error))
+    finally:
+        if conn is not None:
+            conn.close()
+        _slots.release()
+
+    result['elapsed'] = time.monotonic() - started
+    record(f"adhoc:{result['status']}", sql, result['elapsed'] * 1000, rows=len(result['frame']))
+    return result
+
+
+# Start a governed query in a background thread; the job dict gets 'result' when it finishes
+def start_governed(path, sql, **limits):
+    job = {'sql': sql, 'cancel': threading.Event(), 'result': None, 'started': time.monotonic()}
+
+    def work():
+        job['result'] = run_governed(path, sql, job['cancel'], **limits)
+
+    job['thread'] = threading.Thread(target=work, daemon=True)
+    job['thread'].start()
+    return job
+
+
+def cancel(job):
+    job['cancel'].set()
@@ -0,0 +1,284 @@
+# Query timing and slow-query log
+# Every instrumented database call records its duration, rows, bytes and cache
+# hit/miss. Slow statements also get their EXPLAIN QUERY PLAN, unless the caller is inside
+# a write transaction. Records are buffered in memory and a background thread flushes them
+# in batches to a separate metrics database with bounded retention.
+
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from components.storage import adapt_sql, connection_dialect, dbapi_connection
+
+METRICS_ENABLED = os.environ.get('QUERY_METRICS', '1') != '0'
+METRICS_DATABASE = os.environ.get('QUERY_METRICS_DB', 'query_metrics.db')
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+RETENTION_ROWS = int(os.environ.get('QUERY_METRICS_RETENTION', '50000'))
+FLUSH_EVERY_ROWS = 100
+FLUSH_EVERY_SECONDS = 5.0
+FRAME_SAMPLE_ROWS = 100
+
+CREATE_METRICS_SQL = """
+CREATE TABLE IF NOT EXISTS query_metrics (
+    Metric_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Recorded_At TEXT NOT NULL,
+    Label TEXT NOT NULL,
+    Statement TEXT NOT NULL,
+    Duration_MS REAL NOT NULL,
+    Rows_Returned INTEGER,
+    Bytes INTEGER,
+    Cache_Hit INTEGER,
+    Query_Plan TEXT
+)
+"""
+
+_buffer = []
+_lock = threading.Lock()
+_flush_wanted = threading.Event()
+_flusher = None
+_stopping = False
+
+
+# Whether the caller has uncommitted writes (or, on SQLite, any open transaction);
+# a plan captured then would run inside it and lengthen the time its locks are held
+def holds_write_transaction(conn):
+    raw = dbapi_connection(conn)
+    if connection_dialect(conn) == 'sqlite':
+        return raw.in_transaction
+    if getattr(raw, 'autocommit', False):
+        return False
+    cursor = raw.cursor()
+    try:
+        cursor.execute("SELECT txid_current_if_assigned() IS NOT NULL")
+        return cursor.fetchone()[0]
+    except Exception:
+        return True
+    finally:
+        cursor.close()
+
+
+# Plan for a statement, as the indented tree SQLite prints (EXPLAIN output elsewhere)
+def explain_query_plan(conn, sql, params=None):
+    dialect = connection_dialect(conn)
+    cursor = conn.cursor()
+    try:
+        if dialect != 'sqlite':
+            # A failed statement aborts the whole PostgreSQL transaction; confine it to a savepoint
+            # so the pooled connection (and the caller's uncommitted work) stays usable
+            in_transaction = not getattr(dbapi_connection(conn), 'autocommit', False)
+            if in_transaction:
+                cursor.execute("SAVEPOINT explain_plan")
+            try:
+                cursor.execute(adapt_sql("EXPLAIN " + sql, dialect), tuple(params or ()))
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception:
+                if in_transaction:
+                    cursor.execute("ROLLBACK TO SAVEPOINT explain_plan")
+                raise
+            if in_transaction:
+                cursor.execute("RELEASE SAVEPOINT explain_plan")
+            return plan
+        rows = cursor.execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+    except Exception:
+        # A plan is best effort; the statement itself already ran
+        return None
+    finally:
+        cursor.close()
+    depth = {0: 0}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return "\n".join(lines)
+
+
+# Rough size of fetched rows, sampled so large results stay cheap to measure
+def estimate_row_bytes(rows, sample_size=100):
+    if not rows:
+        return 0
+    sample = rows[:sample_size]
+    sample_bytes = sum(sys.getsizeof(value) for row in sample for value in row)
+    return int(sample_bytes * len(rows) / len(sample))
+
+
+# Rough size of a frame: deep usage of the first rows, scaled to the full length
+def frame_bytes(df, sample_size=FRAME_SAMPLE_ROWS):
+    if len(df) <= sample_size:
+        return int(df.memory_usage(index=False, deep=True).sum())
+    sample_bytes = df.iloc[:sample_size].memory_usage(index=False, deep=True).sum()
+    return int(sample_bytes * len(df) / sample_size)
+
+
+def record(label, sql, duration_ms, rows=None, nbytes=None, cache_hit=None, conn=None, params=None):
+    if not METRICS_ENABLED:
+        return
+    plan = None
+    if conn is not None and duration_ms >= SLOW_QUERY_MS and not holds_write_transaction(conn):
+        plan = explain_query_plan(conn, sql, params)
+
+    entry = (
+        datetime.now().isoformat(timespec='milliseconds'),
+        label or 'unlabelled',
+        " ".join(sql.split()),
+        duration_ms,
+        rows,
+        nbytes,
+        None if cache_hit is None else int(cache_hit),
+        plan,
+    )
+    global _flusher
+    with _lock:
+        _buffer.append(entry)
+        due = len(_buffer) >= FLUSH_EVERY_ROWS
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, daemon=True)
+            _flusher.start()
+    if due:
+        _flush_wanted.set()
+
+
+# Background writer: flushes every FLUSH_EVERY_SECONDS, or sooner once FLUSH_EVERY_ROWS are buffered
+def _flush_loop():
+    while not _stopping:
+        _flush_wanted.wait(FLUSH_EVERY_SECONDS)
+        _flush_wanted.clear()
+        try:
+            flush_metrics()
+        except Exception as error:
+            print(f"Query metrics flush failed: {error}", file=sys.stderr)
+
+
+# A forked child (e.g. a report worker) gets a fresh lock, buffer and flusher; the parent's
+# buffered records stay with the parent, which writes them itself
+def _reset_after_fork():
+    global _lock, _flush_wanted, _flusher
+    _buffer.clear()
+    _lock = threading.Lock()
+    _flush_wanted = threading.Event()
+    _flusher = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def flush_metrics():
+    with _lock:
+        pending = _buffer[:]
+        _buffer.clear()
+    if not pending:
+        return
+
+    conn = sqlite3.connect(METRICS_DATABASE, timeout=5)
+    try:
+        conn.execute(CREATE_METRICS_SQL)
+        conn.executemany("""
+            INSERT INTO query_metrics
+                (Recorded_At, Label, Statement, Duration_MS, Rows_Returned, Bytes, Cache_Hit, Query_Plan)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, pending)
+        # Keep only the most recent RETENTION_ROWS records
+        conn.execute(
+            "DELETE FROM query_metrics WHERE Metric_ID <= (SELECT MAX(Metric_ID) FROM query_metrics) - ?",
+            (RETENTION_ROWS,)
+        )
+        conn.commit()
+    except sqlite3.Error:
+        # Metrics must never break the caller; drop this batch
+        pass
+    finally:
+        conn.close()
+
+
+# At exit, let the background writer finish its batch (so no write is cut off midway), then flush the rest
+def _flush_at_exit():
+    global _stopping
+    _stopping = True
+    _flush_wanted.set()
+    if _flusher is not None:
+        _flusher.join(timeout=10)
+    flush_metrics()
+
+
+atexit.register(_flush_at_exit)
+
+
+def _read_frame(conn, sql, params):
+    dialect = connection_dialect(conn)
+    if dialect == 'sqlite':
+        return pd.read_sql_query(sql, dbapi_connection(conn), params=params)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(adapt_sql(sql, dialect), tuple(params or ()))
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+    finally:
+        cursor.close()
+
+
+# Instrumented equivalents of the calls used across the app and scripts.
+# SQL is written for SQLite and adapted to the connection's dialect here.
+def timed_read_sql(conn, sql, params=None, label=None, cache_hit=None):
+    started = time.perf_counter()
+    df = _read_frame(conn, sql, params)
+    duration_ms = (time.perf_counter() - started) * 1000
+    if METRICS_ENABLED:
+        record(label, sql, duration_ms, len(df), frame_bytes(df), cache_hit, conn, params)
+    return df
+
+
+def timed_fetchall(cursor, sql, params=(), label=None):
+    started = time.perf_counter()
+    cursor.execute(adapt_sql(sql, connection_dialect(cursor.connection)), tuple(params))
+    rows = cursor.fetchall()
+    duration_ms = (time.perf_counter() - started) * 1000
+    if METRICS_ENABLED:
+        record(label, sql, duration_ms, len(rows), estimate_row_bytes(rows),
+               conn=cursor.connection, params=params)
+    return rows
+
+
+def timed_execute(cursor, sql, params=(), label=None):
+    started = time.perf_counter()
+    cursor.execute(adapt_sql(sql, connection_dialect(cursor.connection)), tuple(params))
+    duration_ms = (time.perf_counter() - started) * 1000
+    if METRICS_ENABLED:
+        record(label, sql, duration_ms, max(cursor.rowcount, 0),
+               conn=cursor.connection, params=params)
+    return cursor
+
+
+# Read back recorded metrics for the Performance page
+def load_metrics(limit=RETENTION_ROWS):
+    flush_metrics()
+    if not os.path.exists(METRICS_DATABASE):
+        return pd.DataFrame(columns=['Recorded_At', 'Label', 'Statement', 'Duration_MS',
+                                     'Rows_Returned', 'Bytes', 'Cache_Hit', 'Query_Plan'])
+    conn = sqlite3.connect(METRICS_DATABASE)
+    try:
+        conn.execute(CREATE_METRICS_SQL)
+        return pd.read_sql_query(
+            "SELECT * FROM query_metrics ORDER BY Metric_ID DESC LIMIT ?", conn, params=(limit,)
+        )
+    finally:
+        conn.close()
+
+
+# Duration percentiles, volume and cache hit rate per label
+def summarize_metrics(metrics):
+    grouped = metrics.groupby('Label')
+    summary = pd.DataFrame({
+        'Calls': grouped.size(),
+        'p50_ms': grouped['Duration_MS'].quantile(0.50),
+        'p95_ms': grouped['Duration_MS'].quantile(0.95),
+        'p99_ms': grouped['Duration_MS'].quantile(0.99),
+        'Max_ms': grouped['Duration_MS'].max(),
+        'Avg_Rows': grouped['Rows_Returned'].mean(),
+        'Cache_Hit_Rate': grouped['Cache_Hit'].mean(),
+    })
+    return summary.sort_values('p95_ms', ascending=False).round(2).reset_index()
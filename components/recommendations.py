@@ -0,0 +1,289 @@
+# Precomputed top-k listing recommendations per receiver
+# Listings are one-hot encoded over (food type, meal type, provider, location) into a
+# sparse listing x feature matrix. Claims weighted by status give a sparse receiver x
+# listing matrix, and their product is each receiver's feature affinity. Available
+# listings are scored with one sparse product per block of receivers and the top k are
+# stored in receiver_recommendations. New listings are scored against the stored
+# affinities and merged into the existing lists without a full rebuild.
+# Run from the repository root with: python -m components.recommendations [--incremental]
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from components.archival import history_reader
+from components.claim_reservations import ensure_claim_quantities
+from components.query_metrics import timed_read_sql
+from components.storage import sqlite_path
+
+TOP_K = 10
+BLOCK_CELLS = 4_000_000  # receiver x listing scores held densely at once (~32 MB)
+
+# Listing column -> weight of a match on that column
+FEATURE_WEIGHTS = {'Food_Type': 1.0, 'Meal_Type': 0.5, 'Provider_ID': 2.0, 'Location': 1.5}
+
+# How much a past claim says about what the receiver wants
+STATUS_WEIGHTS = {'Completed': 1.0, 'Pending': 0.6, 'Cancelled': 0.2}
+
+AVAILABLE_LISTINGS_SQL = """
+    SELECT Food_ID, Food_Type, Meal_Type, Provider_ID, Location
+    FROM food_listings
+    WHERE Remaining_Quantity > 0
+"""
+
+CREATE_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS recommendation_features (
+    Feature_ID INTEGER PRIMARY KEY,
+    Feature_Column TEXT NOT NULL,
+    Feature_Value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS receiver_affinity (
+    Receiver_ID INTEGER NOT NULL,
+    Feature_ID INTEGER NOT NULL,
+    Weight REAL NOT NULL,
+    PRIMARY KEY (Receiver_ID, Feature_ID)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS receiver_recommendations (
+    Receiver_ID INTEGER NOT NULL,
+    Rank INTEGER NOT NULL,
+    Food_ID INTEGER NOT NULL,
+    Score REAL NOT NULL,
+    PRIMARY KEY (Receiver_ID, Rank)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS recommendation_state (
+    Last_Food_ID INTEGER NOT NULL,
+    Refreshed_At TEXT NOT NULL
+);
+"""
+
+
+def _feature_keys(listings):
+    return pd.concat(
+        [column + '=' + listings[column].astype(str) for column in FEATURE_WEIGHTS],
+        axis=1, keys=list(FEATURE_WEIGHTS)
+    )
+
+
+# Sparse listing x feature matrix; values missing from the vocabulary are dropped
+def listing_feature_matrix(listings, vocabulary):
+    keys = _feature_keys(listings)
+    rows = np.repeat(np.arange(len(listings)), len(FEATURE_WEIGHTS))
+    columns = keys.stack().map(vocabulary).to_numpy()
+    known = ~pd.isna(columns)
+    return sparse.csr_matrix(
+        (np.ones(known.sum()), (rows[known], columns[known].astype(np.int64))),
+        shape=(len(listings), len(vocabulary))
+    )
+
+
+def _feature_weights(vocabulary):
+    columns = pd.Series(vocabulary.index.str.split('=', n=1).str[0])
+    return columns.map(FEATURE_WEIGHTS).to_numpy()
+
+
+# Receiver x feature affinity: status-weighted claims times listing features, weighted
+# per column and normalized so every receiver's weights sum to 1
+def build_affinity(claims, listings, vocabulary, receiver_ids):
+    listing_position = pd.Series(np.arange(len(listings)), index=listings['Food_ID'])
+    receiver_position = pd.Series(np.arange(len(receiver_ids)), index=receiver_ids)
+    claims = claims[claims['Food_ID'].isin(listing_position.index)]
+
+    claim_matrix = sparse.csr_matrix(
+        (claims['Status'].map(STATUS_WEIGHTS).fillna(0).to_numpy(),
+         (receiver_position[claims['Receiver_ID']].to_numpy(), listing_position[claims['Food_ID']].to_numpy())),
+        shape=(len(receiver_ids), len(listings))
+    )
+    affinity = claim_matrix @ listing_feature_matrix(listings, vocabulary)
+    affinity = affinity @ sparse.diags(_feature_weights(vocabulary))
+    totals = np.asarray(affinity.sum(axis=1)).ravel()
+    affinity = sparse.diags(np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)) @ affinity
+    return affinity.tocsr(), claim_matrix
+
+
+# Top k (position, score) per receiver, scoring one block of receivers at a time
+def top_k_scores(affinity, candidate_features, k, exclude=None):
+    k = min(k, candidate_features.shape[0])
+    if k == 0 or affinity.shape[0] == 0:
+        # No receivers with claims or no candidate listings: nothing to score
+        return pd.DataFrame({
+            'receiver': np.array([], dtype=np.intp),
+            'position': np.array([], dtype=np.intp),
+            'Score': np.array([], dtype=float),
+        })
+    candidate_features = candidate_features.tocsr()
+    block_rows = max(1, BLOCK_CELLS // max(1, candidate_features.shape[0]))
+    receivers, positions, scores = [], [], []
+    for start in range(0, affinity.shape[0], block_rows):
+        # Both operands stay sparse; only the receiver x candidate score block is densified
+        block = (candidate_features @ affinity[start:start + block_rows].T).T.toarray()
+        if exclude is not None:
+            excluded = exclude[start:start + block_rows].nonzero()
+            block[excluded] = 0
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        keep = top_scores > 0
+        receivers.append(np.nonzero(keep)[0] + start)
+        positions.append(top[keep])
+        scores.append(top_scores[keep])
+    return pd.DataFrame({
+        'receiver': np.concatenate(receivers),
+        'position': np.concatenate(positions),
+        'Score': np.concatenate(scores),
+    })
+
+
+def _rank(recommendations, k):
+    recommendations = recommendations.sort_values(['Receiver_ID', 'Score', 'Food_ID'], ascending=[True, False, True])
+    recommendations = recommendations.groupby('Receiver_ID').head(k)
+    recommendations['Rank'] = recommendations.groupby('Receiver_ID').cumcount() + 1
+    return recommendations[['Receiver_ID', 'Rank', 'Food_ID', 'Score']]
+
+
+def _write_recommendations(conn, recommendations, receiver_ids=None):
+    if receiver_ids is None:
+        conn.execute("DELETE FROM receiver_recommendations")
+    else:
+        conn.executemany("DELETE FROM receiver_recommendations WHERE Receiver_ID = ?",
+                         [(int(receiver_id),) for receiver_id in receiver_ids])
+    conn.executemany(
+        "INSERT INTO receiver_recommendations VALUES (?, ?, ?, ?)",
+        recommendations.astype({'Receiver_ID': int, 'Rank': int, 'Food_ID': int, 'Score': float})
+        .itertuples(index=False, name=None)
+    )
+
+
+def _write_state(conn, last_food_id):
+    conn.execute("DELETE FROM recommendation_state")
+    conn.execute("INSERT INTO recommendation_state VALUES (?, ?)",
+                 (int(last_food_id), datetime.now().isoformat(timespec='seconds')))
+
+
+# Full rebuild: vocabulary, affinities and top-k lists for every receiver.
+# Affinities learn from archived claims too; only hot listings can be recommended.
+def build_recommendations(conn, k=TOP_K):
+    conn.executescript(CREATE_TABLES_SQL)
+    # Read first: any listing available now is still in the hot or archived listings below
+    available = timed_read_sql(conn, AVAILABLE_LISTINGS_SQL, label="recommendations:available")
+    with history_reader(conn) as history:
+        listings = timed_read_sql(history, "SELECT Food_ID, Food_Type, Meal_Type, Provider_ID, Location "
+                                           "FROM food_listings", label="recommendations:listings")
+        claims = timed_read_sql(history, "SELECT Receiver_ID, Food_ID, Status FROM claims",
+                                label="recommendations:claims")
+    receiver_ids = np.sort(claims['Receiver_ID'].unique())
+
+    vocabulary = pd.Index(np.unique(_feature_keys(listings).to_numpy().ravel()))
+    vocabulary = pd.Series(np.arange(len(vocabulary)), index=vocabulary)
+    affinity, claim_matrix = build_affinity(claims, listings, vocabulary, receiver_ids)
+
+    available_position = listings.reset_index().set_index('Food_ID').loc[available['Food_ID'], 'index'].to_numpy()
+    top = top_k_scores(affinity, listing_feature_matrix(available, vocabulary), k,
+                       exclude=claim_matrix[:, available_position])
+    recommendations = _rank(pd.DataFrame({
+        'Receiver_ID': receiver_ids[top['receiver']],
+        'Food_ID': available['Food_ID'].to_numpy()[top['position']],
+        'Score': top['Score'].round(4),
+    }), k)
+
+    affinity = affinity.tocoo()
+    conn.execute("DELETE FROM recommendation_features")
+    conn.executemany("INSERT INTO recommendation_features VALUES (?, ?, ?)", [
+        (int(feature_id), *key.split('=', 1)) for key, feature_id in vocabulary.items()
+    ])
+    conn.execute("DELETE FROM receiver_affinity")
+    conn.executemany("INSERT INTO receiver_affinity VALUES (?, ?, ?)", zip(
+        receiver_ids[affinity.row].tolist(), affinity.col.tolist(), affinity.data.tolist()
+    ))
+    _write_recommendations(conn, recommendations)
+    _write_state(conn, listings['Food_ID'].max() if len(listings) else 0)
+    conn.commit()
+    return recommendations
+
+
+# Score listings added since the last refresh and merge them into the stored lists
+def refresh_new_listings(conn, k=TOP_K):
+    conn.executescript(CREATE_TABLES_SQL)
+    state = conn.execute("SELECT Last_Food_ID FROM recommendation_state").fetchone()
+    if state is None:
+        return build_recommendations(conn, k)
+
+    new_listings = timed_read_sql(conn, AVAILABLE_LISTINGS_SQL + " AND Food_ID > ?", [state[0]],
+                                  label="recommendations:new_listings")
+    if new_listings.empty:
+        return new_listings
+
+    features = timed_read_sql(conn, "SELECT Feature_ID, Feature_Column, Feature_Value FROM recommendation_features",
+                              label="recommendations:features")
+    vocabulary = pd.Series(features['Feature_ID'].to_numpy(),
+                           index=features['Feature_Column'] + '=' + features['Feature_Value'])
+    stored = timed_read_sql(conn, "SELECT Receiver_ID, Feature_ID, Weight FROM receiver_affinity",
+                            label="recommendations:affinity")
+    # An empty table reads back as object columns, which scipy.sparse rejects
+    stored = stored.astype({'Receiver_ID': int, 'Feature_ID': int, 'Weight': float})
+    receiver_ids = np.sort(stored['Receiver_ID'].unique())
+    affinity = sparse.csr_matrix(
+        (stored['Weight'].to_numpy(),
+         (np.searchsorted(receiver_ids, stored['Receiver_ID'].to_numpy()), stored['Feature_ID'].to_numpy())),
+        shape=(len(receiver_ids), len(vocabulary))
+    )
+
+    top = top_k_scores(affinity, listing_feature_matrix(new_listings, vocabulary), k)
+    candidates = pd.DataFrame({
+        'Receiver_ID': receiver_ids[top['receiver']],
+        'Food_ID': new_listings['Food_ID'].to_numpy()[top['position']],
+        'Score': top['Score'].round(4),
+    })
+    affected = candidates['Receiver_ID'].unique()
+    if len(affected):
+        current = timed_read_sql(conn, "SELECT Receiver_ID, Food_ID, Score FROM receiver_recommendations",
+                                 label="recommendations:current")
+        merged = _rank(pd.concat([current[current['Receiver_ID'].isin(affected)], candidates]), k)
+        _write_recommendations(conn, merged, affected)
+    _write_state(conn, max(state[0], new_listings['Food_ID'].max()))
+    conn.commit()
+    return candidates
+
+
+# Stored recommendations for one receiver that can still be claimed
+def load_recommendations(conn, receiver_id):
+    return timed_read_sql(conn, """
+        SELECT r.Rank, f.Food_Name, f.Remaining_Quantity, f.Food_Type, f.Meal_Type, f.Location,
+               f.Expiry_Date, r.Score
+        FROM receiver_recommendations r
+        JOIN food_listings f ON f.Food_ID = r.Food_ID
+        WHERE r.Receiver_ID = ? AND f.Remaining_Quantity > 0
+        ORDER BY r.Rank
+    """, [int(receiver_id)], label="recommendations:receiver")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or incrementally refresh listing recommendations")
+    parser.add_argument('--incremental', action='store_true', help="only score listings added since the last run")
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    parser.add_argument('--database', default=None, help="SQLite file (default: from DATABASE_URL)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database or sqlite_path())
+    try:
+        ensure_claim_quantities(conn)
+        started = time.perf_counter()
+        if args.incremental:
+            scored = refresh_new_listings(conn, args.top_k)
+            print(f"✓ {len(scored)} new recommendations merged in {time.perf_counter() - started:.2f}s")
+        else:
+            recommendations = build_recommendations(conn, args.top_k)
+            print(f"✓ {len(recommendations)} recommendations for "
+                  f"{recommendations['Receiver_ID'].nunique()} receivers in {time.perf_counter() - started:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
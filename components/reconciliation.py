@@ -0,0 +1,227 @@
+# CSV-to-database reconciliation with per-key-range checksums
+# Every row is normalized to the same typed values on both sides (the transformed CSV
+# datasets and the loaded tables), hashed column by column with pandas' vectorized
+# hash_array and summed per primary-key range. The sums don't depend on row order, so the database side
+# is streamed in chunks with no ORDER BY. Only ranges whose row count or checksum
+# differ are read again and compared row by row to report missing, extra and changed rows.
+# Run from the repository root with: python -m components.reconciliation [--range-size N]
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from components.storage import adapt_sql, connect, connection_dialect, is_sqlite, sqlite_path
+
+RANGE_SIZE = int(os.environ.get('RECONCILE_RANGE_SIZE', '10000'))  # primary-key values per range
+CHUNK_ROWS = 200_000
+MAX_REPORTED_ROWS = 20
+NULL_TEXT = '<NA>'
+NULL_INTEGER = np.iinfo(np.int64).min
+ROW_HASH_MULTIPLIER = np.uint64(1099511628211)  # FNV-1a 64-bit prime
+
+# Loaded table -> primary key
+KEY_COLUMNS = {
+    'providers': 'Provider_ID',
+    'receivers': 'Receiver_ID',
+    'food_listings': 'Food_ID',
+    'claims': 'Claim_ID',
+}
+
+
+# Same text for the same value whichever side it came from (e.g. 5 vs 5.0, NaT vs NULL,
+# datetime64 vs the stored '2025-03-17 00:00:00.000000')
+def canonical(frame, dtypes):
+    columns = {}
+    for column, dtype in dtypes.items():
+        values = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            text = pd.to_datetime(values, errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        elif pd.api.types.is_integer_dtype(dtype):
+            text = pd.to_numeric(values, errors='coerce').astype('Int64').astype(str)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            text = pd.to_numeric(values, errors='coerce').astype('Float64').astype(str)
+        else:
+            text = values.astype(object).where(values.notna(), None).astype(str)
+        columns[column] = text.where(values.notna(), NULL_TEXT)
+    return pd.DataFrame(columns, index=frame.index)
+
+
+# Typed values hashed directly; only text columns go through strings
+def _column_hash(values, dtype):
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        stamps = pd.to_datetime(values, errors='coerce', format='ISO8601').astype('datetime64[ns]')
+        array = stamps.to_numpy().view(np.int64)
+    elif pd.api.types.is_integer_dtype(dtype):
+        array = pd.to_numeric(values, errors='coerce').astype('Int64').to_numpy(np.int64, na_value=NULL_INTEGER)
+    elif pd.api.types.is_numeric_dtype(dtype):
+        array = pd.to_numeric(values, errors='coerce').astype('Float64').to_numpy(np.float64, na_value=np.nan)
+    else:
+        array = values.astype(object).where(values.notna(), NULL_TEXT).astype(str).to_numpy(object)
+    return pd.util.hash_array(array, categorize=False)
+
+
+def row_hashes(frame, dtypes):
+    hashes = np.zeros(len(frame), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for column, dtype in dtypes.items():
+            hashes = hashes * ROW_HASH_MULTIPLIER ^ _column_hash(frame[column], dtype)
+    return hashes
+
+
+# Rows and hash sums per key range. The 64-bit hashes are summed as two 32-bit halves,
+# so the sums are exact for up to 2**32 rows per range.
+def range_checksums(keys, hashes, range_size=RANGE_SIZE):
+    return pd.DataFrame({
+        'Range': keys // range_size,
+        'Rows': 1,
+        'Hash_High': (hashes >> np.uint64(32)).astype(np.int64),
+        'Hash_Low': (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64),
+    }).groupby('Range').sum()
+
+
+def _merge_checksums(parts):
+    if not parts:
+        return pd.DataFrame(columns=['Rows', 'Hash_High', 'Hash_Low'], index=pd.Index([], name='Range'))
+    return pd.concat(parts).groupby(level=0).sum()
+
+
+def _fetch_chunks(conn, sql, params=()):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(adapt_sql(sql, connection_dialect(conn)), tuple(params))
+        columns = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cursor.close()
+
+
+def database_checksums(conn, table, key, dtypes, range_size=RANGE_SIZE):
+    select_list = ", ".join(f'"{column}"' for column in dtypes)
+    parts = []
+    for chunk in _fetch_chunks(conn, f'SELECT {select_list} FROM "{table}"'):
+        keys = pd.to_numeric(chunk[key]).to_numpy(dtype=np.int64)
+        parts.append(range_checksums(keys, row_hashes(chunk, dtypes), range_size))
+    return _merge_checksums(parts)
+
+
+# Ranges whose row count or checksum differ between the two sides
+def mismatched_ranges(source, database):
+    both = source.join(database, how='outer', lsuffix='_Source', rsuffix='_Database').fillna(0)
+    differs = ((both['Rows_Source'] != both['Rows_Database'])
+               | (both['Hash_High_Source'] != both['Hash_High_Database'])
+               | (both['Hash_Low_Source'] != both['Hash_Low_Database']))
+    return both.index[differs].astype(np.int64).tolist()
+
+
+# Row-level comparison inside the mismatched ranges only
+def drill_down(conn, table, key, source, dtypes, ranges, range_size=RANGE_SIZE):
+    select_list = ", ".join(f'"{column}"' for column in dtypes)
+    source_keys = pd.to_numeric(source[key]).to_numpy(dtype=np.int64)
+    missing, extra, changed = [], [], []
+    for range_id in ranges:
+        low, high = range_id * range_size, (range_id + 1) * range_size - 1
+        expected = source[(source_keys >= low) & (source_keys <= high)]
+        actual = pd.concat(
+            list(_fetch_chunks(conn, f'SELECT {select_list} FROM "{table}" WHERE "{key}" BETWEEN ? AND ?', (low, high)))
+            or [pd.DataFrame(columns=list(dtypes))],
+            ignore_index=True
+        )
+        expected_text = canonical(expected, dtypes).set_index(pd.to_numeric(expected[key]).astype(np.int64))
+        actual_text = canonical(actual, dtypes).set_index(pd.to_numeric(actual[key]).astype(np.int64))
+
+        missing += expected_text.index.difference(actual_text.index).tolist()
+        extra += actual_text.index.difference(expected_text.index).tolist()
+        common = expected_text.index.intersection(actual_text.index)
+        left, right = expected_text.loc[common], actual_text.loc[common]
+        for row_key in common[(left != right).any(axis=1).to_numpy()]:
+            differing = left.columns[(left.loc[row_key] != right.loc[row_key]).to_numpy()]
+            changed.append((row_key, {column: (left.at[row_key, column], right.at[row_key, column])
+                                      for column in differing}))
+    return {'missing': missing, 'extra': extra, 'changed': changed}
+
+
+def reconcile_table(conn, table, source, range_size=RANGE_SIZE):
+    key = KEY_COLUMNS[table]
+    dtypes = source.dtypes.to_dict()
+    started = time.perf_counter()
+
+    source_keys = pd.to_numeric(source[key]).to_numpy(dtype=np.int64)
+    source_sums = range_checksums(source_keys, row_hashes(source, dtypes), range_size)
+    database_sums = database_checksums(conn, table, key, dtypes, range_size)
+    ranges = mismatched_ranges(source_sums, database_sums)
+    differences = drill_down(conn, table, key, source, dtypes, ranges, range_size) if ranges else {
+        'missing': [], 'extra': [], 'changed': []
+    }
+    return {
+        'table': table,
+        'source_rows': len(source),
+        'database_rows': int(database_sums['Rows'].sum()),
+        'ranges': len(source_sums.index.union(database_sums.index)),
+        'mismatched_ranges': ranges,
+        'seconds': time.perf_counter() - started,
+        **differences,
+    }
+
+
+# datasets maps table name -> the DataFrame that was loaded into it
+def reconcile(conn, datasets, range_size=RANGE_SIZE):
+    return [reconcile_table(conn, table, source, range_size) for table, source in datasets.items()]
+
+
+def print_reconciliation(results):
+    for result in results:
+        problems = len(result['missing']) + len(result['extra']) + len(result['changed'])
+        status = "✓" if problems == 0 else "⚠"
+        print(f"{status} {result['table']}: {result['source_rows']} source rows, {result['database_rows']} in database, "
+              f"{len(result['mismatched_ranges'])}/{result['ranges']} key ranges differ ({result['seconds']:.2f}s)")
+        for label in ('missing', 'extra'):
+            if result[label]:
+                keys = result[label][:MAX_REPORTED_ROWS]
+                print(f"    {len(result[label])} {label} in database: {keys}{' ...' if len(result[label]) > len(keys) else ''}")
+        for row_key, columns in result['changed'][:MAX_REPORTED_ROWS]:
+            details = ", ".join(f"{column}: {source!r} -> {database!r}" for column, (source, database) in columns.items())
+            print(f"    changed {row_key}: {details}")
+        if len(result['changed']) > MAX_REPORTED_ROWS:
+            print(f"    ... {len(result['changed']) - MAX_REPORTED_ROWS} more changed rows")
+
+
+def main():
+    # Imported here: data_ingestion runs the reconciliation after every load
+    from components.archival import connect_history
+    from components.data_ingestion import DATA_DIR, DATASET_FILES, prepare_datasets
+
+    parser = argparse.ArgumentParser(description="Reconcile the source CSVs against the loaded database")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--database', default=None, help="SQLite path or database URL (default: DATABASE_URL)")
+    parser.add_argument('--range-size', type=int, default=RANGE_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    # The ingestion transforms print their own report; only the reconciliation is wanted here
+    with contextlib.redirect_stdout(io.StringIO()):
+        datasets, _, _ = prepare_datasets(args.data_dir)
+    print(f"✓ Source CSVs read and transformed in {time.perf_counter() - started:.2f}s")
+
+    # On SQLite include archived rows, which were loaded from the same CSVs
+    conn = connect_history(sqlite_path(args.database)) if is_sqlite(args.database) else connect(args.database)
+    try:
+        results = reconcile(conn, {table: datasets[name] for name, (_, table) in DATASET_FILES.items()},
+                            args.range_size)
+    finally:
+        conn.close()
+    print_reconciliation(results)
+    clean = all(not (result['missing'] or result['extra'] or result['changed']) for result in results)
+    raise SystemExit(0 if clean else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# Background report generation
+# Reports run in a process pool so heavy joins never block the Streamlit request.
+# Each job is tracked in the report_jobs table with its status, progress and the
+# data version it was built from; results are written to CSV files and reused until
+# the tables the report reads change.
+
+import csv
+import os
+import sqlite3
+import time
+import traceback
+from datetime import datetime
+
+import pandas as pd
+
+from components.archival import open_history
+from components.data_versions import data_version, ensure_data_versions
+from components.query_metrics import record, flush_metrics
+from components.storage import sqlite_path
+
+RESULTS_DIR = 'reports'
+FETCH_SIZE = 5000
+
+# Report name -> (title, SQL, tables the report reads)
+REPORTS = {
+    'wastage': (
+        "Wastage Report",
+        """
+        SELECT f.Location, COUNT(f.Food_ID) as Unclaimed_Items, SUM(f.Quantity) as Wasted_Quantity
+        FROM food_listings f LEFT JOIN claims c ON f.Food_ID = c.Food_ID
+        WHERE c.Food_ID IS NULL OR c.Status = 'Cancelled'
+        GROUP BY f.Location ORDER BY Wasted_Quantity DESC
+        """,
+        ('food_listings', 'claims'),
+    ),
+    'performance': (
+        "Performance Report",
+        """
+        SELECT p.Name, COUNT(c.Claim_ID) as Successful_Claims
+        FROM providers p JOIN food_listings f ON p.Provider_ID = f.Provider_ID
+        JOIN claims c ON f.Food_ID = c.Food_ID
+        WHERE c.Status = 'Completed'
+        GROUP BY p.Provider_ID, p.Name ORDER BY Successful_Claims DESC LIMIT 10
+        """,
+        ('providers', 'food_listings', 'claims'),
+    ),
+}
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+CREATE_JOBS_SQL = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    Job_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Report TEXT NOT NULL,
+    Data_Version TEXT NOT NULL,
+    Status TEXT NOT NULL,
+    Progress INTEGER NOT NULL DEFAULT 0,
+    Message TEXT,
+    Row_Count INTEGER,
+    Result_Path TEXT,
+    Submitted_At TEXT NOT NULL,
+    Finished_At TEXT
+)
+"""
+
+
+# Create the jobs table; jobs left in flight by a previous app process can never finish
+def ensure_report_jobs(conn):
+    conn.execute(CREATE_JOBS_SQL)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_report_jobs_report ON report_jobs (Report, Data_Version)")
+    conn.execute(
+        "UPDATE report_jobs SET Status = 'failed', Message = 'Interrupted by app restart' "
+        "WHERE Status IN ('queued', 'running')"
+    )
+    conn.commit()
+    ensure_data_versions(conn)
+
+
+def _update_job(conn, job_id, **fields):
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    conn.execute(f"UPDATE report_jobs SET {assignments} WHERE Job_ID = ?", (*fields.values(), job_id))
+    conn.commit()
+
+
+# Runs inside a worker process: stream the report rows to CSV and record progress
+def run_report_job(job_id, report, database_name=None, results_dir=RESULTS_DIR):
+    conn = sqlite3.connect(database_name or sqlite_path(), timeout=30)
+    try:
+        _update_job(conn, job_id, Status='running', Progress=10, Message='Running query')
+        _, sql, _ = REPORTS[report]
+        # Reports cover archived listings and claims too
+        open_history(conn)
+        os.makedirs(results_dir, exist_ok=True)
+        result_path = os.path.join(results_dir, f"{report}_{job_id}.csv")
+
+        started = time.perf_counter()
+        cursor = conn.execute(sql)
+        row_count = 0
+        with open(result_path, 'w', newline='', encoding='utf-8') as result_file:
+            writer = csv.writer(result_file)
+            writer.writerow([column[0] for column in cursor.description])
+            _update_job(conn, job_id, Progress=50, Message='Writing results')
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                row_count += len(rows)
+
+        record(f"report:{report}", sql, (time.perf_counter() - started) * 1000,
+               rows=row_count, nbytes=os.path.getsize(result_path), conn=conn)
+
+        _update_job(conn, job_id, Status='done', Progress=100, Message='Completed',
+                    Row_Count=row_count, Result_Path=result_path,
+                    Finished_At=datetime.now().isoformat(timespec='seconds'))
+    except Exception:
+        _update_job(conn, job_id, Status='failed', Message=traceback.format_exc(limit=3),
+                    Finished_At=datetime.now().isoformat(timespec='seconds'))
+        raise
+    finally:
+        conn.close()
+        # Worker processes are reused, so flush instead of waiting for exit
+        flush_metrics()
+
+
+# Mark a job failed if its worker died without reporting (e.g. the process was killed)
+def _on_job_finished(job_id, database_name):
+    def callback(future):
+        if future.exception() is None:
+            return
+        conn = sqlite3.connect(database_name, timeout=30)
+        try:
+            conn.execute(
+                "UPDATE report_jobs SET Status = 'failed', Message = ?, Finished_At = ? "
+                "WHERE Job_ID = ? AND Status IN ('queued', 'running')",
+                (repr(future.exception()), datetime.now().isoformat(timespec='seconds'), job_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    return callback
+
+
+def latest_job(conn, report, version=None):
+    sql = "SELECT * FROM report_jobs WHERE Report = ?"
+    params = [report]
+    if version is not None:
+        sql += " AND Data_Version = ? AND Status != 'failed'"
+        params.append(version)
+    sql += " ORDER BY Job_ID DESC LIMIT 1"
+    jobs = pd.read_sql_query(sql, conn, params=params)
+    return None if jobs.empty else jobs.iloc[0]
+
+
+# Queue a report unless a job for the current data version is already done or in flight
+def submit_report(conn, executor, report, database_name=None, results_dir=RESULTS_DIR):
+    # Resolved here so the worker process updates the database the job row was written to
+    database_name = database_name or sqlite_path()
+    _, _, tables = REPORTS[report]
+    version = data_version(conn, tables)
+
+    existing = latest_job(conn, report, version)
+    if existing is not None:
+        result_ready = existing['Status'] == 'done' and os.path.exists(existing['Result_Path'] or '')
+        if existing['Status'] in ACTIVE_STATUSES or result_ready:
+            return int(existing['Job_ID']), False
+
+    cursor = conn.execute(
+        "INSERT INTO report_jobs (Report, Data_Version, Status, Message, Submitted_At) VALUES (?, ?, 'queued', 'Queued', ?)",
+        (report, version, datetime.now().isoformat(timespec='seconds'))
+    )
+    conn.commit()
+    job_id = cursor.lastrowid
+
+    future = executor.submit(run_report_job, job_id, report, database_name, results_dir)
+    future.add_done_callback(_on_job_finished(job_id, database_name))
+    return job_id, True
+
+
+def is_current(conn, job):
+    _, _, tables = REPORTS[job['Report']]
+    return job['Data_Version'] == data_version(conn, tables)
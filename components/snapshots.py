@@ -0,0 +1,188 @@
+# Online database snapshots with rotation and verification
+# Snapshots are copied with SQLite's online backup API a few pages per step, sleeping
+# between steps so app writers get the database in between. In WAL mode the source
+# connection pins one read transaction for the whole copy: writers are never blocked and
+# the snapshot is a single point in time. In rollback-journal mode each step holds a
+# short shared lock, and a write from another connection restarts the copy.
+# Finished snapshots are integrity-checked before they replace the .partial file.
+# Run from the repository root with:
+#   python -m components.snapshots take | list | verify PATH | schedule --every 3600
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from components.storage import sqlite_path
+
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+SNAPSHOT_KEEP = int(os.environ.get('SNAPSHOT_KEEP', '7'))
+PAGES_PER_STEP = 256  # 1 MB per step at the default 4 KB page size
+STEP_SLEEP_SECONDS = 0.01
+MAX_RESTARTS = 20  # rollback-journal mode: give up if writers keep restarting the copy
+
+
+def journal_mode(conn):
+    return conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+
+
+def enable_wal(database_name):
+    conn = sqlite3.connect(database_name, timeout=30)
+    try:
+        return journal_mode(conn) == 'wal' or conn.execute("PRAGMA journal_mode=WAL").fetchone()[0] == 'wal'
+    finally:
+        conn.close()
+
+
+def snapshot_name(database_name, when=None):
+    stem = os.path.splitext(os.path.basename(database_name))[0]
+    return f"{stem}-{(when or datetime.now()).strftime('%Y%m%d-%H%M%S')}.db"
+
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR, database_name=None):
+    if not os.path.isdir(snapshot_dir):
+        return []
+    stem = os.path.splitext(os.path.basename(database_name or sqlite_path()))[0]
+    return sorted(
+        os.path.join(snapshot_dir, name) for name in os.listdir(snapshot_dir)
+        if name.startswith(f"{stem}-") and name.endswith('.db')
+    )
+
+
+# Full integrity check of a snapshot; returns (ok, problems)
+def verify_snapshot(path, quick=False):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA quick_check" if quick else "PRAGMA integrity_check")]
+        problems += [f"foreign key violation in {row[0]}" for row in conn.execute("PRAGMA foreign_key_check")]
+    except sqlite3.DatabaseError as error:
+        problems = [str(error)]
+    finally:
+        conn.close()
+    problems = [problem for problem in problems if problem != 'ok']
+    return not problems, problems
+
+
+# Copy the database page-step by page-step into snapshot_dir and verify it.
+# Returns a summary dict; raises if the copy keeps restarting or fails verification.
+def take_snapshot(database_name=None, snapshot_dir=SNAPSHOT_DIR, pages=PAGES_PER_STEP, sleep=STEP_SLEEP_SECONDS):
+    database_name = database_name or sqlite_path()
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, snapshot_name(database_name))
+    partial = path + '.partial'
+
+    source = sqlite3.connect(database_name, timeout=30, isolation_level=None)
+    target = sqlite3.connect(partial)
+    state = {'steps': 0, 'restarts': 0, 'remaining': None}
+
+    def progress(status, remaining, total):
+        if state['remaining'] is not None and remaining > state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > MAX_RESTARTS:
+                raise RuntimeError("Snapshot kept restarting under concurrent writes; "
+                                   "enable WAL mode (--enable-wal) for online snapshots")
+        state['remaining'] = remaining
+        state['steps'] += 1
+        # Yield to writers between steps
+        time.sleep(sleep)
+
+    started = time.perf_counter()
+    wal = journal_mode(source) == 'wal'
+    try:
+        if wal:
+            # Pin one read snapshot; in WAL mode this never blocks writers
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, progress=progress)
+    except BaseException:
+        target.close()
+        os.remove(partial)
+        raise
+    finally:
+        if wal:
+            source.execute("ROLLBACK")
+            # Checkpoint the WAL that built up during the copy here, not in the next writer's commit
+            source.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        source.close()
+    target.close()
+
+    ok, problems = verify_snapshot(partial)
+    if not ok:
+        os.replace(partial, path + '.corrupt')
+        raise RuntimeError(f"Snapshot failed verification: {'; '.join(problems[:5])}")
+    os.replace(partial, path)
+    return {
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - started,
+        'steps': state['steps'],
+        'restarts': state['restarts'],
+        'wal': wal,
+    }
+
+
+# Delete the oldest snapshots beyond keep; returns the removed paths
+def rotate_snapshots(snapshot_dir=SNAPSHOT_DIR, keep=SNAPSHOT_KEEP, database_name=None):
+    snapshots = list_snapshots(snapshot_dir, database_name)
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def _print_snapshot(summary):
+    mode = "WAL, point in time" if summary['wal'] else f"rollback journal, {summary['restarts']} restarts"
+    print(f"✓ {summary['path']} ({summary['bytes'] / 1024 / 1024:.1f} MB, {summary['steps']} steps, "
+          f"{summary['seconds']:.1f}s, {mode}) verified")
+
+
+# Take, verify and rotate snapshots every interval until interrupted
+def run_schedule(database_name, snapshot_dir, keep, every_seconds):
+    while True:
+        started = time.monotonic()
+        try:
+            _print_snapshot(take_snapshot(database_name, snapshot_dir))
+            for path in rotate_snapshots(snapshot_dir, keep, database_name):
+                print(f"  removed {path}")
+        except (sqlite3.Error, RuntimeError, OSError) as error:
+            print(f"✗ Snapshot failed: {error}")
+        time.sleep(max(0.0, every_seconds - (time.monotonic() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online database snapshots")
+    parser.add_argument('command', choices=['take', 'list', 'verify', 'schedule'])
+    parser.add_argument('path', nargs='?', help="snapshot to verify (default: the newest)")
+    parser.add_argument('--database', default=None, help="SQLite file (default: from DATABASE_URL)")
+    parser.add_argument('--dir', default=SNAPSHOT_DIR)
+    parser.add_argument('--keep', type=int, default=SNAPSHOT_KEEP)
+    parser.add_argument('--every', type=float, default=3600, help="seconds between scheduled snapshots")
+    parser.add_argument('--enable-wal', action='store_true', help="switch the database to WAL mode first")
+    args = parser.parse_args()
+    database_name = args.database or sqlite_path()
+
+    if args.enable_wal:
+        print("✓ WAL mode enabled" if enable_wal(database_name) else "✗ Could not enable WAL mode")
+
+    if args.command == 'take':
+        _print_snapshot(take_snapshot(database_name, args.dir))
+        for path in rotate_snapshots(args.dir, args.keep, database_name):
+            print(f"  removed {path}")
+    elif args.command == 'list':
+        for path in list_snapshots(args.dir, database_name):
+            print(f"{path}  {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+    elif args.command == 'verify':
+        snapshots = list_snapshots(args.dir, database_name)
+        path = args.path or (snapshots[-1] if snapshots else None)
+        if path is None:
+            raise SystemExit("No snapshots to verify")
+        ok, problems = verify_snapshot(path)
+        print(f"✓ {path} is intact" if ok else f"✗ {path}: " + "; ".join(problems[:10]))
+        raise SystemExit(0 if ok else 1)
+    else:
+        run_schedule(database_name, args.dir, args.keep, args.every)
+
+
+if __name__ == "__main__":
+    main()
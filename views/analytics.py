@@ -0,0 +1,95 @@
+import plotly.express as px
+import streamlit as st
+
+from components.chart_data import render_mode
+from components.claim_events import GROUPINGS, load_completion_times, load_status_durations
+from components.data_versions import data_version
+from components.demand_forecasting import (
+    forecasts_available, refresh_forecasts, load_forecast_totals, load_city_forecast
+)
+from components.storage import is_sqlite
+from views.common import get_database_connection, load_category_counts
+
+# Recomputed only when the claims table changes; version is part of the cache key
+@st.cache_data
+def completion_times(grouping, min_claims, version):
+    return load_completion_times(get_database_connection(), grouping, min_claims)
+
+@st.cache_data
+def status_durations(version):
+    return load_status_durations(get_database_connection())
+
+def show_analytics():
+    st.header("📊 Analytics & Insights")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("🍎 Food Type Distribution")
+        food_type_counts = load_category_counts('food_listings', 'Food_Type')
+        fig = px.bar(x=food_type_counts['Category'], y=food_type_counts['Total'])
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.subheader("🍽️ Meal Type Distribution")
+        meal_type_counts = load_category_counts('food_listings', 'Meal_Type')
+        fig = px.bar(x=meal_type_counts['Category'], y=meal_type_counts['Total'])
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Time to fulfilment, from the claim status history (kept by SQLite triggers)
+    if not is_sqlite():
+        return
+    st.subheader("⏱️ Time to Completion")
+    version = data_version(get_database_connection(), ('claims',))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        grouping = st.selectbox(
+            "Group by:",
+            list(GROUPINGS),
+            format_func=lambda name: name.replace('_', ' ').title()
+        )
+    with col2:
+        min_claims = st.number_input("Minimum completed claims:", min_value=1, value=1)
+
+    times = completion_times(grouping, min_claims, version)
+    if times.empty:
+        st.info("No claims have moved to Completed since the status history started.")
+    else:
+        st.dataframe(times, use_container_width=True)
+
+    st.caption("Hours spent in each status before the next change")
+    st.dataframe(status_durations(version), use_container_width=True)
+
+    show_demand_forecast()
+
+# Next-14-day demand from the stored batch forecasts
+def show_demand_forecast():
+    st.subheader("🔮 Demand Forecast")
+    conn = get_database_connection()
+
+    if st.button("Refresh Forecasts"):
+        with st.spinner("Forecasting all city, meal type and food type series..."):
+            refresh_forecasts(conn)
+        st.toast("Forecasts refreshed")
+
+    if not forecasts_available(conn):
+        st.info("No forecasts yet; refresh them to forecast claims for the next 14 days.")
+        return
+
+    top_cities = load_forecast_totals(conn, limit=15)
+    fig = px.bar(top_cities, x='City', y='Expected_Claims', title="Expected claims over the next 14 days")
+    st.plotly_chart(fig, use_container_width=True)
+
+    city = st.selectbox("City:", top_cities['City'].tolist(), key="forecast_city")
+    city_forecast = load_city_forecast(conn, city)
+    fig = px.line(
+        city_forecast,
+        x='Forecast_Date',
+        y='Forecast',
+        color='Meal_Type',
+        markers=True,
+        render_mode=render_mode(len(city_forecast)),
+        title=f"Daily expected claims in {city}"
+    )
+    st.plotly_chart(fig, use_container_width=True)
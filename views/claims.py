@@ -0,0 +1,109 @@
+import sqlite3
+
+import streamlit as st
+
+from components import partitioning
+from components.claim_reservations import reserve_claim, set_claim_status
+from components.claims_detailed import ORDERINGS, PAGE_SIZE, load_claims_page
+from components.storage import is_sqlite, pooled_connection
+from views.common import load_table, load_distinct, clear_data_cache
+
+def show_claims_management():
+    st.header("📝 Claims Management")
+
+    # CRUD Operations tabs
+    tab1, tab2, tab3 = st.tabs(["View Claims", "Add New Claim", "Update Claim"])
+
+    with tab1:
+        # Read one page from the denormalized claims_detailed table (kept current by triggers)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status_filter = st.selectbox("Status:", ["All"] + load_distinct('claims', 'Status'), key="view_claims_status")
+        with col2:
+            order = st.selectbox("Sort:", list(ORDERINGS), key="view_claims_order")
+        with col3:
+            page = st.number_input("Page:", min_value=1, value=1, step=1, key="view_claims_page")
+
+        with pooled_connection() as conn:
+            claims_page, total = load_claims_page(
+                conn,
+                status=None if status_filter == "All" else status_filter,
+                order=order,
+                page=int(page),
+                read_model=is_sqlite()
+            )
+
+        st.dataframe(claims_page, use_container_width=True, hide_index=True)
+        st.caption(f"Page {int(page)} of {max(1, -(-total // PAGE_SIZE))} ({total} claims)")
+
+    with tab2:
+        st.subheader("➕ Add New Claim")
+
+        # Form for new claim
+        with st.form("new_claim_form"):
+            food_listings = load_table('food_listings', ('Food_ID', 'Food_Name', 'Quantity', 'Remaining_Quantity'))
+            food_listings = food_listings[food_listings['Remaining_Quantity'] > 0]
+            receivers = load_table('receivers', ('Receiver_ID', 'Name'))
+
+            selected_food = st.selectbox(
+                "Select Food Item:",
+                options=food_listings['Food_ID'].tolist(),
+                format_func=lambda x: f"{food_listings[food_listings['Food_ID']==x]['Food_Name'].iloc[0]} (Left: {food_listings[food_listings['Food_ID']==x]['Remaining_Quantity'].iloc[0]} of {food_listings[food_listings['Food_ID']==x]['Quantity'].iloc[0]})"
+            )
+
+            claimed_quantity = st.number_input("Quantity:", min_value=1, value=1, step=1)
+
+            selected_receiver = st.selectbox(
+                "Select Receiver:",
+                options=receivers['Receiver_ID'].tolist(),
+                format_func=lambda x: f"{receivers[receivers['Receiver_ID']==x]['Name'].iloc[0]}"
+            )
+
+            submitted = st.form_submit_button("Submit Claim")
+
+            if submitted:
+                # Reserve the quantity and add the claim in one transaction, in the listing's
+                # region when partitioned (copied to the main database the pages read in the background)
+                if partitioning.partitioned_writes():
+                    new_claim_id = partitioning.reserve_claim(selected_food, selected_receiver, int(claimed_quantity))
+                    partitioning.request_sync(on_applied=clear_data_cache)
+                else:
+                    with pooled_connection() as conn:
+                        new_claim_id = reserve_claim(conn, selected_food, selected_receiver, int(claimed_quantity))
+                clear_data_cache()
+                if new_claim_id is None:
+                    st.error("Not enough quantity left for this claim; the listing may have just been claimed.")
+                else:
+                    st.success(f"Claim {new_claim_id} submitted successfully!")
+                    st.rerun()
+
+    with tab3:
+        st.subheader("✏️ Update Claim Status")
+
+        claims = load_table('claims', ('Claim_ID',))
+
+        claim_to_update = st.selectbox(
+            "Select Claim to Update:",
+            options=claims['Claim_ID'].tolist()
+        )
+
+        new_status = st.selectbox(
+            "New Status:",
+            options=['Pending', 'Completed', 'Cancelled']
+        )
+
+        if st.button("Update Status"):
+            # Cancelling releases the claimed quantity; reopening takes it again if still available
+            try:
+                if partitioning.partitioned_writes():
+                    partitioning.update_claim_status(int(claim_to_update), new_status)
+                    partitioning.request_sync(on_applied=clear_data_cache)
+                else:
+                    with pooled_connection() as conn:
+                        set_claim_status(conn, int(claim_to_update), new_status)
+            except (sqlite3.IntegrityError, ValueError) as error:
+                st.error(str(error))
+            else:
+                clear_data_cache()
+                st.success(f"Claim {claim_to_update} status updated to {new_status}!")
+                st.rerun()
@@ -0,0 +1,128 @@
+# Shared data access for the app's pages: connection, cached loaders and ad-hoc queries
+
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from components.address_parsing import ensure_address_columns
+from components.chart_data import TOP_N, category_counts_sql
+from components.claim_events import ensure_claim_events
+from components.claim_reservations import ensure_claim_ids, ensure_claim_quantities
+from components.claim_rollups import ensure_claim_rollups
+from components.claims_detailed import ensure_claims_detailed
+from components.report_jobs import ensure_report_jobs
+from components.storage import connect, is_sqlite, pooled_connection, sqlite_path
+from components.query_metrics import timed_read_sql, record
+
+# Database connection function: one long-lived connection for the SQLite-only features
+# (rollups, reports); page reads and writes check out their own with pooled_connection()
+@st.cache_resource
+def get_database_connection():
+    if not is_sqlite():
+        conn = connect()
+        ensure_claim_ids(conn)
+        return conn
+    conn = sqlite3.connect(sqlite_path(), check_same_thread=False)
+    ensure_claim_rollups(conn)
+    ensure_claim_events(conn)
+    ensure_claim_quantities(conn)
+    ensure_claims_detailed(conn)
+    ensure_address_columns(conn)
+    ensure_report_jobs(conn)
+    return conn
+
+# Known columns per table, used to validate projections and filters
+TABLE_COLUMNS = {
+    'providers': ('Provider_ID', 'Name', 'Type', 'Address', 'City', 'Contact',
+                  'Street', 'Locality', 'State', 'Postal_Code'),
+    'receivers': ('Receiver_ID', 'Name', 'Type', 'City', 'Contact'),
+    'food_listings': ('Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Provider_ID',
+                      'Provider_Type', 'Location', 'Food_Type', 'Meal_Type', 'Remaining_Quantity'),
+    'claims': ('Claim_ID', 'Food_ID', 'Receiver_ID', 'Status', 'Timestamp', 'Claimed_Quantity'),
+}
+
+# Build a SELECT for only the requested columns, pushing filters into the WHERE clause.
+# filters is a tuple of (column, value) pairs; a tuple/list value becomes an IN (...) test
+# and None an IS NULL test.
+def build_select(table, columns=None, filters=None, distinct=False):
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+    known = TABLE_COLUMNS[table]
+    columns = tuple(columns or known)
+    for column in columns + tuple(column for column, _ in filters or ()):
+        if column not in known:
+            raise ValueError(f"Unknown column for {table}: {column}")
+
+    select_list = ", ".join(f'"{column}"' for column in columns)
+    sql = f"SELECT {'DISTINCT ' if distinct else ''}{select_list} FROM {table}"
+
+    clauses, params = [], []
+    for column, value in filters or ():
+        if isinstance(value, (tuple, list)):
+            clauses.append(f'"{column}" IN ({", ".join("?" for _ in value)})')
+            params.extend(value)
+        elif value is None:
+            clauses.append(f'"{column}" IS NULL')
+        else:
+            clauses.append(f'"{column}" = ?')
+            params.append(value)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if distinct:
+        sql += " ORDER BY " + ", ".join(f'"{column}"' for column in columns)
+    return sql, params
+
+# Set by the cached loader when it actually runs, so callers can tell hits from misses
+_load_state = threading.local()
+
+@st.cache_data
+def _load_table_cached(table, columns=None, filters=None, distinct=False):
+    _load_state.missed = True
+    sql, params = build_select(table, columns, filters, distinct)
+    with pooled_connection() as conn:
+        return timed_read_sql(conn, sql, params, label=f"load_table:{table}", cache_hit=False)
+
+# Load data function: cached per (table, columns, filters) shape
+def load_table(table, columns=None, filters=None, distinct=False):
+    _load_state.missed = False
+    started = time.perf_counter()
+    df = _load_table_cached(table, columns, filters, distinct)
+    if not _load_state.missed:
+        sql, _ = build_select(table, columns, filters, distinct)
+        record(f"load_table:{table}", sql, (time.perf_counter() - started) * 1000,
+               rows=len(df), cache_hit=True)
+    return df
+
+@st.cache_data
+def _load_category_counts_cached(table, column, filters=None, top_n=TOP_N):
+    _load_state.missed = True
+    source_sql, params = build_select(table, (column,), filters)
+    with pooled_connection() as conn:
+        return timed_read_sql(conn, category_counts_sql(source_sql, column, top_n), params,
+                              label=f"category_counts:{table}.{column}", cache_hit=False)
+
+# Chart-sized counts per value of one column (top_n values plus "Other"), aggregated in SQL
+def load_category_counts(table, column, filters=None, top_n=TOP_N):
+    _load_state.missed = False
+    started = time.perf_counter()
+    df = _load_category_counts_cached(table, column, filters, top_n)
+    if not _load_state.missed:
+        record(f"category_counts:{table}.{column}", build_select(table, (column,), filters)[0],
+               (time.perf_counter() - started) * 1000, rows=len(df), cache_hit=True)
+    return df
+
+# Drop cached loader results after a write
+def clear_data_cache():
+    _load_table_cached.clear()
+    _load_category_counts_cached.clear()
+
+# Distinct values of one column, for filter dropdowns
+def load_distinct(table, column):
+    return load_table(table, (column,), distinct=True)[column].tolist()
+
+# SQL Query functions
+def execute_query(query, label="execute_query"):
+    with pooled_connection() as conn:
+        return timed_read_sql(conn, query, label=label)
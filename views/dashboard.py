@@ -0,0 +1,113 @@
+import plotly.express as px
+import streamlit as st
+
+from components.chart_data import render_mode
+from components.claim_rollups import claim_date_range, load_claim_trend
+from components.storage import is_sqlite
+from views.common import get_database_connection, load_table, load_distinct, load_category_counts
+
+def show_dashboard():
+    st.header("📈 Dashboard Overview")
+
+    # Load only the columns the metrics and charts use
+    providers = load_table('providers', ('City',))
+    receivers = load_table('receivers', ('City',))
+    food_listings = load_table('food_listings', ('Quantity',))
+    claims = load_table('claims', ('Status',))
+
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric(
+            label="🏪 Total Providers",
+            value=len(providers),
+            delta=f"{len(providers.groupby('City'))} cities"
+        )
+
+    with col2:
+        st.metric(
+            label="👥 Total Receivers", 
+            value=len(receivers),
+            delta=f"{len(receivers.groupby('City'))} cities"
+        )
+
+    with col3:
+        st.metric(
+            label="🍎 Food Items",
+            value=len(food_listings),
+            delta=f"{food_listings['Quantity'].sum():,} total units"
+        )
+
+    with col4:
+        completed_claims = len(claims[claims['Status'] == 'Completed'])
+        st.metric(
+            label="✅ Successful Claims",
+            value=completed_claims,
+            delta=f"{completed_claims/len(claims)*100:.1f}% success rate"
+        )
+
+    # Charts row, aggregated in SQL to the largest groups plus "Other"
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("📊 Claims Status Distribution")
+        status_counts = load_category_counts('claims', 'Status')
+        fig_pie = px.pie(
+            values=status_counts['Total'],
+            names=status_counts['Category'],
+            title="Claim Status Distribution"
+        )
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+    with col2:
+        st.subheader("🏙️ Food Listings by City")
+        city_counts = load_category_counts('food_listings', 'Location')
+        fig_bar = px.bar(
+            x=city_counts['Category'],
+            y=city_counts['Total'],
+            title="Food Listings by City",
+            labels={'x': 'City', 'y': 'Number of Listings'}
+        )
+        st.plotly_chart(fig_bar, use_container_width=True)
+
+    # Claims trend, read from the pre-aggregated rollups (maintained by SQLite triggers)
+    if not is_sqlite():
+        return
+    st.subheader("📈 Claims Trend")
+    conn = get_database_connection()
+    first_day, last_day = claim_date_range(conn)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        date_range = st.date_input(
+            "Date range:",
+            value=(first_day, last_day),
+            min_value=first_day,
+            max_value=last_day
+        )
+    with col2:
+        meal_type_filter = st.selectbox(
+            "Meal Type:",
+            ["All"] + load_distinct('food_listings', 'Meal_Type'),
+            key="trend_meal_type"
+        )
+
+    if len(date_range) == 2:
+        trend, grain = load_claim_trend(
+            conn,
+            date_range[0],
+            date_range[1],
+            meal_type=None if meal_type_filter == "All" else meal_type_filter
+        )
+        fig_trend = px.line(
+            trend,
+            x='Bucket_Start',
+            y='Claims',
+            color='Status',
+            markers=True,
+            render_mode=render_mode(len(trend)),
+            title=f"Claims per {grain}",
+            labels={'Bucket_Start': grain.capitalize()}
+        )
+        st.plotly_chart(fig_trend, use_container_width=True)
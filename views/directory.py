@@ -0,0 +1,57 @@
+import pandas as pd
+import streamlit as st
+
+from views.common import load_table, load_distinct
+
+# Dropdown label for providers whose address had no parseable state (State IS NULL)
+UNKNOWN_STATE = "(Unknown)"
+
+def show_providers_receivers():
+    st.header("👥 Providers & Receivers Directory")
+
+    tab1, tab2 = st.tabs(["Providers", "Receivers"])
+
+    with tab1:
+        col1, col2, col3 = st.columns(3)
+
+        # Provider type filter
+        with col1:
+            provider_type = st.selectbox(
+                "Filter by Provider Type:",
+                ["All"] + load_distinct('providers', 'Type')
+            )
+
+        # Regional filters use the indexed State / Postal_Code columns
+        with col2:
+            states = load_distinct('providers', 'State')
+            known_states = [value for value in states if not pd.isna(value)]
+            state = st.selectbox(
+                "Filter by State:",
+                ["All"] + known_states + ([UNKNOWN_STATE] if len(known_states) < len(states) else [])
+            )
+
+        with col3:
+            postal_code = st.text_input("Filter by ZIP Code:").strip()
+
+        filters = tuple(
+            (column, value) for column, value in [
+                ('Type', provider_type),
+                ('State', None if state == UNKNOWN_STATE else state),
+                ('Postal_Code', postal_code),
+            ] if value not in ("All", "")
+        )
+        providers = load_table('providers', filters=filters)
+
+        st.dataframe(providers, use_container_width=True)
+
+    with tab2:
+        # Receiver type filter
+        receiver_type = st.selectbox(
+            "Filter by Receiver Type:",
+            ["All"] + load_distinct('receivers', 'Type')
+        )
+
+        filters = (('Type', receiver_type),) if receiver_type != "All" else None
+        receivers = load_table('receivers', filters=filters)
+
+        st.dataframe(receivers, use_container_width=True)
@@ -0,0 +1,92 @@
+import streamlit as st
+
+from components.data_versions import data_version
+from components.recommendations import load_recommendations, refresh_new_listings
+from components.storage import is_sqlite
+from views.common import get_database_connection, load_table, load_distinct
+
+# Score listings added since the last run; reruns only when food_listings changes
+@st.cache_data
+def refresh_recommendations(version):
+    refresh_new_listings(get_database_connection())
+
+def show_food_listings():
+    st.header("🍽️ Food Listings Management")
+
+    # Filters
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        city_filter = st.selectbox(
+            "Filter by City:",
+            ["All"] + load_distinct('food_listings', 'Location')
+        )
+
+    with col2:
+        food_type_filter = st.selectbox(
+            "Filter by Food Type:",
+            ["All"] + load_distinct('food_listings', 'Food_Type')
+        )
+
+    with col3:
+        meal_type_filter = st.selectbox(
+            "Filter by Meal Type:",
+            ["All"] + load_distinct('food_listings', 'Meal_Type')
+        )
+
+    # Apply filters in the query
+    filters = tuple(
+        (column, value) for column, value in [
+            ('Location', city_filter),
+            ('Food_Type', food_type_filter),
+            ('Meal_Type', meal_type_filter),
+        ] if value != "All"
+    )
+    filtered_data = load_table(
+        'food_listings',
+        ('Food_Name', 'Quantity', 'Remaining_Quantity', 'Food_Type', 'Meal_Type', 'Location', 'Expiry_Date',
+         'Provider_ID'),
+        filters
+    )
+    providers = load_table('providers', ('Provider_ID', 'Name', 'Contact'))
+
+    # Display results
+    st.subheader(f"📋 Found {len(filtered_data)} food items")
+
+    # Add provider information
+    display_data = filtered_data.merge(
+        providers, 
+        on='Provider_ID', 
+        how='left'
+    )
+
+    st.dataframe(
+        display_data[['Food_Name', 'Quantity', 'Remaining_Quantity', 'Food_Type', 'Meal_Type', 
+                     'Location', 'Expiry_Date', 'Name', 'Contact']].rename(columns={
+            'Name': 'Provider_Name',
+            'Contact': 'Provider_Contact'
+        }),
+        use_container_width=True
+    )
+
+    if is_sqlite():
+        show_recommendations()
+
+# Precomputed top listings for a receiver, from their past claims
+def show_recommendations():
+    st.subheader("⭐ Recommended for You")
+    conn = get_database_connection()
+    refresh_recommendations(data_version(conn, ('food_listings',)))
+
+    receivers = load_table('receivers', ('Receiver_ID', 'Name'))
+    receiver = st.selectbox(
+        "Receiver:",
+        receivers.itertuples(index=False),
+        format_func=lambda receiver: f"{receiver.Name} (ID: {receiver.Receiver_ID})",
+        key="recommendations_receiver"
+    )
+    recommendations = load_recommendations(conn, receiver.Receiver_ID)
+    if recommendations.empty:
+        st.info("No recommendations yet; they are based on the receiver's past claims.")
+    else:
+        st.dataframe(recommendations, use_container_width=True, hide_index=True)
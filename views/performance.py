@@ -0,0 +1,36 @@
+import streamlit as st
+
+from components.query_metrics import load_metrics, summarize_metrics, SLOW_QUERY_MS
+
+def show_performance():
+    st.header("⏱️ Query Performance")
+
+    metrics = load_metrics()
+    if metrics.empty:
+        st.info("No queries recorded yet.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Recorded Calls", len(metrics))
+    with col2:
+        st.metric("p95 Duration", f"{metrics['Duration_MS'].quantile(0.95):.1f} ms")
+    with col3:
+        hits = metrics['Cache_Hit'].dropna()
+        st.metric("Cache Hit Rate", f"{hits.mean() * 100:.1f}%" if len(hits) else "n/a")
+
+    st.subheader("📊 Percentiles by Statement")
+    st.dataframe(summarize_metrics(metrics), use_container_width=True)
+
+    st.subheader("🐢 Slowest Statements")
+    slowest = metrics.nlargest(20, 'Duration_MS')
+    st.dataframe(
+        slowest[['Recorded_At', 'Label', 'Duration_MS', 'Rows_Returned', 'Bytes', 'Cache_Hit', 'Statement']],
+        use_container_width=True
+    )
+
+    st.subheader(f"🔎 Query Plans (over {SLOW_QUERY_MS:.0f} ms)")
+    for _, row in slowest.dropna(subset=['Query_Plan']).iterrows():
+        with st.expander(f"{row['Label']} — {row['Duration_MS']:.1f} ms"):
+            st.code(row['Statement'], language='sql')
+            st.text(row['Query_Plan'])
@@ -0,0 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from components.report_jobs import REPORTS, ACTIVE_STATUSES, submit_report, latest_job, is_current
+from components.storage import is_sqlite
+from views.common import get_database_connection
+
+# Report workers live for the whole app process, shared by all sessions
+@st.cache_resource
+def get_report_executor():
+    return ProcessPoolExecutor(max_workers=2)
+
+def show_job(report, polling=False):
+    conn = get_database_connection()
+    job = latest_job(conn, report)
+    if job is None:
+        st.caption("Not generated yet.")
+        return
+    if polling and job['Status'] not in ACTIVE_STATUSES:
+        # Job finished: rerun the page once so polling stops
+        st.rerun()
+
+    if job['Status'] in ACTIVE_STATUSES:
+        st.progress(int(job['Progress']), text=f"Job {job['Job_ID']}: {job['Message']}")
+    elif job['Status'] == 'failed':
+        st.error(f"Job {job['Job_ID']} failed: {job['Message']}")
+    else:
+        st.caption(f"Job {job['Job_ID']} finished {job['Finished_At']} · {job['Row_Count']} rows")
+        if not is_current(conn, job):
+            st.info("The data has changed since this report was generated. Generate it again to refresh.")
+        st.dataframe(pd.read_csv(job['Result_Path'], nrows=100), use_container_width=True)
+        with open(job['Result_Path'], 'rb') as result_file:
+            st.download_button(
+                "Download CSV",
+                data=result_file.read(),
+                file_name=f"{report}_report.csv",
+                mime="text/csv",
+                key=f"download_{report}"
+            )
+
+def show_reports():
+    st.header("📋 Reports")
+
+    if not is_sqlite():
+        st.info("Background reports need the SQLite backend; use the SQL Queries page instead.")
+        return
+
+    conn = get_database_connection()
+    col1, col2 = st.columns(2)
+
+    for column, report in zip([col1, col2], REPORTS):
+        title, _, _ = REPORTS[report]
+        with column:
+            if st.button(f"Generate {title}"):
+                job_id, queued = submit_report(conn, get_report_executor(), report)
+                if queued:
+                    st.toast(f"{title} queued as job {job_id}")
+                else:
+                    st.toast(f"Reusing job {job_id}; the data has not changed")
+
+            # Poll job status while a job is in flight, without rerunning the whole page
+            job = latest_job(conn, report)
+            active = job is not None and job['Status'] in ACTIVE_STATUSES
+            st.fragment(show_job, run_every=1.0 if active else None)(report, polling=active)
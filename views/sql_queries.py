@@ -0,0 +1,168 @@
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+
+import streamlit as st
+
+from components.export import FORMATS, named_queries, list_tables, export
+from components.query_governor import (
+    MAX_ROWS, TIMEOUT_SECONDS, cancel, open_readonly, preview_cost, start_governed
+)
+from components.storage import is_sqlite, sqlite_path
+from views.common import execute_query, get_database_connection
+
+EXPORT_DIR = 'exports'
+# Session export folders untouched for this long are deleted
+EXPORT_MAX_AGE_SECONDS = int(os.environ.get('EXPORT_MAX_AGE_SECONDS', '3600'))
+
+def show_sql_queries():
+    st.header("🔍 SQL Query Results")
+
+    queries = {
+        "Query 1: Providers by City": "SELECT City, COUNT(*) as Total_Providers FROM providers GROUP BY City ORDER BY Total_Providers DESC",
+        "Query 2: Provider Type Contributions": """
+            SELECT p.Type, COUNT(f.Food_ID) as Total_Items, SUM(f.Quantity) as Total_Quantity
+            FROM providers p JOIN food_listings f ON p.Provider_ID = f.Provider_ID
+            GROUP BY p.Type ORDER BY Total_Quantity DESC
+        """,
+        "Query 3: Claim Status Distribution": "SELECT Status, COUNT(*) as Count FROM claims GROUP BY Status",
+        # Add more queries as needed
+    }
+
+    selected_query = st.selectbox("Select Query:", list(queries.keys()))
+
+    if st.button("Execute Query"):
+        result = execute_query(queries[selected_query], label=selected_query)
+        st.dataframe(result, use_container_width=True)
+
+    # Ad-hoc SQL runs on governed read-only SQLite connections; exports stream from SQLite cursors
+    if is_sqlite():
+        show_adhoc_query()
+        show_export()
+
+# Status and result of this session's ad-hoc query; polled while it runs
+def show_adhoc_job(polling=False):
+    job = st.session_state.get('adhoc_job')
+    if job is None:
+        return
+    result = job['result']
+    if polling and result is not None:
+        # Finished: rerun the page once so polling stops
+        st.rerun()
+
+    if result is None:
+        st.info(f"Running for {time.monotonic() - job['started']:.0f}s...")
+        if st.button("Cancel Query"):
+            cancel(job)
+        return
+
+    message = f"{len(result['frame']):,} rows in {result['elapsed']:.2f}s"
+    if result['status'] == 'ok':
+        st.caption(message)
+    elif result['status'] == 'error':
+        st.error(result['message'])
+    else:
+        st.warning(f"{result['message']} ({message})")
+    if not result['frame'].empty:
+        st.dataframe(result['frame'], use_container_width=True)
+
+# Analyst SQL: read-only, time/row/memory limited and cancellable, with a cost preview
+def show_adhoc_query():
+    st.subheader("🧪 Ad-hoc Query")
+    st.caption(f"Read-only SELECT statements; stopped after {TIMEOUT_SECONDS:g}s or {MAX_ROWS:,} rows.")
+    sql = st.text_area("SQL:", key="adhoc_sql")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        preview = st.button("Preview Cost")
+    with col2:
+        run = st.button("Run Query")
+
+    if preview and sql.strip():
+        conn = open_readonly(sqlite_path())
+        try:
+            cost = preview_cost(conn, sql)
+        except sqlite3.Error as error:
+            st.error(str(error))
+        else:
+            if cost['expensive']:
+                st.warning(f"Expensive: about {cost['estimated_rows']:,} rows visited; it may hit the time limit.")
+            else:
+                st.caption(f"About {cost['estimated_rows']:,} rows visited")
+            if cost['full_scans']:
+                st.caption(f"Full scans: {', '.join(cost['full_scans'])} · temporary sorts: {cost['temp_sorts']}")
+            st.code(cost['plan'], language=None)
+        finally:
+            conn.close()
+
+    job = st.session_state.get('adhoc_job')
+    running = job is not None and job['result'] is None
+    if run and sql.strip() and not running:
+        st.session_state['adhoc_job'] = start_governed(sqlite_path(), sql)
+        running = True
+
+    st.fragment(show_adhoc_job, run_every=0.5 if running else None)(polling=running)
+
+# Remove other sessions' export folders that have not been written to recently
+def remove_stale_exports(current_dir):
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - EXPORT_MAX_AGE_SECONDS
+    for entry in os.scandir(EXPORT_DIR):
+        if entry.path == current_dir:
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+# Stream a named query or table to a file, then offer it for download.
+# Each browser session writes to its own folder and keeps only its latest export.
+def show_export():
+    st.subheader("📤 Export")
+
+    sources = list(named_queries()) + list_tables(get_database_connection())
+    col1, col2 = st.columns(2)
+    with col1:
+        source = st.selectbox("Query or table:", sources)
+    with col2:
+        fmt = st.selectbox("Format:", FORMATS)
+
+    session_dir = os.path.join(EXPORT_DIR, st.session_state.setdefault('export_session', uuid.uuid4().hex))
+    if st.button("Prepare Export"):
+        remove_stale_exports(session_dir)
+        os.makedirs(session_dir, exist_ok=True)
+        output_path = os.path.join(session_dir, f"{source}.{fmt}")
+        # Separate connection so a long export does not hold the shared one; export() writes
+        # under a temporary name and renames once complete, so a download never sees a partial file
+        conn = sqlite3.connect(sqlite_path())
+        try:
+            with st.spinner("Exporting..."):
+                row_count = export(conn, source, fmt, output_path)
+        finally:
+            conn.close()
+        previous = st.session_state.get('export_path')
+        if previous and previous != output_path and os.path.exists(previous):
+            os.remove(previous)
+        st.session_state['export_path'] = output_path
+        st.success(f"Exported {row_count} rows to {output_path}")
+
+    output_path = st.session_state.get('export_path')
+    if output_path and os.path.exists(output_path):
+        # Read only when the button is clicked, closing the file before returning the bytes
+        def read_export():
+            with open(output_path, 'rb') as export_file:
+                return export_file.read()
+
+        st.download_button(
+            f"Download {os.path.basename(output_path)}",
+            data=read_export,
+            file_name=os.path.basename(output_path),
+        )